@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+A/B 平衡对比（共同随机数）
+基准与变体两套配置用同一个种子成对运行，两边都按事件类别拆分随机流（EventStreams）：
+第 k 场战斗、第 k 次掉落、第 k 次强化、第 k 次BOSS决策在两边使用同一条子流，
+配对差值只反映配置本身的影响，方差远小于两组独立抽样之差：
+
+    effects = compare_configs({}, {'enhance_success_rates.10': 0.6}, runs=500, seed=1, workers=8)
+    print_ab_report(effects)
+
+报告每个指标的配对效应（变体 - 基准）及其置信区间，以及方差缩减倍数：
+独立抽样时差值的方差（两边方差之和）/ 配对差值的方差。
+crn=False 时变体改用独立种子，可用来对照。
+
+    python ab_compare.py --variant '{"enhance_success_rates.10": 0.6}' --runs 500 --workers 4
+"""
+
+import math
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from game_simulation_v3 import (
+    DEFAULT_CONFIG,
+    MAX_DEFAULT_CHUNK_SIZE,
+    SimulationConfig,
+    derive_campaign_seeds,
+    run_campaign,
+)
+from sweep import RunningStats, campaign_metrics
+
+# 两边每轮都有值的指标（clear_day 只在通关时有值，不适合配对）
+PAIRED_METRICS = ('days', 'total_deaths', 'final_power', 'win_rate')
+
+ConfigLike = Union[SimulationConfig, Dict[str, object]]
+
+
+@dataclass
+class PairedEffect:
+    """一个指标的配对对比结果"""
+    metric: str
+    baseline: RunningStats = field(default_factory=RunningStats)
+    variant: RunningStats = field(default_factory=RunningStats)
+    # 每轮 变体 - 基准
+    difference: RunningStats = field(default_factory=RunningStats)
+
+    def add(self, baseline: float, variant: float):
+        self.baseline.add(baseline)
+        self.variant.add(variant)
+        self.difference.add(variant - baseline)
+
+    @property
+    def effect(self) -> float:
+        """平均配对效应（变体 - 基准）"""
+        return self.difference.mean
+
+    def interval(self, confidence: float = 0.95) -> Tuple[float, float]:
+        """配对效应的置信区间（正态近似）"""
+        half = NormalDist().inv_cdf(0.5 + confidence / 2) * self.difference.stderr
+        return self.effect - half, self.effect + half
+
+    @property
+    def variance_reduction(self) -> float:
+        """独立抽样时差值方差 / 配对差值方差（>1 表示共同随机数有效）"""
+        independent = self.baseline.variance + self.variant.variance
+        if self.difference.variance == 0:
+            return math.inf if independent > 0 else 1.0
+        return independent / self.difference.variance
+
+    def format_line(self, confidence: float = 0.95) -> str:
+        low, high = self.interval(confidence)
+        return (f"{self.metric:13s} 基准 {self.baseline.mean:10.3f}  变体 {self.variant.mean:10.3f}  "
+                f"效应 {self.effect:+9.3f} [{low:+.3f}, {high:+.3f}]  方差缩减 {self.variance_reduction:6.1f}x")
+
+
+def _as_config(config: ConfigLike) -> SimulationConfig:
+    return config if isinstance(config, SimulationConfig) else DEFAULT_CONFIG.with_overrides(config)
+
+
+def _variant_seed(seed: int) -> int:
+    """非共同随机数模式下变体使用的独立种子"""
+    return random.Random(seed).getrandbits(64)
+
+
+def run_pair_chunk(baseline: SimulationConfig, variant: SimulationConfig, seeds: List[int],
+                   crn: bool = True) -> List[Tuple[Dict[str, float], Dict[str, float]]]:
+    """成对运行一组种子，返回每轮 (基准指标, 变体指标)（也是工作进程入口）"""
+    pairs = []
+    for seed in seeds:
+        base_result = run_campaign(seed, config=baseline, event_streams=crn)
+        variant_seed = seed if crn else _variant_seed(seed)
+        variant_result = run_campaign(variant_seed, config=variant, event_streams=crn)
+        pairs.append((campaign_metrics(base_result)[1], campaign_metrics(variant_result)[1]))
+    return pairs
+
+
+def _iter_pair_chunks(baseline: SimulationConfig, variant: SimulationConfig, seeds: List[int],
+                      crn: bool, workers: int, chunk_size: int) -> Iterator[List]:
+    """按种子顺序逐块产出配对结果"""
+    chunks = [seeds[start:start + chunk_size] for start in range(0, len(seeds), chunk_size)]
+    if workers <= 1:
+        for chunk in chunks:
+            yield run_pair_chunk(baseline, variant, chunk, crn)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(run_pair_chunk, baseline, variant, chunk, crn))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def compare_configs(baseline: ConfigLike, variant: ConfigLike, runs: int = 500,
+                    seed: Optional[int] = None, workers: int = 1, crn: bool = True,
+                    chunk_size: Optional[int] = None) -> Dict[str, PairedEffect]:
+    """
+    成对运行基准与变体各 runs 轮，返回 {指标: 配对对比结果}
+    - baseline/variant: SimulationConfig，或对 DEFAULT_CONFIG 的覆盖字典（见 SimulationConfig.with_overrides）
+    - crn: 共同随机数模式；False 时变体使用独立种子
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, min(MAX_DEFAULT_CHUNK_SIZE, runs // (max(1, workers) * 4)))
+    baseline, variant = _as_config(baseline), _as_config(variant)
+    effects = {metric: PairedEffect(metric) for metric in PAIRED_METRICS}
+    seeds = derive_campaign_seeds(seed, runs)
+    for chunk in _iter_pair_chunks(baseline, variant, seeds, crn, workers, chunk_size):
+        for base_metrics, variant_metrics in chunk:
+            for metric, effect in effects.items():
+                effect.add(base_metrics[metric], variant_metrics[metric])
+    return effects
+
+
+def print_ab_report(effects: Dict[str, PairedEffect], confidence: float = 0.95):
+    """打印配对对比报告"""
+    runs = next(iter(effects.values())).difference.count if effects else 0
+    print("\n" + "="*60)
+    print(f"A/B 配对对比（{runs}轮，{confidence:.0%} 置信区间）")
+    print("="*60)
+    for effect in effects.values():
+        print(f"  {effect.format_line(confidence)}")
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description='A/B 平衡对比（共同随机数）')
+    parser.add_argument('--baseline', default='{}', help='基准配置覆盖（JSON），缺省为当前常量')
+    parser.add_argument('--variant', required=True, help='变体配置覆盖（JSON）')
+    parser.add_argument('--runs', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--independent', action='store_true', help='关闭共同随机数（对照用）')
+    args = parser.parse_args()
+
+    print_ab_report(compare_configs(json.loads(args.baseline), json.loads(args.variant), args.runs,
+                                    args.seed, args.workers, crn=not args.independent))
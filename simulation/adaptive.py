@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自适应样本量的蒙特卡洛估计
+不预先固定轮数，而是按批次（多进程并行）持续运行通关模拟，直到目标指标均值的
+置信区间半宽不超过容差；参数扫描时还会剪掉置信区间已明显劣于当前最优点的配置：
+
+    est = estimate('clear_day', tolerance=0.5, seed=1, workers=8)
+    print(est.format_line())          # 均值 ± 半宽、实际用了多少轮
+
+    points = adaptive_sweep({'enhance_success_rates.10': [0.3, 0.5, 0.7]},
+                            'clear_day', tolerance=0.5, minimize=True, workers=8)
+
+- 指标：sweep.METRICS 中的任一项，或 clear_rate（通关率，按0/1样本计）
+- clear_day 的未通关轮次按 CAMPAIGN_DAYS 天计入（而不是像 sweep 那样只统计通关轮次），
+  否则很少通关但通关很快的配置会在收敛判定和剪枝中显得比总能通关的配置更好
+- 置信区间用正态近似（均值 ± z·标准误），clear_rate 用 Agresti-Coull 区间；至少 min_runs 轮后才判定
+- 每个配置点的种子序列相同，批次按种子顺序合并：单配置估计的结果只取决于种子和批大小，与进程数无关
+
+    python adaptive.py --metric clear_day --tolerance 0.5 --workers 4
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from game_simulation_v3 import CAMPAIGN_DAYS, DEFAULT_CONFIG, SimulationConfig, derive_campaign_seeds
+from sweep import METRICS, PointSummary, RunningStats, expand_grid, run_sweep_chunk
+
+# 额外支持的比例型指标
+CLEAR_RATE = 'clear_rate'
+
+DEFAULT_BATCH_SIZE = 16
+
+# 配置点状态
+RUNNING = 'running'
+CONVERGED = 'converged'   # 置信区间达到容差
+PRUNED = 'pruned'         # 置信区间明显劣于最优点，提前停止
+EXHAUSTED = 'exhausted'   # 用完 max_runs 仍未达到容差
+
+
+@dataclass
+class AdaptivePoint:
+    """一个配置点的自适应估计结果"""
+    summary: PointSummary
+    metric: str
+    # 目标指标的累计统计（clear_rate 为0/1样本；clear_day 的未通关轮次计为 CAMPAIGN_DAYS）
+    target: RunningStats
+    # 置信水平对应的正态分位数
+    z: float
+    status: str = RUNNING
+    next_seed: int = 0
+
+    @property
+    def runs(self) -> int:
+        return self.summary.completed
+
+    @property
+    def mean(self) -> float:
+        return self.target.mean
+
+    def interval(self) -> Tuple[float, float]:
+        """
+        目标指标均值的置信区间
+        clear_rate 用 Agresti-Coull 区间（全部通关/全部失败时正态近似的半宽为0，会过早收敛）
+        """
+        z = self.z
+        if self.metric == CLEAR_RATE:
+            n = self.target.count + z * z
+            center = (self.target.mean * self.target.count + z * z / 2) / n
+            half = z * math.sqrt(center * (1 - center) / n)
+        else:
+            center = self.target.mean
+            half = z * self.target.stderr
+        return center - half, center + half
+
+    def half_width(self) -> float:
+        low, high = self.interval()
+        return (high - low) / 2
+
+    def add(self, cleared: bool, metrics: Dict[str, float]):
+        self.summary.add(cleared, metrics)
+        if self.metric == CLEAR_RATE:
+            self.target.add(1.0 if cleared else 0.0)
+        elif self.metric == 'clear_day':
+            self.target.add(metrics['clear_day'] if cleared else CAMPAIGN_DAYS)
+        elif self.metric in metrics:
+            self.target.add(metrics[self.metric])
+
+    def format_line(self) -> str:
+        status = {RUNNING: '进行中', CONVERGED: '已收敛', PRUNED: '已剪枝', EXHAUSTED: '达到上限'}[self.status]
+        value = f"{self.mean:.3f} ± {self.half_width():.3f}" if self.target.count > 1 else "--"
+        return f"[{self.summary.index:3d}] {self.summary.label()}: {self.metric} = {value}（{self.runs}轮，{status}）"
+
+
+def _z_value(confidence: float) -> float:
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def _prune_dominated(points: Sequence[AdaptivePoint], minimize: bool, min_runs: int):
+    """
+    剪掉置信区间与当前最优点不重叠的配置点
+    最优点按区间的保守一侧（最小化时取上界最小者）选取，只比较已跑满 min_runs 的点
+    """
+    ready = [p for p in points if p.runs >= min_runs and p.target.count > 1]
+    if len(ready) < 2:
+        return
+    if minimize:
+        best = min(p.interval()[1] for p in ready)
+        dominated = [p for p in ready if p.interval()[0] > best]
+    else:
+        best = max(p.interval()[0] for p in ready)
+        dominated = [p for p in ready if p.interval()[1] < best]
+    for point in dominated:
+        if point.status == RUNNING:
+            point.status = PRUNED
+
+
+def adaptive_sweep(grid: Dict[str, Sequence], metric: str, tolerance: float,
+                   minimize: bool = True, seed: Optional[int] = None, workers: int = 1,
+                   base_config: SimulationConfig = DEFAULT_CONFIG, confidence: float = 0.95,
+                   min_runs: int = 30, max_runs: int = 10000, batch_size: int = DEFAULT_BATCH_SIZE,
+                   prune: bool = True, verbose: bool = False) -> List[AdaptivePoint]:
+    """
+    对网格中每个配置点自适应地运行模拟，直到目标指标的置信区间半宽 <= tolerance
+    - minimize: 指标越小越好（如 clear_day、total_deaths），否则越大越好；只影响剪枝
+    - prune: 是否剪掉明显更差的配置点
+    每轮给所有未停止的点分配批次（总批数不少于进程数），批次并行运行后按种子顺序合并，
+    每合并一批检查一次该点是否收敛；剪枝在每轮结束时判定
+    """
+    if metric not in METRICS and metric != CLEAR_RATE:
+        raise ValueError(f"未知指标: {metric}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    z = _z_value(confidence)
+    seeds = derive_campaign_seeds(seed, max_runs)
+    points = [AdaptivePoint(PointSummary(i, overrides, base_config.with_overrides(overrides), max_runs),
+                            metric, RunningStats(), z)
+              for i, overrides in enumerate(expand_grid(grid))]
+
+    def converged(point: AdaptivePoint) -> bool:
+        return point.runs >= min_runs and point.target.count > 1 and point.half_width() <= tolerance
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while True:
+            active = [p for p in points if p.status == RUNNING]
+            if not active:
+                break
+            # 本轮每个点的批数：让总批数不少于进程数
+            per_point = max(1, math.ceil(workers / len(active)))
+            tasks = []
+            for point in active:
+                for _ in range(per_point):
+                    if point.next_seed >= max_runs:
+                        break
+                    chunk = seeds[point.next_seed:point.next_seed + batch_size]
+                    point.next_seed += len(chunk)
+                    tasks.append((point, chunk))
+            if executor is None:
+                results = [run_sweep_chunk(point.summary.config, chunk) for point, chunk in tasks]
+            else:
+                futures = [executor.submit(run_sweep_chunk, point.summary.config, chunk) for point, chunk in tasks]
+                results = [future.result() for future in futures]
+
+            for (point, _), batch in zip(tasks, results):
+                if point.status != RUNNING:
+                    continue  # 本轮已收敛，多出的批次丢弃
+                for cleared, metrics in batch:
+                    point.add(cleared, metrics)
+                if converged(point):
+                    point.status = CONVERGED
+                elif point.runs >= max_runs:
+                    point.status = EXHAUSTED
+
+            if prune:
+                _prune_dominated(points, minimize, min_runs)
+            if verbose:
+                for point in active:
+                    if point.status != RUNNING:
+                        print(point.format_line())
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    return points
+
+
+def estimate(metric: str, tolerance: float, seed: Optional[int] = None, workers: int = 1,
+             config: SimulationConfig = DEFAULT_CONFIG, confidence: float = 0.95,
+             min_runs: int = 30, max_runs: int = 10000, batch_size: int = DEFAULT_BATCH_SIZE) -> AdaptivePoint:
+    """单个配置的自适应估计"""
+    return adaptive_sweep({}, metric, tolerance, seed=seed, workers=workers, base_config=config,
+                          confidence=confidence, min_runs=min_runs, max_runs=max_runs,
+                          batch_size=batch_size, prune=False)[0]
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description='自适应样本量的蒙特卡洛估计')
+    parser.add_argument('--metric', default='clear_day', choices=list(METRICS) + [CLEAR_RATE])
+    parser.add_argument('--tolerance', type=float, required=True, help='置信区间半宽容差')
+    parser.add_argument('--grid', default='{}', help='JSON 网格（见 sweep.py），缺省只估计基准配置')
+    parser.add_argument('--maximize', action='store_true', help='指标越大越好（剪枝方向）')
+    parser.add_argument('--confidence', type=float, default=0.95)
+    parser.add_argument('--max-runs', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    points = adaptive_sweep(json.loads(args.grid), args.metric, args.tolerance, minimize=not args.maximize,
+                            seed=args.seed, workers=args.workers, confidence=args.confidence,
+                            max_runs=args.max_runs)
+    print(f"\n{args.metric}（{args.confidence:.0%} 置信区间，容差 ±{args.tolerance}）:")
+    for point in points:
+        print(point.format_line())
+    print(f"共运行 {sum(p.runs for p in points)} 轮")
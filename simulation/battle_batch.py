@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量战斗引擎（NumPy 向量化）
+一次性结算 N 场独立战斗，规则与 game_simulation_v3.simulate_battle 完全一致：
+- 行动顺序：时间轴 100 / 攻速，同时到达时玩家先手，最多 MAX_BATTLE_TURNS 回合
+- 命中率：命中 / (命中 + 闪避 * 0.8)，限制在 10%~90%，未命中也消耗回合
+- 暴击概率：(会心 - 护心) / (护心 * 1.5)，暴击倍率 1.5 + 暴击伤害/100
+  （敌人的护心/暴击伤害取自敌人属性，虚空生物各不相同，缺省为 5/50）
+- 防御减免：calculate_defense_reduction（暴雪式），扣除穿透%；真实伤害部分无视防御
+每场战斗的命中率、暴击概率和两档伤害（普通/暴击）在开战前一次算好，回合循环只做数组运算。
+
+依赖 NumPy（模拟器主体不依赖），用于大规模胜率扫描。
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from game_simulation_v3 import (
+    BASE_ENEMY_STATS,
+    DODGE_FACTOR,
+    ENEMY_DEFAULT_CRIT_DAMAGE,
+    ENEMY_DEFAULT_GUARD,
+    MAX_BATTLE_TURNS,
+    MAX_HIT_RATE,
+    MIN_HIT_RATE,
+    VOID_CREATURE_INDEX,
+    CreatureGroup,
+    Player,
+    calculate_defense_reduction,
+)
+
+ArrayLike = Union[np.ndarray, List[float], float, int]
+
+PLAYER_KEYS = ('attack', 'defense', 'crit', 'critDamage', 'guard', 'speed', 'hp', 'level',
+               'hit', 'dodge', 'penetration', 'trueDamage')
+ENEMY_KEYS = ('hp', 'attack', 'defense', 'critRate', 'critDamage', 'guard', 'attackSpeed', 'level',
+              'hitRate', 'dodgeRate', 'penetration', 'trueDamage')
+# 属性缺省值（与 battle_profiles 中的 get 一致）
+PLAYER_DEFAULTS = {'hit': 100, 'dodge': 10, 'penetration': 0, 'trueDamage': 0}
+ENEMY_DEFAULTS = {'critRate': 5, 'critDamage': ENEMY_DEFAULT_CRIT_DAMAGE, 'guard': ENEMY_DEFAULT_GUARD, 'level': 1,
+                  'hitRate': BASE_ENEMY_STATS['hitRate'], 'dodgeRate': BASE_ENEMY_STATS['dodgeRate'],
+                  'penetration': 0, 'trueDamage': 0}
+
+
+@dataclass
+class BatchBattleResult:
+    """批量战斗结果（每个数组长度为战斗场数）"""
+    victory: np.ndarray
+    rounds: np.ndarray
+    player_hp_remaining: np.ndarray
+
+    @property
+    def win_rate(self) -> float:
+        """胜率（0-1）"""
+        return float(self.victory.mean()) if self.victory.size else 0.0
+
+
+def _crit_chance(crit: np.ndarray, guard: np.ndarray) -> np.ndarray:
+    """暴击概率（百分比，0-100）"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        chance = (crit - guard) / (guard * 1.5) * 100
+    chance = np.where(crit > guard, chance, 0.0)
+    return np.clip(chance, 0, 100)
+
+
+def _hit_rate(hit: np.ndarray, dodge: np.ndarray) -> np.ndarray:
+    """命中率（百分比，10-90）"""
+    return np.clip(hit / (hit + dodge * DODGE_FACTOR) * 100, MIN_HIT_RATE, MAX_HIT_RATE)
+
+
+def _hit_damage(attack: np.ndarray, defense: np.ndarray, level: np.ndarray,
+                crit_damage: np.ndarray, penetration: np.ndarray, true_damage: np.ndarray) -> tuple:
+    """预先计算每场战斗的 (普通伤害, 暴击伤害)，取整方式与 calculate_damage 一致"""
+    true_part = attack * true_damage / 100
+    defense_reduction = np.maximum(0, calculate_defense_reduction(defense, level) - penetration / 100)
+    final_damage = (attack - true_part) * (1 - defense_reduction) + true_part
+    normal = np.maximum(1, np.floor(final_damage)).astype(np.int64)
+    crit = np.maximum(1, np.floor(final_damage * (1.5 + crit_damage / 100))).astype(np.int64)
+    return normal, crit
+
+
+def player_stat_arrays(players: List[Player]) -> Dict[str, np.ndarray]:
+    """把一组 Player 转为批量引擎需要的属性数组"""
+    stats = [p.get_total_stats() for p in players]
+    return {
+        'attack': np.array([s['attack'] for s in stats], dtype=np.float64),
+        'defense': np.array([s['defense'] for s in stats], dtype=np.float64),
+        'crit': np.array([s['crit'] for s in stats], dtype=np.float64),
+        'critDamage': np.array([s['critDamage'] for s in stats], dtype=np.float64),
+        'guard': np.array([s['guard'] for s in stats], dtype=np.float64),
+        'speed': np.array([s['speed'] for s in stats], dtype=np.float64),
+        'hp': np.array([p.hp for p in players], dtype=np.int64),
+        'level': np.array([p.level for p in players], dtype=np.float64),
+        'hit': np.array([s['hit'] for s in stats], dtype=np.float64),
+        'dodge': np.array([s['dodge'] for s in stats], dtype=np.float64),
+        'penetration': np.array([s['penetration'] for s in stats], dtype=np.float64),
+        'trueDamage': np.array([s['trueDamage'] for s in stats], dtype=np.float64),
+    }
+
+
+def enemy_stat_arrays(enemies: List[Dict]) -> Dict[str, np.ndarray]:
+    """把一组敌人属性字典（calculate_enemy_stats 格式）转为属性数组"""
+    return {
+        k: np.array([e[k] if k in e else ENEMY_DEFAULTS[k] for e in enemies],
+                    dtype=np.int64 if k == 'hp' else np.float64)
+        for k in ENEMY_KEYS
+    }
+
+
+def simulate_battles(player_stats: Dict[str, ArrayLike], enemy_stats: Dict[str, ArrayLike],
+                     rng: Optional[np.random.Generator] = None, n: Optional[int] = None,
+                     max_rounds: int = MAX_BATTLE_TURNS) -> BatchBattleResult:
+    """
+    批量模拟战斗
+    - player_stats: attack/defense/crit/critDamage/guard/speed/hp/level（必需）
+      hit/dodge/penetration/trueDamage（缺省为初始值），标量或长度为 N 的数组
+    - enemy_stats: hp/attack/defense/attackSpeed（必需）
+      critRate/critDamage/guard/level/hitRate/dodgeRate/penetration/trueDamage（缺省见 ENEMY_DEFAULTS）
+    - n: 战斗场数（所有输入均为标量时必须指定，否则按数组广播得到）
+    返回每场战斗的胜负、回合数和玩家剩余生命
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    columns = [np.asarray(player_stats[k] if k in player_stats else PLAYER_DEFAULTS[k], dtype=np.float64)
+               for k in PLAYER_KEYS]
+    columns += [np.asarray(enemy_stats[k] if k in enemy_stats else ENEMY_DEFAULTS[k], dtype=np.float64)
+                for k in ENEMY_KEYS]
+    if n is not None:
+        columns.append(np.empty(n))
+    # 广播为等长数组（复制一份，避免广播视图只读）
+    p_attack, p_defense, p_crit, p_crit_damage, p_guard, p_speed, p_hp, p_level, \
+        p_hit, p_dodge, p_penetration, p_true_damage, \
+        e_hp, e_attack, e_defense, e_crit_rate, e_crit_damage, e_guard, e_speed, e_level, \
+        e_hit, e_dodge, e_penetration, e_true_damage = \
+        [np.array(a) for a in np.broadcast_arrays(*columns)][:len(PLAYER_KEYS) + len(ENEMY_KEYS)]
+    size = p_attack.size
+
+    # 开战前一次性计算命中率、暴击概率和两档伤害
+    player_normal, player_critical = _hit_damage(p_attack, e_defense, e_level, p_crit_damage,
+                                                 p_penetration, p_true_damage)
+    player_hit_rate = _hit_rate(p_hit, e_dodge)
+    player_crit_chance = _crit_chance(p_crit, e_guard)
+    enemy_normal, enemy_critical = _hit_damage(e_attack, p_defense, p_level, e_crit_damage,
+                                               e_penetration, e_true_damage)
+    enemy_hit_rate = _hit_rate(e_hit, p_dodge)
+    enemy_crit_chance = _crit_chance(e_crit_rate * 100, p_guard)
+
+    player_interval = 100 / p_speed
+    enemy_interval = 100 / e_speed
+    player_next = player_interval.copy()
+    enemy_next = enemy_interval.copy()
+
+    player_hp = p_hp.astype(np.int64)
+    enemy_hp = e_hp.astype(np.int64)
+    rounds = np.zeros(size, dtype=np.int64)
+    victory = np.zeros(size, dtype=bool)
+    active = np.ones(size, dtype=bool)
+
+    for _ in range(max_rounds):
+        idx = np.flatnonzero(active)
+        if idx.size == 0:
+            break
+        rounds[idx] += 1
+        hit_rolls = rng.random(idx.size) * 100
+        rolls = rng.random(idx.size) * 100
+
+        player_turn = player_next[idx] <= enemy_next[idx]
+
+        # 玩家回合（未命中造成0伤害）
+        p_idx = idx[player_turn]
+        player_next[p_idx] += player_interval[p_idx]
+        damage = np.where(rolls[player_turn] < player_crit_chance[p_idx],
+                          player_critical[p_idx], player_normal[p_idx])
+        damage[hit_rolls[player_turn] > player_hit_rate[p_idx]] = 0
+        enemy_hp[p_idx] -= damage
+        killed = p_idx[enemy_hp[p_idx] <= 0]
+        victory[killed] = True
+        active[killed] = False
+
+        # 敌人回合
+        e_idx = idx[~player_turn]
+        enemy_next[e_idx] += enemy_interval[e_idx]
+        damage = np.where(rolls[~player_turn] < enemy_crit_chance[e_idx],
+                          enemy_critical[e_idx], enemy_normal[e_idx])
+        damage[hit_rolls[~player_turn] > enemy_hit_rate[e_idx]] = 0
+        player_hp[e_idx] -= damage
+        dead = e_idx[player_hp[e_idx] <= 0]
+        player_hp[dead] = 0
+        active[dead] = False
+
+    return BatchBattleResult(victory, rounds, player_hp)
+
+
+def simulate_battle_batch(player: Player, enemy: Dict, n: int,
+                          rng: Optional[np.random.Generator] = None,
+                          max_rounds: int = MAX_BATTLE_TURNS) -> BatchBattleResult:
+    """同一玩家对同一敌人重复 n 场战斗（胜率扫描常用入口）"""
+    player_stats = {k: v[0] for k, v in player_stat_arrays([player]).items()}
+    enemy_stats = {k: v[0] for k, v in enemy_stat_arrays([enemy]).items()}
+    return simulate_battles(player_stats, enemy_stats, rng=rng, n=n, max_rounds=max_rounds)
+
+
+def creature_stat_arrays(group: CreatureGroup, picks: np.ndarray) -> Dict[str, np.ndarray]:
+    """按抽样下标从生物分组的按列属性中取出每场战斗的敌人属性"""
+    return {k: np.asarray(column, dtype=np.float64)[picks] for k, column in group.columns.items() if k in ENEMY_KEYS}
+
+
+def simulate_creature_battles(player: Player, planet_id: str, creature_type: str, n: int,
+                              rng: Optional[np.random.Generator] = None,
+                              max_rounds: int = MAX_BATTLE_TURNS) -> BatchBattleResult:
+    """
+    同一玩家对指定星球、类型的虚空生物打 n 场（每场等概率抽取一只，与 campaign_enemy 一致）
+    需要能读取 voidCreatures.ts（VOID_CREATURE_INDEX 不为 None）
+    """
+    if VOID_CREATURE_INDEX is None:
+        raise RuntimeError("找不到 voidCreatures.ts，虚空生物名册不可用")
+    group = VOID_CREATURE_INDEX.get(planet_id, creature_type)
+    if group is None:
+        raise KeyError(f"名册中没有 {planet_id} 的 {creature_type} 生物")
+    if rng is None:
+        rng = np.random.default_rng()
+    picks = rng.integers(len(group.enemies), size=n)
+    player_stats = {k: v[0] for k, v in player_stat_arrays([player]).items()}
+    return simulate_battles(player_stats, creature_stat_arrays(group, picks), rng=rng, max_rounds=max_rounds)
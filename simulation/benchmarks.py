@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模拟器性能基准
+用法:
+    python benchmarks.py memory [--count N]   单个模拟器常驻内存（紧凑布局 vs 旧布局）
+    python benchmarks.py logging [--count N]  静默模式 vs 详细日志（输出到 /dev/null）的单轮耗时，及单次 emit 开销
+"""
+
+import argparse
+import os
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List
+
+from game_simulation_v3 import QUIET_LOG, ArmorQuality, GameSimulator, LogLevel, SimulationLog
+
+
+# ============ 旧内存布局（对照组） ============
+# 与改造前一致：普通 dataclass（每实例 __dict__），每件战甲复制一份 base_stats，
+# 材料库存为 {(材料ID, 品质): 数量} 字典。
+
+@dataclass
+class _LegacyNanoArmor:
+    slot: str
+    name: str
+    quality: ArmorQuality
+    enhance_level: int = 0
+    sublimation_level: int = 0
+    base_stats: Dict = field(default_factory=dict)
+
+
+@dataclass
+class _LegacyPlayer:
+    level: int = 1
+    exp: int = 0
+    hp: int = 100
+    max_hp: int = 100
+    divine_energy: int = 100
+    max_divine_energy: int = 100
+    divine_energy_recover_per_minute: int = 1
+    armors: Dict[str, _LegacyNanoArmor] = field(default_factory=dict)
+
+
+def _to_legacy_layout(sim: GameSimulator):
+    """把模拟器的玩家、战甲和材料库存替换为旧布局"""
+    player = sim.player
+    sim.player = _LegacyPlayer(
+        level=player.level, exp=player.exp, hp=player.hp, max_hp=player.max_hp,
+        divine_energy=player.divine_energy, max_divine_energy=player.max_divine_energy,
+        divine_energy_recover_per_minute=player.divine_energy_recover_per_minute,
+        armors={slot: _LegacyNanoArmor(a.slot, a.name, a.quality, a.enhance_level,
+                                       a.sublimation_level, dict(a.base_stats))
+                for slot, a in player.armors.items()},
+    )
+    sim.materials = dict(sim.materials.items())
+
+
+def _run_quiet(sim: GameSimulator) -> GameSimulator:
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, redirect_stdout(devnull):
+        sim.simulate_federal_stars()
+    return sim
+
+
+def _retained_bytes(build: Callable[[int], object], count: int) -> float:
+    """构建 count 个对象并全部保留，返回平均每个对象的常驻字节数"""
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        keep: List[object] = [build(i) for i in range(count)]
+        retained = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    del keep
+    return retained / count
+
+
+def measure_simulator_footprint(count: int = 200) -> Dict[str, float]:
+    """
+    测量跑完一轮通关后单个模拟器的常驻内存
+    返回 {'legacy': 旧布局字节数, 'compact': 紧凑布局字节数}
+    """
+    # 预热模块级缓存（掉落表、属性内核），避免计入第一个模拟器
+    _run_quiet(GameSimulator(seed=0))
+
+    def build_compact(i: int) -> GameSimulator:
+        return _run_quiet(GameSimulator(seed=i))
+
+    def build_legacy(i: int) -> GameSimulator:
+        sim = _run_quiet(GameSimulator(seed=i))
+        _to_legacy_layout(sim)
+        return sim
+
+    return {
+        'legacy': _retained_bytes(build_legacy, count),
+        'compact': _retained_bytes(build_compact, count),
+    }
+
+
+def bench_memory(count: int):
+    footprint = measure_simulator_footprint(count)
+    print("="*60)
+    print(f"单个模拟器常驻内存（{count}个模拟器取平均）")
+    print("="*60)
+    print(f"  旧布局:   {footprint['legacy']:8.0f} 字节")
+    print(f"  紧凑布局: {footprint['compact']:8.0f} 字节")
+    print(f"  节省:     {(1 - footprint['compact'] / footprint['legacy']) * 100:.1f}%")
+
+
+def measure_log_overhead(count: int = 200, repeat: int = 5) -> Dict[str, float]:
+    """
+    测量单轮通关的平均耗时（秒）
+    - verbose: 默认 PROGRESS 日志，stdout 重定向到 /dev/null（只计格式化与 print 的开销）
+    - quiet: QUIET_LOG，不构建任何日志字符串
+    两种模式交替重复 repeat 次，各取最快一次
+    """
+    def run(make_log: Callable[[], SimulationLog]) -> float:
+        start = time.perf_counter()
+        for seed in range(count):
+            GameSimulator(seed=seed, log=make_log()).simulate_federal_stars()
+        return (time.perf_counter() - start) / count
+
+    # 预热模块级缓存
+    GameSimulator(seed=0, log=QUIET_LOG).simulate_federal_stars()
+    timings = {'verbose': float('inf'), 'quiet': float('inf')}
+    with open(os.devnull, 'w', encoding='utf-8') as devnull:
+        for _ in range(repeat):
+            with redirect_stdout(devnull):
+                timings['verbose'] = min(timings['verbose'], run(SimulationLog))
+            timings['quiet'] = min(timings['quiet'], run(lambda: QUIET_LOG))
+    return timings
+
+
+def measure_emit_cost(count: int = 100000, repeat: int = 5) -> Dict[str, float]:
+    """
+    测量单次 SimulationLog.emit 的平均耗时（秒），消息字符串预先构建、处理器为空操作
+    - suppressed: 事件级别高于日志级别，emit 直接返回
+    - delivered: 事件级别已启用，构建 LogEvent 并交给处理器
+    """
+    message = "  [强化统计] 成功3次, 失败1次, 降级0次, 消耗120石"
+    logs = {
+        'suppressed': SimulationLog(LogLevel.PROGRESS, handler=lambda event: None),
+        'delivered': SimulationLog(LogLevel.DEBUG, handler=lambda event: None),
+    }
+
+    def run(log: SimulationLog) -> float:
+        emit = log.emit
+        start = time.perf_counter()
+        for _ in range(count):
+            emit(LogLevel.DEBUG, 'enhance_summary', 1, message, success=3, fail=1)
+        return (time.perf_counter() - start) / count
+
+    timings = {name: float('inf') for name in logs}
+    for _ in range(repeat):
+        for name, log in logs.items():
+            timings[name] = min(timings[name], run(log))
+    return timings
+
+
+def bench_logging(count: int):
+    timings = measure_log_overhead(count)
+    print("="*60)
+    print(f"单轮通关耗时（{count}轮取平均）")
+    print("="*60)
+    print(f"  详细日志: {timings['verbose'] * 1000:8.2f} 毫秒")
+    print(f"  静默模式: {timings['quiet'] * 1000:8.2f} 毫秒")
+    print(f"  加速:     {timings['verbose'] / timings['quiet']:.2f}x")
+    emit_cost = measure_emit_cost()
+    print("单次 emit 耗时（消息已构建）")
+    print(f"  未启用级别: {emit_cost['suppressed'] * 1e9:8.0f} 纳秒")
+    print(f"  已启用级别: {emit_cost['delivered'] * 1e9:8.0f} 纳秒")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='模拟器性能基准')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    memory_parser = subparsers.add_parser('memory', help='单个模拟器常驻内存')
+    memory_parser.add_argument('--count', type=int, default=200)
+    logging_parser = subparsers.add_parser('logging', help='静默模式 vs 详细日志')
+    logging_parser.add_argument('--count', type=int, default=200)
+    args = parser.parse_args()
+
+    if args.command == 'memory':
+        bench_memory(args.count)
+    elif args.command == 'logging':
+        bench_logging(args.count)
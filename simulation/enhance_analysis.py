@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+强化阶梯精确成本分析
+把 NanoArmor.try_enhance 的规则建成吸收马尔可夫链：
+- 在 +L 消耗 ENHANCE_STONE_COST[L] 颗强化石尝试一次
+- 成功率 ENHANCE_SUCCESS_RATES[L]，成功 +1
+- 失败时 +5 及以上降 1 级，+5 以下不变
+直接给出 +a → +b 的期望强化石、期望尝试次数和强化石消耗分布（百分位），
+替代 enhance_all_armors 的逐次模拟。
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+from game_simulation_v3 import (
+    ENHANCE_DOWNGRADE_LEVEL,
+    ENHANCE_STONE_COST,
+    ENHANCE_SUCCESS_RATES,
+    MAX_ENHANCE_LEVEL,
+)
+
+# 默认输出的百分位
+DEFAULT_PERCENTILES = (0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+
+# 尾部外推检查窗口：1..10 颗强化石消耗的最小公倍数，消除按消耗周期的波动
+TAIL_WINDOW = 2520
+# 相邻两个窗口估计的尾部衰减率相对误差小于该值时，认为已进入几何尾部
+TAIL_TOLERANCE = 1e-12
+# 剩余概率质量低于该值时视为已全部吸收（不再外推）
+TAIL_EPSILON = 1e-12
+
+
+@dataclass
+class EnhanceCostSummary:
+    """+a → +b 的强化成本"""
+    start_level: int
+    target_level: int
+    expected_stones: float
+    expected_attempts: float
+    # 强化石消耗百分位 {分位: 强化石数}
+    stone_percentiles: Dict[float, int]
+    # cost_cdf[x] = P(消耗 <= x 颗强化石)，x 超出列表长度时按 tail_ratio 几何外推
+    cost_cdf: List[float] = field(repr=False)
+    # 尾部每颗强化石的存活衰减率（为0时列表末尾的剩余质量已低于 TAIL_EPSILON）
+    tail_ratio: float = 0.0
+
+    def cdf(self, stones: int) -> float:
+        """P(消耗 <= stones 颗强化石)"""
+        if stones < len(self.cost_cdf):
+            return self.cost_cdf[max(0, stones)]
+        survival = 1 - self.cost_cdf[-1]
+        return 1 - survival * self.tail_ratio ** (stones - len(self.cost_cdf) + 1)
+
+
+def _ladder(success_rates: Dict[int, float], stone_costs: Dict[int, int],
+            level: int) -> Tuple[float, int, int]:
+    """+L 处的 (成功率, 强化石消耗, 失败后等级)，缺省值与 NanoArmor 一致"""
+    rate = success_rates.get(level, 0.05)
+    cost = stone_costs.get(level, 10)
+    fail_level = level - 1 if level >= ENHANCE_DOWNGRADE_LEVEL else level
+    return rate, cost, fail_level
+
+
+def expected_step_costs(target_level: int = MAX_ENHANCE_LEVEL,
+                        success_rates: Dict[int, float] = ENHANCE_SUCCESS_RATES,
+                        stone_costs: Dict[int, int] = ENHANCE_STONE_COST) -> List[Tuple[float, float]]:
+    """
+    每一级 +L → +L+1 的首达期望 [(期望强化石, 期望尝试次数), ...]
+    生灭链性质：T(L) = (c(L) + f(L) * T(L-1)) / s(L)（可降级时），否则 T(L) = c(L) / s(L)
+    """
+    steps = []
+    for level in range(target_level):
+        rate, cost, fail_level = _ladder(success_rates, stone_costs, level)
+        if fail_level < level:
+            prev_stones, prev_attempts = steps[fail_level]
+            stones = (cost + (1 - rate) * prev_stones) / rate
+            attempts = (1 + (1 - rate) * prev_attempts) / rate
+        else:
+            stones = cost / rate
+            attempts = 1 / rate
+        steps.append((stones, attempts))
+    return steps
+
+
+def _cost_distribution(start_level: int, target_level: int,
+                       success_rates: Dict[int, float], stone_costs: Dict[int, int],
+                       max_stones: int) -> Tuple[List[float], float]:
+    """
+    按强化石数逐颗推进概率质量，返回 (cost_cdf, tail_ratio)
+    在尾部衰减率稳定后停止，剩余部分几何外推；剩余质量低于 TAIL_EPSILON 时直接停止
+    （只推进到某个百分位就停会丢掉尾部，cdf 在列表之外不可外推）
+    """
+    low = min(start_level, ENHANCE_DOWNGRADE_LEVEL - 1)
+    states = range(low, target_level)
+    transitions = {level: _ladder(success_rates, stone_costs, level) for level in states}
+    ring_size = max(cost for _, cost, _ in transitions.values()) + 1
+
+    # ring[x % ring_size][level] = 恰好消耗 x 颗强化石时停在该等级的概率
+    ring = [dict.fromkeys(states, 0.0) for _ in range(ring_size)]
+    ring[0][start_level] = 1.0
+    absorbed = [0.0] * ring_size
+    cost_cdf = []
+    cumulative = 0.0
+    last_ratio = None
+
+    for stones in range(max_stones + 1):
+        slot = stones % ring_size
+        cumulative += absorbed[slot]
+        absorbed[slot] = 0.0
+        cost_cdf.append(min(1.0, cumulative))
+        if 1 - cumulative <= TAIL_EPSILON:
+            return cost_cdf, 0.0
+
+        mass = ring[slot]
+        for level in states:
+            m = mass[level]
+            if m == 0.0:
+                continue
+            mass[level] = 0.0
+            rate, cost, fail_level = transitions[level]
+            dest = ring[(stones + cost) % ring_size]
+            if level + 1 == target_level:
+                absorbed[(stones + cost) % ring_size] += m * rate
+            else:
+                dest[level + 1] += m * rate
+            dest[fail_level] += m * (1 - rate)
+
+        if stones >= 2 * TAIL_WINDOW and stones % TAIL_WINDOW == 0:
+            survival = 1 - cost_cdf[-1]
+            previous = 1 - cost_cdf[-1 - TAIL_WINDOW]
+            if survival <= 0.0 or previous <= 0.0:
+                continue
+            ratio = (survival / previous) ** (1 / TAIL_WINDOW)
+            if last_ratio is not None and abs(ratio - last_ratio) <= TAIL_TOLERANCE * ratio:
+                return cost_cdf, ratio
+            last_ratio = ratio
+
+    raise ValueError(f"强化石消耗分布在{max_stones}颗内未收敛，请调大 max_stones")
+
+
+def enhance_cost(start_level: int, target_level: int,
+                 percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+                 success_rates: Dict[int, float] = ENHANCE_SUCCESS_RATES,
+                 stone_costs: Dict[int, int] = ENHANCE_STONE_COST,
+                 max_stones: int = 2_000_000) -> EnhanceCostSummary:
+    """
+    计算单件战甲从 +start_level 强化到 +target_level 的精确成本
+    - 期望值由生灭链首达公式直接求出
+    - 百分位由逐颗强化石的概率质量推进得到（超长尾部按几何衰减外推）
+    """
+    if not 0 <= start_level <= target_level <= MAX_ENHANCE_LEVEL:
+        raise ValueError(f"强化区间无效: +{start_level} → +{target_level}")
+    if start_level == target_level:
+        return EnhanceCostSummary(start_level, target_level, 0.0, 0.0,
+                                  {q: 0 for q in percentiles}, [1.0])
+
+    steps = expected_step_costs(target_level, success_rates, stone_costs)
+    expected_stones = sum(stones for stones, _ in steps[start_level:])
+    expected_attempts = sum(attempts for _, attempts in steps[start_level:])
+
+    cost_cdf, tail_ratio = _cost_distribution(start_level, target_level,
+                                              success_rates, stone_costs, max_stones)
+    stone_percentiles = {}
+    for q in percentiles:
+        exact = next((x for x, p in enumerate(cost_cdf) if p >= q), None)
+        if exact is None and tail_ratio == 0.0:
+            exact = len(cost_cdf) - 1
+        elif exact is None:
+            # S(x) = S(x0) * ratio^(x - x0)，求 S(x) <= 1 - q 的最小 x
+            x0 = len(cost_cdf) - 1
+            survival = 1 - cost_cdf[x0]
+            exact = x0 + math.ceil(math.log((1 - q) / survival) / math.log(tail_ratio))
+        stone_percentiles[q] = exact
+
+    return EnhanceCostSummary(start_level, target_level, expected_stones, expected_attempts,
+                              stone_percentiles, cost_cdf, tail_ratio)
+
+
+def print_enhance_plan(targets: Sequence[int] = (5, 10, 15, 20), start_level: int = 0):
+    """打印强化规划表"""
+    print("\n" + "="*60)
+    print("强化成本精确分析（单件战甲）")
+    print("="*60)
+    for target in targets:
+        summary = enhance_cost(start_level, target)
+        pct = ' '.join(f"P{int(q*100)}={x}" for q, x in summary.stone_percentiles.items())
+        print(f"  +{start_level}→+{target:2d}: 期望强化石={summary.expected_stones:.1f} "
+              f"期望尝试={summary.expected_attempts:.1f}")
+        print(f"           {pct}")
+
+
+if __name__ == '__main__':
+    print_enhance_plan()
@@ -7,12 +7,38 @@
 - 伤害计算公式来自 BattleSystem.ts
 - 强化/升华规则来自 EquipmentStatCalculator.ts
 - 敌人数据来自 locations.ts (联邦科技星系列)
+
+所有随机判定都通过可注入的 random.Random 实例完成（参数 rng），
+未传入时回退到全局 random 模块；GameSimulator 持有独立的种子化实例。
+批量掉落等向量化路径在安装了 NumPy 时启用，否则回退到逐次抽样。
+强化表、战甲基础属性和星球敌人名单/BOSS属性在导入时从 TS 源码快照加载（见 ts_constants.py）。
 """
 
+import json
+import math
+import os
 import random
-from dataclasses import dataclass, field
-from typing import List, Dict, Tuple
-from enum import Enum
+import struct
+from array import array
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from itertools import islice
+from types import MappingProxyType
+from typing import List, Dict, Set, Tuple, Optional, Iterable, Iterator
+from enum import Enum, IntEnum
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖：缺失时批量接口回退到逐次抽样
+    np = None
+
+from ts_constants import load_ts_constants
+
+# 从 TS 源码提取的常量（按源文件哈希缓存为快照）；找不到源码时为 None，沿用下方手工抄录的数值
+TS_CONSTANTS = load_ts_constants()
 
 # ============ 战甲品质系统 ============
 class ArmorQuality(Enum):
@@ -67,6 +93,11 @@ MATERIAL_NAMES = {
     'mat_010': '量子紧固组件',
 }
 
+# 材料/品质在计数矩阵中的下标
+MATERIAL_INDEX = {mat_id: i for i, mat_id in enumerate(MATERIALS)}
+QUALITY_ORDER = list(ArmorQuality)
+QUALITY_COUNT = len(QUALITY_ORDER)
+
 # 基础掉落率配置
 BASE_DROP_RATES = {
     'normal': {  # 普通敌人
@@ -106,9 +137,10 @@ PLANET_DROP_MODIFIERS = {
     8: {ArmorQuality.STARDUST: 0, ArmorQuality.ALLOY: -0.06, ArmorQuality.CRYSTAL: -0.06, ArmorQuality.QUANTUM: 0.08, ArmorQuality.VOID: 0.04},
 }
 
-def get_drop_rates(enemy_type: str, planet_idx: int) -> Dict[ArmorQuality, float]:
-    """获取指定敌人类型和星球的掉落率"""
-    base_rates = BASE_DROP_RATES[enemy_type].copy()
+def get_drop_rates(enemy_type: str, planet_idx: int,
+                   base_drop_rates: Optional[Dict[str, Dict[ArmorQuality, float]]] = None) -> Dict[ArmorQuality, float]:
+    """获取指定敌人类型和星球的掉落率（base_drop_rates 缺省为 BASE_DROP_RATES）"""
+    base_rates = (base_drop_rates if base_drop_rates is not None else BASE_DROP_RATES)[enemy_type].copy()
     modifiers = PLANET_DROP_MODIFIERS.get(planet_idx, PLANET_DROP_MODIFIERS[1])
     
     # 应用星球修正
@@ -120,40 +152,74 @@ def get_drop_rates(enemy_type: str, planet_idx: int) -> Dict[ArmorQuality, float
     
     return adjusted_rates
 
-def roll_material_drop(enemy_type: str, planet_idx: int) -> List[Tuple[str, ArmorQuality]]:
+def roll_material_drop(enemy_type: str, planet_idx: int, rng: random.Random = None,
+                       table: Optional['AliasTable'] = None) -> List[Tuple[str, ArmorQuality]]:
     """
     掉落材料
     - 普通敌人：随机3种材料
     - 精英敌人：随机5种材料
     - BOSS：随机7种材料
+    - table: 品质抽样表（缺省为按全局掉落率预计算的 drop_table）
     返回: [(材料ID, 品质), ...]
     """
-    drop_counts = {
-        'normal': 3,
-        'elite': 5,
-        'boss': 7,
-    }
-    
-    count = drop_counts.get(enemy_type, 3)
-    rates = get_drop_rates(enemy_type, planet_idx)
+    if rng is None:
+        rng = random
+    count = DROP_COUNTS.get(enemy_type, 3)
+    # 根据预计算的品质抽样表 roll 品质
+    sample = (table if table is not None else drop_table(enemy_type, planet_idx)).sample
     
-    drops = []
-    selected_materials = random.sample(MATERIALS, min(count, len(MATERIALS)))
-    
-    for mat_id in selected_materials:
-        # 根据概率 roll 品质
-        roll = random.random()
-        cumulative = 0
-        for quality in ArmorQuality:
-            cumulative += rates[quality]
-            if roll <= cumulative:
-                drops.append((mat_id, quality))
-                break
-        else:
-            # 默认最低品质
-            drops.append((mat_id, ArmorQuality.STARDUST))
-    
-    return drops
+    return [(mat_id, sample(rng)) for mat_id in rng.sample(MATERIALS, min(count, len(MATERIALS)))]
+
+DROP_COUNTS = {
+    'normal': 3,
+    'elite': 5,
+    'boss': 7,
+}
+
+def effective_quality_probabilities(rates: Dict[ArmorQuality, float]) -> List[float]:
+    """
+    逐品质累加判定（roll <= cumulative，超出则回退为星尘级）下每个品质的实际概率
+    修正后的掉落率之和不一定为1：超过1的部分被截断，不足1的部分归入星尘级
+    """
+    probabilities = []
+    cumulative = 0.0
+    previous = 0.0
+    for quality in ArmorQuality:
+        cumulative += rates[quality]
+        reached = min(1.0, cumulative)
+        probabilities.append(max(0.0, reached - previous))
+        previous = max(previous, reached)
+    probabilities[0] += max(0.0, 1.0 - previous)
+    return probabilities
+
+def roll_material_drops_bulk(enemy_type: str, planet_idx: int, n_kills: int,
+                             rng: random.Random = None, table: Optional['AliasTable'] = None) -> List[int]:
+    """
+    批量掉落：等价于调用 n_kills 次 roll_material_drop 并汇总
+    返回与 MaterialInventory.counts 相同布局的计数（材料 × 品质，按行展开）
+    - 每次击杀不重复地随机选取若干种材料（随机键排序）
+    - 各材料被选中的总次数再按品质概率做多项分布抽样
+    未安装 NumPy 时逐次调用 roll_material_drop 汇总
+    """
+    if rng is None:
+        rng = random
+    counts = [0] * (len(MATERIALS) * len(ArmorQuality))
+    if n_kills <= 0:
+        return counts
+    
+    if np is None:
+        for _ in range(n_kills):
+            for mat_id, quality in roll_material_drop(enemy_type, planet_idx, rng, table):
+                counts[MATERIAL_INDEX[mat_id] * len(ArmorQuality) + quality.value - 1] += 1
+        return counts
+    
+    # 由模拟器随机流派生 NumPy 发生器，保证同一种子下结果可复现
+    generator = np.random.default_rng(rng.getrandbits(64))
+    per_kill = min(DROP_COUNTS.get(enemy_type, 3), len(MATERIALS))
+    selected = np.argpartition(generator.random((n_kills, len(MATERIALS))), per_kill - 1, axis=1)[:, :per_kill]
+    picks = np.bincount(selected.ravel(), minlength=len(MATERIALS))
+    probabilities = (table if table is not None else drop_table(enemy_type, planet_idx)).probabilities
+    return generator.multinomial(picks, probabilities).ravel().tolist()
 
 # ============ 战甲基础属性（来自 nanoArmorRecipes.ts）===========
 # 更新后的数值（根据图片）
@@ -193,6 +259,14 @@ NANO_ARMOR_BASE = {
         'dodge': 2,
     },
 }
+if TS_CONSTANTS is not None:
+    NANO_ARMOR_BASE = TS_CONSTANTS['nano_armor_base']
+
+# 各部位基础属性（去掉名称），所有同部位战甲共享同一份只读字典
+NANO_ARMOR_BASE_STATS = {
+    slot: {k: v for k, v in data.items() if k != 'name'}
+    for slot, data in NANO_ARMOR_BASE.items()
+}
 
 # ============ 强化与升华规则（来自游戏实际数据）===========
 
@@ -247,6 +321,14 @@ ENHANCE_STONE_COST = {
 # 最大强化等级
 MAX_ENHANCE_LEVEL = 20
 
+if TS_CONSTANTS is not None:
+    ENHANCE_SUCCESS_RATES = TS_CONSTANTS['enhance_success_rates']
+    ENHANCE_STONE_COST = TS_CONSTANTS['enhance_stone_cost']
+    MAX_ENHANCE_LEVEL = TS_CONSTANTS['max_enhance_level']
+
+# 强化失败降级门槛：达到该等级后失败会降1级
+ENHANCE_DOWNGRADE_LEVEL = 5
+
 # 升华成功率表 (EquipmentSystem.ts)
 SUBLIMATION_SUCCESS_RATES = {
     0: 1.00,    # 0→1: 100%
@@ -342,6 +424,58 @@ def calculate_equipment_stats(base_stats: Dict, enhance_level: int, sublimation_
     
     return result
 
+# ============ 装备属性计算内核 ============
+# 把 calculate_equipment_stats 的逐键规则编译成固定顺序的向量：
+# 每件装备只编译一次 (基础值, 每级增量, 是否生效, 未生效时取值)，
+# 之后按强化/升华等级直接算出属性元组，结果与 calculate_equipment_stats 完全一致。
+
+# 属性向量顺序（与 calculate_equipment_stats 返回的键顺序一致）
+EQUIPMENT_STAT_KEYS = (
+    'attack', 'defense', 'hp', 'agility', 'speed', 'dodge', 'hit', 'crit', 'critDamage',
+    'penetration', 'penetrationPercent', 'trueDamage', 'guard', 'luck',
+)
+STAT_ATTACK, STAT_DEFENSE, STAT_HP, STAT_AGILITY, STAT_SPEED, STAT_DODGE, STAT_HIT, STAT_CRIT, \
+    STAT_CRIT_DAMAGE, STAT_PENETRATION, STAT_PENETRATION_PERCENT, STAT_TRUE_DAMAGE, STAT_GUARD, \
+    STAT_LUCK = range(len(EQUIPMENT_STAT_KEYS))
+
+# 每级强化增量
+EQUIPMENT_ENHANCE_INCREMENTS = {
+    'attack': 1, 'defense': 1, 'hp': 2, 'agility': 1, 'speed': 0.1, 'dodge': 5, 'hit': 5,
+    'crit': 1, 'critDamage': 1, 'penetration': 1, 'penetrationPercent': 1, 'trueDamage': 1,
+    'guard': 1, 'luck': 1,
+}
+# 基础值不为正时归零的属性（其余属性保留原基础值）
+EQUIPMENT_ZERO_IF_ABSENT = frozenset(('attack', 'defense', 'hp', 'speed', 'dodge', 'hit'))
+# 受升华倍数影响的属性下标
+EQUIPMENT_SUBLIMATED = (STAT_ATTACK, STAT_DEFENSE, STAT_HP)
+
+def compile_equipment_stats(base_stats: Dict) -> Tuple[Tuple, ...]:
+    """
+    编译装备属性内核
+    返回每个属性的 (基础值, 每级增量, 是否随强化成长, 未成长时取值)
+    """
+    kernel = []
+    for stat in EQUIPMENT_STAT_KEYS:
+        base = base_stats.get(stat, 0)
+        fallback = 0 if stat in EQUIPMENT_ZERO_IF_ABSENT else base
+        kernel.append((base, EQUIPMENT_ENHANCE_INCREMENTS[stat], base > 0, fallback))
+    return tuple(kernel)
+
+@lru_cache(maxsize=None)
+def _shared_equipment_kernel(base_items: Tuple) -> Tuple[Tuple, ...]:
+    """相同基础属性的装备共享同一个编译内核"""
+    return compile_equipment_stats(dict(base_items))
+
+def equipment_stat_vector(kernel: Tuple[Tuple, ...], enhance_level: int, sublimation_level: int) -> Tuple:
+    """按编译内核计算装备属性向量（顺序为 EQUIPMENT_STAT_KEYS）"""
+    vector = [base + enhance_level * step if grows else fallback
+              for base, step, grows, fallback in kernel]
+    sublimation_multiplier = (1.2 ** sublimation_level)
+    for idx in EQUIPMENT_SUBLIMATED:
+        value = vector[idx]
+        vector[idx] = int(value * sublimation_multiplier) if value > 0 else 0
+    return tuple(vector)
+
 # ============ 敌人等级系统（来自 locations.ts）===========
 ENEMY_TIERS = {
     'T1': {
@@ -606,6 +740,105 @@ FEDERAL_TECH_STARS = {
     },
 }
 
+# 敌人名单与BOSS属性以 voidCreatures.ts 为准；星球等级和敌人等级（tier）是模拟器自己的设定
+if TS_CONSTANTS is not None:
+    for _star_id, _star in FEDERAL_TECH_STARS.items():
+        _star.update(TS_CONSTANTS['federal_tech_stars'].get(_star_id, {}))
+    del _star_id, _star
+
+# ============ 虚空生物索引（来自 voidCreatures.ts）===========
+# 按 (星球ID, 普通/精英/BOSS) 分组，导入时把每个生物转成战斗用的敌人属性字典，
+# 并把各属性展开为按列元组（批量战斗直接转为数组）；抽样只需一次随机数和一次下标访问。
+
+CREATURE_TYPES = ('normal', 'elite', 'boss')
+
+# 战斗用敌人属性（simulate_battle/solve_battle/battle_batch 读取的键）
+CREATURE_STAT_KEYS = ('hp', 'attack', 'defense', 'attackSpeed', 'critRate', 'critDamage', 'guard',
+                      'hitRate', 'dodgeRate', 'penetration', 'level')
+
+def creature_enemy_stats(creature: Dict, level: int) -> Dict:
+    """
+    把 voidCreatures.ts 的生物数据转为战斗用敌人属性（与 calculate_enemy_stats 同格式）
+    - critRate 源码为百分比，转为小数（战斗中按 critRate * 100 与护心比较）
+    - guardRate 对应战斗中的护心 guard
+    - 生物没有等级字段，防御减免按所在星球等级计算
+    """
+    return {
+        'id': creature['id'],
+        'name': creature['name'],
+        'hp': creature['hp'],
+        'attack': creature['attack'],
+        'defense': creature['defense'],
+        'attackSpeed': creature['attackSpeed'],
+        'critRate': creature['critRate'] / 100,
+        'critDamage': creature['critDamage'],
+        'guard': creature['guardRate'],
+        'hitRate': creature['hitRate'],
+        'dodgeRate': creature['dodgeRate'],
+        'penetration': creature['penetration'],
+        'level': level,
+        'expReward': creature['expReward'],
+    }
+
+@dataclass(frozen=True)
+class CreatureGroup:
+    """同一星球同一类型的生物"""
+    planet_id: str
+    creature_type: str
+    enemies: Tuple[Dict, ...]
+    # 按列展开的属性 {属性: (第1只, 第2只, ...)}，顺序与 enemies 一致
+    columns: Dict[str, Tuple]
+    
+    def sample(self, rng: random.Random = None) -> Dict:
+        """随机抽取一只（等概率，与 getRandomCreature 一致）"""
+        if rng is None:
+            rng = random
+        return self.enemies[int(rng.random() * len(self.enemies))]
+
+class CreatureIndex:
+    """虚空生物名册索引：(星球ID, 类型) → CreatureGroup"""
+    __slots__ = ('groups',)
+    
+    def __init__(self, roster: Dict[str, Dict[str, List[Dict]]], planet_levels: Dict[str, int]):
+        self.groups: Dict[Tuple[str, str], CreatureGroup] = {}
+        for planet_id, by_type in roster.items():
+            level = planet_levels.get(planet_id, 1)
+            for creature_type in CREATURE_TYPES:
+                creatures = by_type.get(creature_type, [])
+                if not creatures:
+                    continue
+                enemies = tuple(creature_enemy_stats(c, level) for c in creatures)
+                columns = {k: tuple(e[k] for e in enemies) for k in CREATURE_STAT_KEYS}
+                self.groups[(planet_id, creature_type)] = CreatureGroup(planet_id, creature_type, enemies, columns)
+    
+    def get(self, planet_id: str, creature_type: str) -> Optional[CreatureGroup]:
+        return self.groups.get((planet_id, creature_type))
+    
+    def sample(self, planet_id: str, creature_type: str, rng: random.Random = None) -> Optional[Dict]:
+        """随机抽取指定星球、类型的一只生物；名册中没有时返回 None"""
+        group = self.groups.get((planet_id, creature_type))
+        return group.sample(rng) if group is not None else None
+
+# 找不到 TS 源码时为 None，战斗回退到按敌人等级计算的通用属性
+VOID_CREATURE_INDEX = (
+    CreatureIndex(TS_CONSTANTS['void_creatures'],
+                  {star_id: star['level'] for star_id, star in FEDERAL_TECH_STARS.items()})
+    if TS_CONSTANTS is not None else None
+)
+
+def campaign_enemy(star_id: str, creature_type: str, rng: random.Random = None) -> Dict:
+    """
+    通关模拟中遭遇的敌人：优先从虚空生物名册抽取，
+    名册不可用时按星球配置的敌人等级（enemyTier/eliteTier/bossTier）计算通用属性
+    """
+    if VOID_CREATURE_INDEX is not None:
+        enemy = VOID_CREATURE_INDEX.sample(star_id, creature_type, rng)
+        if enemy is not None:
+            return enemy
+    star = FEDERAL_TECH_STARS[star_id]
+    tier = star[{'normal': 'enemyTier', 'elite': 'eliteTier', 'boss': 'bossTier'}[creature_type]]
+    return calculate_enemy_stats(tier, star['level'])
+
 # ============ 玩家基础属性 ============
 PLAYER_BASE = {
     'hp': 100,
@@ -617,74 +850,139 @@ PLAYER_BASE = {
     'crit': 5,  # 会心
     'critDamage': 50,  # 暴击伤害加成%
     'guard': 5,  # 护心
+    'penetration': 0,  # 穿透（%，直接抵消防御减免）
+    'trueDamage': 0,  # 真实伤害占比%
 }
 
 # ============ 数据类 ============
-@dataclass
+@dataclass(slots=True)
 class NanoArmor:
-    """纳米战甲装备"""
+    """
+    纳米战甲装备（__slots__ 紧凑布局）
+    base_stats 默认引用 NANO_ARMOR_BASE_STATS 中的共享字典，视为只读
+    """
     slot: str
     name: str
     quality: ArmorQuality
     enhance_level: int = 0
     sublimation_level: int = 0
     base_stats: Dict = field(default_factory=dict)
+    # 编译后的属性内核与按 (强化等级, 升华等级) 缓存的属性向量
+    _stat_kernel: Tuple = field(default=None, init=False, repr=False, compare=False)
+    _stat_key: Tuple[int, int] = field(default=None, init=False, repr=False, compare=False)
+    _stat_vector: Tuple = field(default=None, init=False, repr=False, compare=False)
+    # 当前装备者（用于在等级变化时通知其刷新属性缓存）
+    _owner: 'Player' = field(default=None, init=False, repr=False, compare=False)
+    
+    def mark_stats_changed(self):
+        """
+        强化/升华等级变化后通知装备者刷新属性缓存
+        roll_enhance/roll_sublimate 等方法会自动调用；直接修改等级字段后需手动调用
+        """
+        if self._owner is not None:
+            self._owner.invalidate_stats()
+    
+    def get_stat_vector(self) -> Tuple:
+        """
+        装备属性向量（顺序为 EQUIPMENT_STAT_KEYS）
+        仅在强化等级或升华等级变化后重新计算
+        """
+        key = (self.enhance_level, self.sublimation_level)
+        if key != self._stat_key:
+            if self._stat_kernel is None:
+                self._stat_kernel = _shared_equipment_kernel(tuple(sorted(self.base_stats.items())))
+            self._stat_vector = equipment_stat_vector(self._stat_kernel, *key)
+            self._stat_key = key
+        return self._stat_vector
     
     def get_total_stats(self) -> Dict:
         """计算装备总属性"""
-        return calculate_equipment_stats(self.base_stats, self.enhance_level, self.sublimation_level)
+        return dict(zip(EQUIPMENT_STAT_KEYS, self.get_stat_vector()))
     
-    def try_sublimate(self) -> Tuple[bool, str]:
+    def roll_sublimate(self, rng: random.Random = None) -> bool:
         """
-        尝试升华装备（带成功率）
-        返回: (是否成功, 消息)
+        升华判定（不构建消息，供批量模拟使用）
+        返回: 是否成功；已达最大升华等级时返回 False
         """
+        if rng is None:
+            rng = random
         if self.sublimation_level >= MAX_SUBLIMATION_LEVEL:
-            return False, "已达到最大升华等级"
+            return False
         
         # 获取当前升华等级的成功率
         success_rate = SUBLIMATION_SUCCESS_RATES.get(self.sublimation_level, 0.0001)
         
         # 随机判定
-        if random.random() <= success_rate:
+        if rng.random() <= success_rate:
             # 升华成功
             if self.quality in QUALITY_UPGRADE_CONFIG and QUALITY_UPGRADE_CONFIG[self.quality]['next']:
                 self.quality = QUALITY_UPGRADE_CONFIG[self.quality]['next']
             self.sublimation_level += 1
+            self.mark_stats_changed()
+            return True
+        # 升华失败（不降级，只消耗资源）
+        return False
+    
+    def try_sublimate(self, rng: random.Random = None) -> Tuple[bool, str]:
+        """
+        尝试升华装备（带成功率）
+        返回: (是否成功, 消息)
+        """
+        if self.sublimation_level >= MAX_SUBLIMATION_LEVEL:
+            return False, "已达到最大升华等级"
+        success_rate = SUBLIMATION_SUCCESS_RATES.get(self.sublimation_level, 0.0001)
+        if self.roll_sublimate(rng):
             return True, f"升华成功！等级提升至{self.sublimation_level}"
-        else:
-            # 升华失败（不降级，只消耗资源）
-            return False, f"升华失败（成功率{success_rate*100:.2f}%）"
+        return False, f"升华失败（成功率{success_rate*100:.2f}%）"
     
-    def try_enhance(self) -> Tuple[bool, bool, str]:
+    def roll_enhance(self, rng: random.Random = None,
+                     success_rates: Optional[Dict[int, float]] = None) -> Tuple[bool, bool]:
         """
-        尝试强化装备（带成功率和失败降级）
-        返回: (是否成功, 是否降级, 消息)
+        强化判定（不构建消息，供批量模拟使用）
+        success_rates 缺省为 ENHANCE_SUCCESS_RATES
+        返回: (是否成功, 是否降级)；已达最大强化等级时返回 (False, False)
         """
+        if rng is None:
+            rng = random
         if self.enhance_level >= MAX_ENHANCE_LEVEL:
-            return False, False, "已达到最大强化等级"
+            return False, False
         
         # 获取当前强化等级的成功率
-        success_rate = ENHANCE_SUCCESS_RATES.get(self.enhance_level, 0.05)
+        success_rate = (success_rates if success_rates is not None else ENHANCE_SUCCESS_RATES).get(self.enhance_level, 0.05)
         
         # 随机判定
-        if random.random() <= success_rate:
+        if rng.random() <= success_rate:
             # 强化成功
             self.enhance_level += 1
+            self.mark_stats_changed()
+            return True, False
+        if self.enhance_level >= ENHANCE_DOWNGRADE_LEVEL:
+            # +5以上失败会降级
+            self.enhance_level -= 1
+            self.mark_stats_changed()
+            return False, True
+        # +5以下失败不降级
+        return False, False
+    
+    def try_enhance(self, rng: random.Random = None,
+                    success_rates: Optional[Dict[int, float]] = None) -> Tuple[bool, bool, str]:
+        """
+        尝试强化装备（带成功率和失败降级）
+        返回: (是否成功, 是否降级, 消息)
+        """
+        if self.enhance_level >= MAX_ENHANCE_LEVEL:
+            return False, False, "已达到最大强化等级"
+        success_rate = (success_rates if success_rates is not None else ENHANCE_SUCCESS_RATES).get(self.enhance_level, 0.05)
+        success, downgraded = self.roll_enhance(rng, success_rates)
+        if success:
             return True, False, f"强化成功！等级提升至+{self.enhance_level}"
-        else:
-            # 强化失败
-            if self.enhance_level >= 5:
-                # +5以上失败会降级
-                self.enhance_level -= 1
-                return False, True, f"强化失败（成功率{success_rate*100:.0f}%），等级降至+{self.enhance_level}"
-            else:
-                # +5以下失败不降级
-                return False, False, f"强化失败（成功率{success_rate*100:.0f}%），等级不变"
+        if downgraded:
+            return False, True, f"强化失败（成功率{success_rate*100:.0f}%），等级降至+{self.enhance_level}"
+        return False, False, f"强化失败（成功率{success_rate*100:.0f}%），等级不变"
     
-    def get_enhance_cost(self) -> int:
-        """获取当前强化等级所需的强化石数量"""
-        return ENHANCE_STONE_COST.get(self.enhance_level, 10)
+    def get_enhance_cost(self, stone_cost: Optional[Dict[int, int]] = None) -> int:
+        """获取当前强化等级所需的强化石数量（stone_cost 缺省为 ENHANCE_STONE_COST）"""
+        return (stone_cost if stone_cost is not None else ENHANCE_STONE_COST).get(self.enhance_level, 10)
     
     def get_sublimation_cost(self) -> int:
         """获取升华所需的神能数量"""
@@ -696,15 +994,88 @@ class NanoArmor:
         if self.quality in QUALITY_UPGRADE_CONFIG and QUALITY_UPGRADE_CONFIG[self.quality]['next']:
             self.quality = QUALITY_UPGRADE_CONFIG[self.quality]['next']
             self.sublimation_level += 1
+            self.mark_stats_changed()
             return True
         return False
     
     def enhance(self) -> bool:
         """强化装备（旧方法，100%成功）"""
         self.enhance_level += 1
+        self.mark_stats_changed()
         return True
 
-@dataclass
+# ============ 升华结果分布表 ============
+# 低等级之后的升华成功率极低（最低0.01%），逐次掷骰几乎无法覆盖8-10级，
+# 因此按 (起始升华等级, 可尝试次数) 预先算出最终等级分布并缓存，配一张别名表，抽样只需 O(1) 查表。
+# 通关模拟的每日升华（每件最多2次、失败即停、各件共用神能）不是按预算连续升华，仍逐次判定，
+# 查表抽样用于 sublimate_with_budget。
+
+@dataclass(frozen=True)
+class SublimationOutcome:
+    """给定起始等级和神能预算的升华结果分布"""
+    start_level: int
+    budget: int
+    # level_probabilities[L] = 最终停在升华等级 L 的概率
+    level_probabilities: Tuple[float, ...]
+    expected_energy: float
+    # 联合结果 (最终等级, 实际尝试次数) 的别名表，用于抽样
+    table: 'AliasTable' = field(repr=False, compare=False)
+
+@lru_cache(maxsize=None)
+def _sublimation_outcome(start_level: int, attempts: int) -> Tuple[Tuple[Tuple[int, int], ...], Tuple[float, ...]]:
+    """
+    按尝试次数推进等级分布
+    达到最大升华等级后停止尝试（不再消耗神能），其余情况用完全部次数
+    返回: (联合结果, 对应概率)
+    """
+    outcomes = []
+    probabilities = []
+    dist = {start_level: 1.0}
+    for tries in range(1, attempts + 1):
+        next_dist = {}
+        for level, p in dist.items():
+            rate = SUBLIMATION_SUCCESS_RATES.get(level, 0.0001)
+            if level + 1 >= MAX_SUBLIMATION_LEVEL:
+                # 本次成功即封顶，记录为"第 tries 次尝试后停止"
+                outcomes.append((MAX_SUBLIMATION_LEVEL, tries))
+                probabilities.append(p * rate)
+            else:
+                next_dist[level + 1] = next_dist.get(level + 1, 0.0) + p * rate
+            next_dist[level] = next_dist.get(level, 0.0) + p * (1 - rate)
+        dist = next_dist
+    for level in sorted(dist):
+        outcomes.append((level, attempts))
+        probabilities.append(dist[level])
+    return tuple(outcomes), tuple(probabilities)
+
+@lru_cache(maxsize=None)
+def sublimation_outcome(start_level: int, budget: int) -> SublimationOutcome:
+    """
+    查询升华结果分布（按 (起始等级, 神能预算) 缓存）
+    - start_level: 起始升华等级
+    - budget: 可用神能，每次尝试消耗 SUBLIMATION_DIVINE_ENERGY_COST
+    """
+    attempts = budget // SUBLIMATION_DIVINE_ENERGY_COST if start_level < MAX_SUBLIMATION_LEVEL else 0
+    outcomes, probabilities = _sublimation_outcome(start_level, attempts)
+    
+    level_probabilities = [0.0] * (MAX_SUBLIMATION_LEVEL + 1)
+    expected_energy = 0.0
+    for (level, tries), p in zip(outcomes, probabilities):
+        level_probabilities[level] += p
+        expected_energy += p * tries * SUBLIMATION_DIVINE_ENERGY_COST
+    
+    return SublimationOutcome(start_level, budget, tuple(level_probabilities), expected_energy,
+                              AliasTable(outcomes, probabilities))
+
+def sample_sublimation(start_level: int, budget: int, rng: random.Random = None) -> Tuple[int, int]:
+    """
+    从升华结果分布表中抽样一次
+    返回: (最终升华等级, 消耗神能)
+    """
+    level, tries = sublimation_outcome(start_level, budget).table.sample(rng)
+    return level, tries * SUBLIMATION_DIVINE_ENERGY_COST
+
+@dataclass(slots=True)
 class Player:
     """玩家角色"""
     level: int = 1
@@ -720,6 +1091,19 @@ class Player:
     # 战甲装备（6个槽位）
     armors: Dict[str, NanoArmor] = field(default_factory=dict)
     
+    # 属性缓存：装备、升级或战甲强化/升华时失效，每次失效版本号+1
+    stats_version: int = field(default=0, init=False, repr=False, compare=False)
+    _stats_cache: Dict = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        for armor in self.armors.values():
+            armor._owner = self
+    
+    def invalidate_stats(self):
+        """标记属性缓存失效（直接修改等级等字段后需手动调用）"""
+        self._stats_cache = None
+        self.stats_version += 1
+    
     # 升级所需经验表 (每级需要经验 = 等级 * 100)
     def get_exp_to_level(self) -> int:
         """获取升级到下一级所需经验"""
@@ -745,6 +1129,7 @@ class Player:
     def level_up(self):
         """升级 - 提升基础属性"""
         self.level += 1
+        self.invalidate_stats()
         # 每级提升基础属性
         # 攻击+2, 防御+1, 生命+10
         # 这些加成通过get_total_stats计算
@@ -762,25 +1147,33 @@ class Player:
             'crit': PLAYER_BASE['crit'],
             'critDamage': PLAYER_BASE['critDamage'],
             'guard': PLAYER_BASE['guard'],
+            'penetration': PLAYER_BASE['penetration'],
+            'trueDamage': PLAYER_BASE['trueDamage'],
         }
     
     def get_armor_stats(self) -> Dict:
         """计算战甲总属性"""
-        total = {
-            'attack': 0, 'defense': 0, 'hp': 0, 'speed': 0,
-            'crit': 0, 'critDamage': 0, 'hit': 0, 'dodge': 0,
-        }
+        attack = defense = hp = speed = crit = crit_damage = hit = dodge = penetration = true_damage = 0
         
+        # 按属性向量逐件累加
         for armor in self.armors.values():
-            stats = armor.get_total_stats()
-            for stat, value in stats.items():
-                if stat in total:
-                    if stat == 'critRate':
-                        total['crit'] += value * 100  # 转换为数值
-                    elif stat == 'critDamage':
-                        total['critDamage'] += value * 100  # 转换为数值
-                    else:
-                        total[stat] += value
+            vector = armor.get_stat_vector()
+            attack += vector[STAT_ATTACK]
+            defense += vector[STAT_DEFENSE]
+            hp += vector[STAT_HP]
+            speed += vector[STAT_SPEED]
+            crit += vector[STAT_CRIT]
+            crit_damage += vector[STAT_CRIT_DAMAGE] * 100  # 转换为数值
+            hit += vector[STAT_HIT]
+            dodge += vector[STAT_DODGE]
+            penetration += vector[STAT_PENETRATION]
+            true_damage += vector[STAT_TRUE_DAMAGE]
+        
+        total = {
+            'attack': attack, 'defense': defense, 'hp': hp, 'speed': speed,
+            'crit': crit, 'critDamage': crit_damage, 'hit': hit, 'dodge': dodge,
+            'penetration': penetration, 'trueDamage': true_damage,
+        }
         
         # 套装效果
         equipped_count = len(self.armors)
@@ -796,7 +1189,16 @@ class Player:
         return total
     
     def get_total_stats(self) -> Dict:
-        """计算玩家总属性（包含等级加成）"""
+        """
+        玩家总属性（包含等级加成）
+        结果缓存到下一次失效前反复复用，调用方请勿修改返回的字典
+        """
+        if self._stats_cache is None:
+            self._stats_cache = self._compute_total_stats()
+        return self._stats_cache
+    
+    def _compute_total_stats(self) -> Dict:
+        """重新计算玩家总属性"""
         armor_stats = self.get_armor_stats()
         base_stats = self.get_base_stats_with_level()
         
@@ -810,16 +1212,23 @@ class Player:
             'crit': base_stats['crit'] + armor_stats['crit'],
             'critDamage': base_stats['critDamage'] + armor_stats['critDamage'],
             'guard': base_stats['guard'],
+            'penetration': base_stats['penetration'] + armor_stats['penetration'],
+            'trueDamage': base_stats['trueDamage'] + armor_stats['trueDamage'],
         }
     
     def equip_armor(self, armor: NanoArmor):
         """装备战甲"""
+        replaced = self.armors.get(armor.slot)
+        if replaced is not None and replaced is not armor:
+            replaced._owner = None
+        armor._owner = self
         self.armors[armor.slot] = armor
+        self.invalidate_stats()
         stats = self.get_total_stats()
         self.max_hp = stats['hp']
         self.hp = min(self.hp, self.max_hp)
 
-@dataclass
+@dataclass(slots=True)
 class BattleResult:
     """战斗结果"""
     victory: bool
@@ -828,97 +1237,258 @@ class BattleResult:
 
 # ============ 战斗系统（来自 BattleSystem.ts）===========
 
+# 命中率上下限（%）与闪避系数
+MIN_HIT_RATE = 10
+MAX_HIT_RATE = 90
+DODGE_FACTOR = 0.8
+# 单场战斗最大回合数（超时判负）
+MAX_BATTLE_TURNS = 100
+# 敌人缺省护心与暴击伤害（名册生物自带，通用敌人取默认值）
+ENEMY_DEFAULT_GUARD = 5
+ENEMY_DEFAULT_CRIT_DAMAGE = 50
+
 def calculate_defense_reduction(defense: float, level: int = 1) -> float:
     """计算防御减免（暴雪式）"""
     return defense / (defense + level * 100 + 500)
 
-def calculate_damage(attacker_stats: Dict, defender_stats: Dict, is_player: bool = True) -> Tuple[int, bool]:
+def calculate_hit_rate(attacker_hit: float, defender_dodge: float) -> float:
+    """命中率（%）= 命中 / (命中 + 闪避 * 0.8)，限制在 10~90"""
+    rate = attacker_hit / (attacker_hit + defender_dodge * DODGE_FACTOR) * 100
+    return max(MIN_HIT_RATE, min(MAX_HIT_RATE, rate))
+
+def calculate_crit_chance(attacker_crit: float, defender_guard: float) -> float:
     """
-    计算伤害
-    来自 BattleSystem.ts 的 calculateDamage 方法
+    暴击概率（%）
+    新公式：暴击概率 = (我方会心 - 敌人护心) / (敌人护心 * 1.5)
     """
-    attacker_attack = attacker_stats['attack']
-    attacker_crit = attacker_stats['crit']
-    attacker_crit_damage = attacker_stats['critDamage']
-    
-    defender_defense = defender_stats['defense']
-    defender_guard = defender_stats['guard']
-    defender_level = defender_stats.get('level', 1)
-    
-    # 判断是否暴击
-    # 新公式：暴击概率 = (我方会心 - 敌人护心) / (敌人护心 * 1.5)
     crit_chance = 0
     if attacker_crit > defender_guard:
         crit_chance = (attacker_crit - defender_guard) / (defender_guard * 1.5) * 100
-    crit_chance = max(0, min(100, crit_chance))
-    
-    is_crit = random.random() * 100 < crit_chance
-    
-    # 基础伤害
-    damage = attacker_attack
-    
-    # 计算防御减免
-    defense_reduction = calculate_defense_reduction(defender_defense, defender_level)
-    
-    # 最终伤害
-    final_damage = damage * (1 - defense_reduction)
-    
+    return max(0, min(100, crit_chance))
+
+def _damage_pair(attack: float, crit_damage: float, defense: float, level: int,
+                 penetration: float = 0, true_damage: float = 0) -> Tuple[int, int]:
+    """
+    单次攻击的 (普通伤害, 暴击伤害)
+    - 真实伤害：攻击的 trueDamage% 无视防御
+    - 穿透：penetration% 直接从防御减免中扣除（不低于0）
+    """
+    true_part = attack * true_damage / 100
+    defense_reduction = max(0, calculate_defense_reduction(defense, level) - penetration / 100)
+    final_damage = (attack - true_part) * (1 - defense_reduction) + true_part
+    return max(1, int(final_damage)), max(1, int(final_damage * (1.5 + crit_damage / 100)))
+
+def calculate_damage(attacker_stats: Dict, defender_stats: Dict, is_player: bool = True,
+                     rng: random.Random = None) -> Tuple[int, bool]:
+    """
+    计算伤害（命中判定在调用方）
+    来自 BattleSystem.ts 的 calculateDamage 方法
+    """
+    if rng is None:
+        rng = random
+
+    is_crit = rng.random() * 100 < calculate_crit_chance(attacker_stats['crit'], defender_stats['guard'])
+
+    # 真实伤害部分无视防御，其余部分按扣除穿透后的防御减免结算
+    attack = attacker_stats['attack']
+    true_part = attack * attacker_stats.get('trueDamage', 0) / 100
+    defense_reduction = calculate_defense_reduction(defender_stats['defense'], defender_stats.get('level', 1))
+    penetration = attacker_stats.get('penetration', 0)
+    if penetration:
+        defense_reduction = max(0, defense_reduction - penetration / 100)
+    final_damage = (attack - true_part) * (1 - defense_reduction) + true_part
+
     # 暴击加成：1.5 + 暴击伤害/100
     if is_crit:
-        final_damage *= (1.5 + attacker_crit_damage / 100)
-    
+        final_damage *= (1.5 + attacker_stats['critDamage'] / 100)
+
     return max(1, int(final_damage)), is_crit
 
-def simulate_battle(player: Player, enemy: Dict) -> BattleResult:
-    """模拟一场战斗"""
-    player_stats = player.get_total_stats()
-    
-    enemy_hp = enemy['hp']
-    enemy_attack = enemy['attack']
-    enemy_defense = enemy['defense']
-    
+@dataclass(slots=True)
+class AttackProfile:
+    """
+    一方在整场战斗中的出手参数
+    双方属性在战斗中不变，开战前算一次，回合循环只做随机判定
+    """
+    interval: float      # 出手间隔（100 / 攻速）
+    hit_rate: float      # 命中率（%）
+    crit_chance: float   # 暴击概率（%）
+    normal: int          # 普通伤害
+    critical: int        # 暴击伤害
+
+def battle_profiles(player: Player, enemy: Dict) -> Tuple[AttackProfile, AttackProfile]:
+    """
+    计算 (玩家, 敌人) 的出手参数
+    敌人缺少的命中/闪避/护心/暴击伤害/穿透取通用敌人的默认值
+    """
+    stats = player.get_total_stats()
+    enemy_guard = enemy.get('guard', ENEMY_DEFAULT_GUARD)
+    player_profile = AttackProfile(
+        100 / stats['speed'],
+        calculate_hit_rate(stats['hit'], enemy.get('dodgeRate', BASE_ENEMY_STATS['dodgeRate'])),
+        calculate_crit_chance(stats['crit'], enemy_guard),
+        *_damage_pair(stats['attack'], stats['critDamage'], enemy['defense'], enemy.get('level', 1),
+                      stats['penetration'], stats['trueDamage']),
+    )
+    enemy_profile = AttackProfile(
+        100 / enemy['attackSpeed'],
+        calculate_hit_rate(enemy.get('hitRate', BASE_ENEMY_STATS['hitRate']), stats['dodge']),
+        calculate_crit_chance(enemy.get('critRate', 5) * 100, stats['guard']),
+        *_damage_pair(enemy['attack'], enemy.get('critDamage', ENEMY_DEFAULT_CRIT_DAMAGE),
+                      stats['defense'], player.level,
+                      enemy.get('penetration', 0), enemy.get('trueDamage', 0)),
+    )
+    return player_profile, enemy_profile
+
+def simulate_battle(player: Player, enemy: Dict, rng: random.Random = None,
+                    max_rounds: int = MAX_BATTLE_TURNS) -> BattleResult:
+    """
+    模拟一场战斗（与 BattleSystem.ts 的 executeBattle 一致）
+    每次出手先判定命中（未命中也消耗回合），命中后再判定暴击
+    """
+    if rng is None:
+        rng = random
+    rand = rng.random
+    player_profile, enemy_profile = battle_profiles(player, enemy)
+
+    player_interval = player_profile.interval
+    player_hit = player_profile.hit_rate
+    player_crit = player_profile.crit_chance
+    player_normal = player_profile.normal
+    player_critical = player_profile.critical
+    enemy_interval = enemy_profile.interval
+    enemy_hit = enemy_profile.hit_rate
+    enemy_crit = enemy_profile.crit_chance
+    enemy_normal = enemy_profile.normal
+    enemy_critical = enemy_profile.critical
+
     player_hp = player.hp
+    enemy_hp = enemy['hp']
     rounds = 0
-    max_rounds = 200
-    
-    player_speed = player_stats['speed']
-    enemy_speed = enemy['attackSpeed']
-    
-    player_next_turn = 100 / player_speed
-    enemy_next_turn = 100 / enemy_speed
-    
+    player_next_turn = player_interval
+    enemy_next_turn = enemy_interval
+
     while rounds < max_rounds:
         rounds += 1
-        
+
         if player_next_turn <= enemy_next_turn:
             # 玩家回合
-            player_next_turn += 100 / player_speed
-            
-            damage, is_crit = calculate_damage(player_stats, {
-                'attack': 0, 'defense': enemy_defense, 'guard': 5, 'level': enemy.get('level', 1)
-            }, is_player=True)
-            
-            enemy_hp -= damage
-            
+            player_next_turn += player_interval
+            if rand() * 100 > player_hit:
+                continue  # 未命中
+
+            enemy_hp -= player_critical if rand() * 100 < player_crit else player_normal
             if enemy_hp <= 0:
                 return BattleResult(True, rounds, player_hp)
         else:
             # 敌人回合
-            enemy_next_turn += 100 / enemy_speed
-            
-            damage, _ = calculate_damage(
-                {'attack': enemy_attack, 'crit': enemy.get('critRate', 5) * 100, 'critDamage': 50},
-                {'defense': player_stats['defense'], 'guard': player_stats['guard'], 'level': player.level},
-                is_player=False
-            )
-            
-            player_hp -= damage
-            
+            enemy_next_turn += enemy_interval
+            if rand() * 100 > enemy_hit:
+                continue  # 闪避
+
+            player_hp -= enemy_critical if rand() * 100 < enemy_crit else enemy_normal
             if player_hp <= 0:
                 return BattleResult(False, rounds, 0)
-    
+
     return BattleResult(False, rounds, player_hp)
 
+# ============ 精确胜率求解 ============
+# 每次命中只有两档伤害（普通/暴击），出手顺序由攻速唯一确定；
+# 双方受到的总伤害互相独立，因此只需分别求出"第k次出手内击杀"的概率，
+# 再按时间轴合并即可得到精确胜率和期望回合数，无需蒙特卡洛。
+
+@dataclass
+class BattleOdds:
+    """战斗精确概率（solve_battle 的结果）"""
+    win_probability: float
+    loss_probability: float
+    timeout_probability: float
+    expected_rounds: float
+
+def _binomial_step(pmf: List[float], p: float) -> List[float]:
+    """k 次试验成功次数的分布 → k+1 次"""
+    k = len(pmf)
+    return [(pmf[c] * (1 - p) if c < k else 0.0) + (pmf[c - 1] * p if c > 0 else 0.0)
+            for c in range(k + 1)]
+
+def _kill_cdf(hp: int, normal: int, critical: int, crit_p: float, max_hits: int) -> List[float]:
+    """
+    cdf[k] = k 次命中内把 hp 打到 0 以下的概率
+    列表到必定击杀（全部普通伤害也足够）为止，最长 max_hits 次命中（之后的命中次数战斗中用不到）
+    """
+    max_hits = min(max_hits, -(-hp // normal))
+    cdf = [0.0]
+    # pmf[c] = k 次攻击中恰好 c 次暴击的概率（逐次递推二项分布）
+    pmf = [1.0]
+    for k in range(1, max_hits + 1):
+        pmf = _binomial_step(pmf, crit_p)
+        if critical > normal:
+            # 需要的最少暴击次数: (k-c)*normal + c*critical >= hp
+            min_crits = max(0, -(-(hp - k * normal) // (critical - normal)))
+        else:
+            min_crits = 0 if k * normal >= hp else k + 1
+        cdf.append(min(1.0, math.fsum(pmf[min_crits:])))
+    return cdf
+
+def _cdf_at(cdf: List[float], n: int) -> float:
+    """超出列表即必定击杀（按 max_hits 截断的列表覆盖了战斗中用到的全部命中次数）"""
+    return cdf[n] if n < len(cdf) else 1.0
+
+def _attack_kill_cdf(hit_cdf: List[float], hit_p: float, attacks: int) -> List[float]:
+    """
+    把"k次命中内击杀"换算为"k次出手内击杀"（每次出手独立以 hit_p 命中）
+    返回长度 attacks + 1
+    """
+    cdf = [0.0]
+    # pmf[h] = k 次出手中恰好 h 次命中的概率
+    pmf = [1.0]
+    for _ in range(attacks):
+        pmf = _binomial_step(pmf, hit_p)
+        cdf.append(min(1.0, math.fsum(p * _cdf_at(hit_cdf, h) for h, p in enumerate(pmf))))
+    return cdf
+
+def solve_battle(player: Player, enemy: Dict, max_rounds: int = MAX_BATTLE_TURNS) -> BattleOdds:
+    """
+    精确计算 simulate_battle 的胜率、败率、超时概率与期望回合数
+    """
+    player_profile, enemy_profile = battle_profiles(player, enemy)
+
+    enemy_kill_cdf = _attack_kill_cdf(
+        _kill_cdf(enemy['hp'], player_profile.normal, player_profile.critical, player_profile.crit_chance / 100,
+                  max_rounds),
+        player_profile.hit_rate / 100, max_rounds)
+    player_kill_cdf = _attack_kill_cdf(
+        _kill_cdf(player.hp, enemy_profile.normal, enemy_profile.critical, enemy_profile.crit_chance / 100,
+                  max_rounds),
+        enemy_profile.hit_rate / 100, max_rounds)
+
+    player_next_turn = player_profile.interval
+    enemy_next_turn = enemy_profile.interval
+
+    player_attacks = 0
+    enemy_attacks = 0
+    win = loss = expected_rounds = 0.0
+    for rounds in range(1, max_rounds + 1):
+        if player_next_turn <= enemy_next_turn:
+            player_next_turn += player_profile.interval
+            player_attacks += 1
+            p = (enemy_kill_cdf[player_attacks] - enemy_kill_cdf[player_attacks - 1]) \
+                * (1 - player_kill_cdf[enemy_attacks])
+            win += p
+        else:
+            enemy_next_turn += enemy_profile.interval
+            enemy_attacks += 1
+            p = (player_kill_cdf[enemy_attacks] - player_kill_cdf[enemy_attacks - 1]) \
+                * (1 - enemy_kill_cdf[player_attacks])
+            loss += p
+        expected_rounds += rounds * p
+        if enemy_kill_cdf[player_attacks] >= 1.0 or player_kill_cdf[enemy_attacks] >= 1.0:
+            break
+
+    timeout = (1 - enemy_kill_cdf[player_attacks]) * (1 - player_kill_cdf[enemy_attacks])
+    expected_rounds += max_rounds * timeout
+    return BattleOdds(win, loss, timeout, expected_rounds)
+
 # ============ 星球探索体力与收获系统 ============
 
 class ExplorationSystem:
@@ -969,7 +1539,8 @@ class ExplorationSystem:
         'mat_010': '量子紧固组件',
     }
     
-    def __init__(self):
+    def __init__(self, rng: random.Random = None):
+        self.rng = rng if rng is not None else random
         self.stamina = self.MAX_STAMINA
         self.energy = 100  # 能量值
         self.cooling = 100  # 冷却值
@@ -977,7 +1548,8 @@ class ExplorationSystem:
         self.total_collections = 0
         self.total_rests = 0
         
-    def get_quality_drop_rates(self, planet_level: int, enemy_type: str = 'normal') -> Dict[ArmorQuality, float]:
+    @staticmethod
+    def get_quality_drop_rates(planet_level: int, enemy_type: str = 'normal') -> Dict[ArmorQuality, float]:
         """
         根据星球等级和敌人类型决定材料品质掉落概率
         与普通狩猎概率一致
@@ -1004,16 +1576,8 @@ class ExplorationSystem:
         }
     
     def roll_material_quality(self, planet_level: int) -> ArmorQuality:
-        """随机决定材料品质"""
-        rates = self.get_quality_drop_rates(planet_level)
-        roll = random.random()
-        cumulative = 0
-        
-        for quality, rate in rates.items():
-            cumulative += rate
-            if roll <= cumulative:
-                return quality
-        return ArmorQuality.STARDUST
+        """随机决定材料品质（预计算的别名表，O(1)抽样）"""
+        return exploration_drop_table(planet_level).sample(self.rng)
     
     def can_explore(self, action: str) -> bool:
         """检查是否有足够体力执行行动"""
@@ -1077,10 +1641,10 @@ class ExplorationSystem:
         self.total_collections += 1
         
         # 随机选择1种材料
-        mat_id = random.choice(self.MATERIALS)
+        mat_id = self.rng.choice(self.MATERIALS)
         
         # 随机数量 (1-3)
-        count = random.randint(1, 3)
+        count = self.rng.randint(1, 3)
         
         # 根据星球等级决定品质
         quality = self.roll_material_quality(planet_level)
@@ -1099,24 +1663,220 @@ class ExplorationSystem:
         self.consume_stamina(f'{hunt_type}_hunt')
         self.total_explorations += 1
         
+        rng = self.rng
         drops = []
         # 根据狩猎类型决定掉落数量
         if hunt_type == 'normal':
-            drop_count = random.randint(1, 2)
+            drop_count = rng.randint(1, 2)
         elif hunt_type == 'hard':
-            drop_count = random.randint(2, 3)
+            drop_count = rng.randint(2, 3)
         else:  # boss
-            drop_count = random.randint(3, 5)
+            drop_count = rng.randint(3, 5)
         
         for _ in range(drop_count):
-            mat_id = random.choice(self.MATERIALS)
+            mat_id = rng.choice(self.MATERIALS)
             quality = self.roll_material_quality(planet_level)
-            count = random.randint(1, 2)
+            count = rng.randint(1, 2)
             drops.append((mat_id, quality, count))
         
         return drops
 
 
+# ============ 掉落品质抽样表 ============
+# 导入时为每个 (敌人类型, 星球) 和每个探索星球等级预先算好实际品质概率，
+# 并构建 Walker 别名表：每次品质判定只需一次随机数和一次查表。
+
+class AliasTable:
+    """Walker 别名表：按给定离散分布 O(1) 抽样"""
+    __slots__ = ('outcomes', 'probabilities', '_accept', '_alias', '_size')
+    
+    def __init__(self, outcomes: List, probabilities: List[float]):
+        total = sum(probabilities)
+        self.outcomes = tuple(outcomes)
+        self.probabilities = tuple(p / total for p in probabilities)
+        size = len(outcomes)
+        scaled = [p * size for p in self.probabilities]
+        accept = [1.0] * size
+        alias = list(range(size))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            accept[s] = scaled[s]
+            alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        self._accept = tuple(accept)
+        self._alias = tuple(alias)
+        self._size = size
+    
+    def sample(self, rng: random.Random = None):
+        """抽取一个结果"""
+        u = (rng or random).random() * self._size
+        i = int(u)
+        return self.outcomes[i] if u - i < self._accept[i] else self.outcomes[self._alias[i]]
+
+# 修正后掉落率之和偏离1的记录: [(来源, 键, 概率和), ...]
+DROP_RATE_REPORT: List[Tuple[str, object, float]] = []
+
+def _build_quality_table(source: str, key, rates: Dict[ArmorQuality, float]) -> AliasTable:
+    """把品质掉落率转为别名表，并记录概率和不为1的配置"""
+    total = sum(rates.values())
+    if abs(total - 1.0) > 1e-9:
+        DROP_RATE_REPORT.append((source, key, total))
+    return AliasTable(QUALITY_ORDER, effective_quality_probabilities(rates))
+
+@lru_cache(maxsize=None)
+def drop_table(enemy_type: str, planet_idx: int) -> AliasTable:
+    """敌人掉落品质抽样表（未配置的星球按星球1处理）"""
+    if planet_idx not in PLANET_DROP_MODIFIERS:
+        return drop_table(enemy_type, 1)
+    return _build_quality_table('enemy', (enemy_type, planet_idx), get_drop_rates(enemy_type, planet_idx))
+
+@lru_cache(maxsize=None)
+def exploration_drop_table(planet_level: int) -> AliasTable:
+    """探索采集/狩猎的品质抽样表"""
+    return _build_quality_table('exploration', planet_level,
+                                ExplorationSystem.get_quality_drop_rates(planet_level))
+
+def print_drop_rate_report():
+    """打印掉落率校验结果"""
+    print("\n" + "="*60)
+    print("掉落率校验（修正后概率和不为100%的配置）")
+    print("="*60)
+    if not DROP_RATE_REPORT:
+        print("  全部配置概率和为100%")
+    for source, key, total in DROP_RATE_REPORT:
+        print(f"  [{source}] {key}: 概率和 {total*100:.2f}%")
+
+def _prewarm_drop_tables():
+    """预计算全部敌人掉落表和探索等级表（探索加成在10级封顶）"""
+    for enemy_type in BASE_DROP_RATES:
+        for planet_idx in PLANET_DROP_MODIFIERS:
+            drop_table(enemy_type, planet_idx)
+    for planet_level in range(1, 11):
+        exploration_drop_table(planet_level)
+
+_prewarm_drop_tables()
+
+# ============ 模拟配置（平衡参数）============
+# GameSimulator 只通过 SimulationConfig 读取可调的平衡参数，参数扫描为每个配置点
+# 构造独立实例（with_overrides），不修改模块全局常量，多个配置可在同一进程内并存。
+
+# 表字段（构造时复制为只读的 MappingProxyType）
+_CONFIG_TABLE_FIELDS = ('enhance_success_rates', 'enhance_stone_cost', 'base_drop_rates')
+
+@dataclass(frozen=True)
+class SimulationConfig:
+    """
+    一组平衡参数（缺省值即模块常量和通关模拟中的挂机收益）
+    表字段在构造时复制为只读映射（MappingProxyType），修改参数请用 with_overrides
+    """
+    enhance_success_rates: Mapping[int, float] = field(default_factory=lambda: ENHANCE_SUCCESS_RATES)
+    enhance_stone_cost: Mapping[int, int] = field(default_factory=lambda: ENHANCE_STONE_COST)
+    base_drop_rates: Mapping[str, Mapping[ArmorQuality, float]] = field(default_factory=lambda: BASE_DROP_RATES)
+    # 挂机收益（1级机器人每小时）与每击败一个星球BOSS的全收益加成
+    afk_hours: int = 24
+    afk_gold_per_hour: int = 60
+    afk_exp_per_hour: int = 6
+    afk_materials_per_hour: int = 10
+    afk_enhance_stones_per_hour: int = 2
+    afk_boss_bonus: float = 0.20
+    # 按掉落率构建的品质抽样表缓存（不参与比较）
+    _drop_tables: Dict[Tuple[str, int], AliasTable] = field(
+        default_factory=dict, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # 共享的 DEFAULT_CONFIG 不能被就地修改，掉落率表也不能在抽样表缓存之后被改动
+        for name in _CONFIG_TABLE_FIELDS:
+            object.__setattr__(self, name, _freeze_table(getattr(self, name)))
+    
+    def __hash__(self):
+        return hash(tuple(_hashable(getattr(self, f.name)) for f in fields(self) if f.compare))
+    
+    def drop_table(self, enemy_type: str, planet_idx: int) -> AliasTable:
+        """本配置下的敌人掉落品质抽样表（未配置的星球按星球1处理）"""
+        if planet_idx not in PLANET_DROP_MODIFIERS:
+            planet_idx = 1
+        key = (enemy_type, planet_idx)
+        table = self._drop_tables.get(key)
+        if table is None:
+            rates = get_drop_rates(enemy_type, planet_idx, self.base_drop_rates)
+            table = self._drop_tables[key] = AliasTable(QUALITY_ORDER, effective_quality_probabilities(rates))
+        return table
+    
+    def __getstate__(self):
+        # 跨进程传递时不携带抽样表缓存；只读映射不能 pickle，按普通字典传递
+        return {f.name: _copy_table(getattr(self, f.name)) if f.name in _CONFIG_TABLE_FIELDS else getattr(self, f.name)
+                for f in fields(self) if f.init}
+    
+    def __setstate__(self, state):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, '_drop_tables', {})
+        self.__post_init__()
+    
+    def with_overrides(self, overrides: Dict[str, object]) -> 'SimulationConfig':
+        """
+        返回应用覆盖后的新配置（自身不变）
+        键为字段名或以点分隔的路径，路径中的表键按原表键类型解析；
+        表字段的值为字典时逐键覆盖（等价于展开为路径）：
+            {'afk_gold_per_hour': 80,
+             'enhance_success_rates.10': 0.6,
+             'base_drop_rates': {'normal': {'VOID': 0.08}}}
+        """
+        values = {f.name: getattr(self, f.name) for f in fields(self) if f.init}
+        copied = set()
+        for path, value in _flatten_overrides(overrides, values):
+            name, *keys = path.split('.')
+            if name not in values:
+                raise KeyError(f"未知的配置项: {name}")
+            if not keys:
+                values[name] = value
+                copied.discard(name)
+                continue
+            if name not in copied:
+                values[name] = _copy_table(values[name])
+                copied.add(name)
+            table = values[name]
+            for key in keys[:-1]:
+                table = table[_table_key(table, key)]
+            table[_table_key(table, keys[-1])] = value
+        return SimulationConfig(**values)
+
+def _flatten_overrides(overrides: Dict[str, object], values: Dict[str, object]) -> Iterator[Tuple[str, object]]:
+    """把对表字段的字典覆盖展开为逐键路径（JSON 网格只能写字符串键）"""
+    for path, value in overrides.items():
+        target = values.get(path.split('.')[0])
+        if isinstance(value, dict) and isinstance(target, Mapping):
+            yield from _flatten_overrides({f'{path}.{key}': v for key, v in value.items()}, values)
+        else:
+            yield path, value
+
+def _copy_table(table: Mapping) -> Dict:
+    """逐层复制为可修改的嵌套字典（叶子值不可变）"""
+    return {k: _copy_table(v) if isinstance(v, Mapping) else v for k, v in table.items()}
+
+def _freeze_table(table: Mapping) -> MappingProxyType:
+    """逐层复制为只读映射"""
+    return MappingProxyType({k: _freeze_table(v) if isinstance(v, Mapping) else v for k, v in table.items()})
+
+def _hashable(value):
+    """表字段转为可哈希的形式（键可能是不可排序的品质枚举，用 frozenset）"""
+    if isinstance(value, Mapping):
+        return frozenset((k, _hashable(v)) for k, v in value.items())
+    return value
+
+def _table_key(table: Dict, key: str):
+    """把路径中的文本键解析为表中实际的键（字符串、整数等级或品质枚举）"""
+    for candidate in table:
+        if candidate == key or str(candidate) == key or (
+                isinstance(candidate, ArmorQuality) and candidate.name == key.upper()):
+            return candidate
+    raise KeyError(f"配置表中没有键: {key}")
+
+DEFAULT_CONFIG = SimulationConfig()
+
 # ============ 商店系统 ============
 
 class ShopSystem:
@@ -1176,10 +1936,178 @@ class ShopSystem:
         return self.items.get(item_id)
 
 
+# ============ 材料库存 ============
+
+class MaterialInventory:
+    """
+    材料库存：10种材料 × 5种品质的整数计数矩阵（按行展开的扁平列表）
+    保留 {(材料ID, 品质): 数量} 的字典式读取接口，只列出数量大于0的条目
+    """
+    
+    def __init__(self):
+        self.counts = [0] * (len(MATERIALS) * QUALITY_COUNT)
+    
+    @staticmethod
+    def _index(mat_id: str, quality: ArmorQuality) -> int:
+        return MATERIAL_INDEX[mat_id] * QUALITY_COUNT + quality.value - 1
+    
+    def add(self, mat_id: str, quality: ArmorQuality, count: int = 1):
+        """增加材料"""
+        self.counts[self._index(mat_id, quality)] += count
+    
+    def add_counts(self, counts: List[int]):
+        """按相同布局整块累加计数（用于批量掉落）"""
+        self.counts = [a + b for a, b in zip(self.counts, counts)]
+    
+    def get(self, key: Tuple[str, ArmorQuality], default: int = 0) -> int:
+        count = self.counts[self._index(*key)]
+        return count if count > 0 else default
+    
+    def __getitem__(self, key: Tuple[str, ArmorQuality]) -> int:
+        count = self.counts[self._index(*key)]
+        if count <= 0:
+            raise KeyError(key)
+        return count
+    
+    def __setitem__(self, key: Tuple[str, ArmorQuality], count: int):
+        self.counts[self._index(*key)] = count
+    
+    def __contains__(self, key) -> bool:
+        return self.counts[self._index(*key)] > 0
+    
+    def items(self):
+        """遍历所有数量大于0的 ((材料ID, 品质), 数量)"""
+        counts = self.counts
+        for mat_idx, mat_id in enumerate(MATERIALS):
+            row = mat_idx * QUALITY_COUNT
+            for q_idx, quality in enumerate(QUALITY_ORDER):
+                if counts[row + q_idx] > 0:
+                    yield (mat_id, quality), counts[row + q_idx]
+    
+    def __iter__(self):
+        return (key for key, _ in self.items())
+    
+    def __len__(self) -> int:
+        return sum(1 for count in self.counts if count > 0)
+    
+    def quality_totals(self) -> List[int]:
+        """按品质汇总的数量（下标为品质顺序）"""
+        counts = self.counts
+        return [sum(counts[q_idx::QUALITY_COUNT]) for q_idx in range(QUALITY_COUNT)]
+    
+    def synthesize_one(self, from_quality: ArmorQuality) -> Optional[str]:
+        """按材料顺序找到第一种可合成的材料，执行一次5→1合成，返回材料ID"""
+        q_idx = from_quality.value - 1
+        counts = self.counts
+        for mat_idx, mat_id in enumerate(MATERIALS):
+            idx = mat_idx * QUALITY_COUNT + q_idx
+            if counts[idx] >= MATERIAL_SYNTHESIS_RATIO:
+                counts[idx] -= MATERIAL_SYNTHESIS_RATIO
+                counts[idx + 1] += 1
+                return mat_id
+        return None
+    
+    def synthesize_all(self) -> List[int]:
+        """
+        一次性完成所有合成：逐级把 floor(数量/5) 进位到下一品质
+        返回每个起始品质的合成次数（与逐次合成到无法合成的结果一致）
+        """
+        counts = self.counts
+        conversions = [0] * (QUALITY_COUNT - 1)
+        for q_idx in range(QUALITY_COUNT - 1):
+            total = 0
+            for idx in range(q_idx, len(counts), QUALITY_COUNT):
+                made = counts[idx] // MATERIAL_SYNTHESIS_RATIO
+                if made:
+                    counts[idx] -= made * MATERIAL_SYNTHESIS_RATIO
+                    counts[idx + 1] += made
+                    total += made
+            conversions[q_idx] = total
+        return conversions
+
+# ============ 模拟日志 ============
+class LogLevel(IntEnum):
+    QUIET = 0      # 不输出（批量运行）
+    SUMMARY = 1    # 开场、BOSS挑战结果、通关与最终材料汇总
+    PROGRESS = 2   # 每10天的进度与状态（默认）
+    DEBUG = 3      # 强化/升华明细
+
+@dataclass(slots=True)
+class LogEvent:
+    """一条结构化日志事件"""
+    level: LogLevel
+    kind: str       # 事件类型，如 'boss_victory'、'afk_income'
+    day: int
+    message: str
+    data: Dict = field(default_factory=dict)
+
+def print_event(event: LogEvent):
+    """默认处理器：打印事件文本"""
+    print(event.message)
+
+class SimulationLog:
+    """
+    模拟日志：按级别过滤，事件交给 handler 处理（默认打印）
+    调用方先用 enabled() 判断，未启用的级别不会构建任何消息字符串或事件数据；
+    emit() 自身也会丢弃未启用级别的事件（兜底，但此时消息字符串已经构建）
+    """
+    __slots__ = ('level', 'handler')
+    
+    def __init__(self, level: LogLevel = LogLevel.PROGRESS, handler=None):
+        self.level = level
+        self.handler = handler if handler is not None else print_event
+    
+    def enabled(self, level: LogLevel) -> bool:
+        return level <= self.level
+    
+    def emit(self, level: LogLevel, kind: str, day: int, message: str, /, **data):
+        if level > self.level:
+            return
+        self.handler(LogEvent(level, kind, day, message, data))
+
+# 静默日志（批量运行共用）
+QUIET_LOG = SimulationLog(LogLevel.QUIET)
+
+# ============ 事件随机子流（共同随机数）============
+# A/B 对比时两个模拟器共用同一种子，但各自的随机数消耗不同（例如强化次数不同），
+# 单条随机流会在第一次分歧后整体错位。按事件类别拆分主流，每次事件再从主流取一个
+# 种子派生子流：第 k 场战斗、第 k 次掉落在两边总是使用同一条子流，无论之前消耗了多少随机数。
+
+# 事件类别：材料掉落 / 强化与升华 / 战斗（含敌人抽取） / BOSS挑战决策
+EVENT_STREAMS = ('drops', 'enhance', 'battle', 'boss')
+
+class EventStreams:
+    """按事件类别拆分的随机流"""
+    __slots__ = ('streams',)
+    
+    def __init__(self, seed: Optional[int] = None):
+        master = random.Random(seed)
+        self.streams = {name: random.Random(master.getrandbits(64)) for name in EVENT_STREAMS}
+    
+    def event(self, name: str) -> random.Random:
+        """为下一次 name 类事件派生独立子流"""
+        return random.Random(self.streams[name].getrandbits(64))
+
 # ============ 游戏流程模拟 ============
 
+# 联邦科技星通关模拟的最大天数
+CAMPAIGN_DAYS = 100
+# 联邦科技星攻略顺序
+FEDERAL_STAR_ORDER = ('planet_alpha', 'planet_beta', 'planet_helios', 'planet_gamma',
+                      'planet_delta', 'planet_eta', 'planet_epsilon', 'planet_zeta')
+
 class GameSimulator:
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None, rng: random.Random = None,
+                 log: Optional[SimulationLog] = None, config: Optional[SimulationConfig] = None,
+                 streams: Optional[EventStreams] = None):
+        # 模拟器独立随机数发生器（相同种子可逐位复现整轮模拟）
+        self.rng = rng if rng is not None else random.Random(seed)
+        # 按事件类别拆分的随机流（A/B 对比的共同随机数模式）；为 None 时所有事件共用 self.rng
+        self.streams = streams
+        # 日志（默认 PROGRESS 级别打印；批量运行传入 QUIET_LOG）
+        self.log = log if log is not None else SimulationLog()
+        # 平衡参数（参数扫描时每个配置点传入各自的实例）
+        self.config = config if config is not None else DEFAULT_CONFIG
         self.player = Player()
         self.day = 1
         self.total_battles = 0
@@ -1188,7 +2116,7 @@ class GameSimulator:
         self.enhance_stones = 100
         self.gold = 0  # 信用点
         # 材料库存: {(材料ID, 品质): 数量}
-        self.materials: Dict[Tuple[str, ArmorQuality], int] = {}
+        self.materials = MaterialInventory()
         self.total_materials_dropped = 0
         # 挂机收益统计
         self.total_afk_gold = 0
@@ -1205,10 +2133,30 @@ class GameSimulator:
         # 今日已挑战BOSS的星球（每天只能挑战一次，失败不扣除次数）
         self.today_challenged_boss: Set[str] = set()
         
+        # 通关进度：已模拟完的天数、当前星球序号（FEDERAL_STAR_ORDER）、是否已通关
+        self.campaign_started = False
+        self.completed_days = 0
+        self.star_idx = 0
+        self.cleared = False
+        
         # 新增系统
-        self.exploration = ExplorationSystem()
+        self.exploration = ExplorationSystem(rng=self.rng)
         self.shop = ShopSystem()
         
+    def event_rng(self, name: str) -> random.Random:
+        """name 类随机事件使用的随机流（见 EVENT_STREAMS）"""
+        return self.rng if self.streams is None else self.streams.event(name)
+    
+    def snapshot(self) -> bytes:
+        """当前状态的二进制快照（见 encode_snapshot）"""
+        return encode_snapshot(self)
+    
+    @staticmethod
+    def from_snapshot(data: bytes, seed: Optional[int] = None, log: Optional[SimulationLog] = None,
+                      config: Optional[SimulationConfig] = None) -> 'GameSimulator':
+        """从快照恢复一个独立的模拟器（见 restore_snapshot）"""
+        return restore_snapshot(data, seed, log, config)
+    
     def create_starting_armors(self) -> List[NanoArmor]:
         """创建初始战甲（星尘级）"""
         armors = []
@@ -1217,7 +2165,7 @@ class GameSimulator:
                 slot=slot,
                 name=data['name'],
                 quality=ArmorQuality.STARDUST,
-                base_stats={k: v for k, v in data.items() if k != 'name'}
+                base_stats=NANO_ARMOR_BASE_STATS[slot]
             )
             armors.append(armor)
         return armors
@@ -1227,16 +2175,23 @@ class GameSimulator:
         for armor in self.create_starting_armors():
             self.player.equip_armor(armor)
     
+    def _detail_level(self, verbose: bool) -> LogLevel:
+        """强化/升华明细的日志级别：verbose=True 时降到当前日志级别，无论日志级别都输出"""
+        return LogLevel(min(LogLevel.DEBUG, self.log.level)) if verbose else LogLevel.DEBUG
+    
     def enhance_all_armors(self, target_level: int, verbose: bool = False) -> Dict:
         """
         强化所有战甲到目标等级（带成功率和失败降级）
         返回统计信息
         """
         stats = {'success': 0, 'fail': 0, 'downgrade': 0, 'stones_used': 0}
+        rng = self.event_rng('enhance')
+        success_rates = self.config.enhance_success_rates
+        stone_cost = self.config.enhance_stone_cost
         
         for armor in self.player.armors.values():
             while armor.enhance_level < target_level and self.enhance_stones > 0:
-                cost = armor.get_enhance_cost()
+                cost = armor.get_enhance_cost(stone_cost)
                 if self.enhance_stones < cost:
                     break
                 
@@ -1245,7 +2200,7 @@ class GameSimulator:
                 stats['stones_used'] += cost
                 
                 # 尝试强化
-                success, downgraded, msg = armor.try_enhance()
+                success, downgraded = armor.roll_enhance(rng, success_rates)
                 
                 if success:
                     stats['success'] += 1
@@ -1259,8 +2214,11 @@ class GameSimulator:
                 if stats['success'] + stats['fail'] > 1000:
                     break
         
-        if verbose and (stats['success'] > 0 or stats['fail'] > 0):
-            print(f"  [强化统计] 成功{stats['success']}次, 失败{stats['fail']}次, 降级{stats['downgrade']}次, 消耗{stats['stones_used']}石")
+        detail = self._detail_level(verbose)
+        if self.log.enabled(detail) and (stats['success'] > 0 or stats['fail'] > 0):
+            self.log.emit(detail, 'enhance_summary', self.day,
+                          f"  [强化统计] 成功{stats['success']}次, 失败{stats['fail']}次, 降级{stats['downgrade']}次, 消耗{stats['stones_used']}石",
+                          **stats)
         
         return stats
     
@@ -1270,6 +2228,9 @@ class GameSimulator:
         返回统计信息
         """
         stats = {'success': 0, 'fail': 0, 'energy_used': 0}
+        detail = self._detail_level(verbose)
+        verbose = self.log.enabled(detail)
+        rng = self.event_rng('enhance')
         
         for armor in self.player.armors.values():
             cost = armor.get_sublimation_cost()
@@ -1277,7 +2238,9 @@ class GameSimulator:
             # 检查是否有足够的神能
             if self.player.divine_energy < cost:
                 if verbose:
-                    print(f"  [升华] 神能不足，需要{cost}点，当前{self.player.divine_energy}点")
+                    self.log.emit(detail, 'sublimate_no_energy', self.day,
+                                  f"  [升华] 神能不足，需要{cost}点，当前{self.player.divine_energy}点",
+                                  cost=cost, divine_energy=self.player.divine_energy)
                 continue
             
             # 消耗神能
@@ -1285,20 +2248,40 @@ class GameSimulator:
             stats['energy_used'] += cost
             
             # 尝试升华
-            success, msg = armor.try_sublimate()
+            success = armor.roll_sublimate(rng)
             
             if success:
                 stats['success'] += 1
                 if verbose:
-                    print(f"  [升华成功] {armor.name} -> 升华等级{armor.sublimation_level}")
+                    self.log.emit(detail, 'sublimate_success', self.day,
+                                  f"  [升华成功] {armor.name} -> 升华等级{armor.sublimation_level}",
+                                  slot=armor.slot, sublimation_level=armor.sublimation_level)
             else:
                 stats['fail'] += 1
         
         if verbose and (stats['success'] > 0 or stats['fail'] > 0):
-            print(f"  [升华统计] 成功{stats['success']}件, 失败{stats['fail']}件, 消耗{stats['energy_used']}神能")
+            self.log.emit(detail, 'sublimate_summary', self.day,
+                          f"  [升华统计] 成功{stats['success']}件, 失败{stats['fail']}件, 消耗{stats['energy_used']}神能",
+                          **stats)
         
         return stats
     
+    def sublimate_with_budget(self, armor: NanoArmor, budget: int) -> Tuple[int, int]:
+        """
+        用不超过 budget 的神能连续升华一件战甲（查表抽样，等价于逐次调用 try_sublimate）
+        返回: (提升的升华等级数, 消耗神能)
+        """
+        budget = min(budget, self.player.divine_energy)
+        final_level, energy_used = sample_sublimation(armor.sublimation_level, budget, self.event_rng('enhance'))
+        gained = final_level - armor.sublimation_level
+        for _ in range(gained):
+            if QUALITY_UPGRADE_CONFIG[armor.quality]['next']:
+                armor.quality = QUALITY_UPGRADE_CONFIG[armor.quality]['next']
+        armor.sublimation_level = final_level
+        armor.mark_stats_changed()
+        self.player.divine_energy -= energy_used
+        return gained, energy_used
+    
     def sublimate_all_armors_guaranteed(self):
         """升华所有战甲（旧方法，100%成功，用于兼容）"""
         for armor in self.player.armors.values():
@@ -1306,10 +2289,15 @@ class GameSimulator:
     
     def add_materials(self, drops: List[Tuple[str, ArmorQuality]]):
         """添加掉落的材料到库存"""
+        add = self.materials.add
         for mat_id, quality in drops:
-            key = (mat_id, quality)
-            self.materials[key] = self.materials.get(key, 0) + 1
-            self.total_materials_dropped += 1
+            add(mat_id, quality)
+        self.total_materials_dropped += len(drops)
+    
+    def add_material_counts(self, counts: List[int]):
+        """添加批量掉落的材料计数（roll_material_drops_bulk 的结果）"""
+        self.materials.add_counts(counts)
+        self.total_materials_dropped += sum(counts)
     
     def synthesize_materials(self, from_quality: ArmorQuality, count: int = 1) -> Tuple[int, List[Tuple[str, ArmorQuality]]]:
         """
@@ -1324,22 +2312,12 @@ class GameSimulator:
         synthesized_count = 0
         
         for _ in range(count):
-            # 查找可以合成的材料
-            for mat_id in ['mat_001', 'mat_002', 'mat_003', 'mat_004', 'mat_005',
-                          'mat_006', 'mat_007', 'mat_008', 'mat_009', 'mat_010']:
-                key = (mat_id, from_quality)
-                if self.materials.get(key, 0) >= MATERIAL_SYNTHESIS_RATIO:
-                    # 消耗5个低级材料
-                    self.materials[key] -= MATERIAL_SYNTHESIS_RATIO
-                    if self.materials[key] == 0:
-                        del self.materials[key]
-                    
-                    # 生成1个高级材料
-                    new_key = (mat_id, to_quality)
-                    self.materials[new_key] = self.materials.get(new_key, 0) + 1
-                    results.append((mat_id, to_quality))
-                    synthesized_count += 1
-                    break
+            # 查找可以合成的材料（消耗5个低级材料，生成1个高级材料）
+            mat_id = self.materials.synthesize_one(from_quality)
+            if mat_id is None:
+                break
+            results.append((mat_id, to_quality))
+            synthesized_count += 1
         
         return synthesized_count, results
     
@@ -1350,17 +2328,10 @@ class GameSimulator:
         """
         stats = {}
         
-        for from_quality in [ArmorQuality.STARDUST, ArmorQuality.ALLOY, ArmorQuality.CRYSTAL, ArmorQuality.QUANTUM]:
+        # 逐级进位合成，一次遍历完成
+        conversions = self.materials.synthesize_all()
+        for from_quality, count in zip(QUALITY_ORDER, conversions):
             to_quality = MATERIAL_SYNTHESIS_CHAIN[from_quality]
-            count = 0
-            
-            # 持续合成直到材料不足
-            while True:
-                synthesized, _ = self.synthesize_materials(from_quality, 1)
-                if synthesized == 0:
-                    break
-                count += synthesized
-            
             if count > 0:
                 stats[f"{ARMOR_QUALITY_NAMES[from_quality]}→{ARMOR_QUALITY_NAMES[to_quality]}"] = count
         
@@ -1368,21 +2339,23 @@ class GameSimulator:
     
     def get_materials_summary(self) -> Dict[str, int]:
         """获取材料汇总（按品质分组）"""
-        summary = {q: 0 for q in ARMOR_QUALITY_NAMES.values()}
-        for (mat_id, quality), count in self.materials.items():
-            summary[ARMOR_QUALITY_NAMES[quality]] += count
-        return summary
+        totals = self.materials.quality_totals()
+        return {ARMOR_QUALITY_NAMES[quality]: totals[q_idx] for q_idx, quality in enumerate(QUALITY_ORDER)}
     
-    def print_materials(self):
-        """打印材料库存"""
-        print(f"\n{'='*60}")
-        print("材料库存:")
+    def format_materials(self) -> str:
+        """材料库存文本"""
+        lines = [f"\n{'='*60}", "材料库存:"]
         summary = self.get_materials_summary()
         for quality_name, count in summary.items():
             if count > 0:
-                print(f"  {quality_name}: {count}个")
-        print(f"  总计: {self.total_materials_dropped}个")
-        print(f"{'='*60}")
+                lines.append(f"  {quality_name}: {count}个")
+        lines.append(f"  总计: {self.total_materials_dropped}个")
+        lines.append(f"{'='*60}")
+        return '\n'.join(lines)
+    
+    def print_materials(self):
+        """打印材料库存"""
+        print(self.format_materials())
     
     def get_player_power(self) -> int:
         """计算玩家战力"""
@@ -1397,290 +2370,366 @@ class GameSimulator:
         )
         return int(power)
     
-    def print_status(self):
-        """打印当前状态"""
+    def format_status(self) -> str:
+        """当前状态文本"""
         stats = self.player.get_total_stats()
         exp_needed = self.player.get_exp_to_level()
-        print(f"\n{'='*60}")
-        print(f"Day {self.day} | Lv.{self.player.level} | 战力: {self.get_player_power()} | 经验: {self.player.exp}/{exp_needed}")
-        print(f"HP: {self.player.hp}/{stats['hp']}")
-        print(f"攻击: {stats['attack']} | 防御: {stats['defense']} | 会心: {stats['crit']}")
-        print(f"攻速: {stats['speed']:.1f} | 暴击伤害: {stats['critDamage']}%")
-        print(f"强化石: {self.enhance_stones} | 神能: {self.player.divine_energy}/{self.player.max_divine_energy}")
-        print(f"战甲:")
+        lines = [
+            f"\n{'='*60}",
+            f"Day {self.day} | Lv.{self.player.level} | 战力: {self.get_player_power()} | 经验: {self.player.exp}/{exp_needed}",
+            f"HP: {self.player.hp}/{stats['hp']}",
+            f"攻击: {stats['attack']} | 防御: {stats['defense']} | 会心: {stats['crit']}",
+            f"攻速: {stats['speed']:.1f} | 暴击伤害: {stats['critDamage']}%",
+            f"强化石: {self.enhance_stones} | 神能: {self.player.divine_energy}/{self.player.max_divine_energy}",
+            f"战甲:",
+        ]
         for slot, armor in self.player.armors.items():
-            print(f"  [{slot:8s}] {ARMOR_QUALITY_NAMES[armor.quality]} +{armor.enhance_level} (升华{armor.sublimation_level})")
-        print(f"{'='*60}")
+            lines.append(f"  [{slot:8s}] {ARMOR_QUALITY_NAMES[armor.quality]} +{armor.enhance_level} (升华{armor.sublimation_level})")
+        lines.append(f"{'='*60}")
+        return '\n'.join(lines)
     
-    def simulate_federal_stars(self) -> Dict:
-        """模拟联邦科技星通关"""
-        print("="*60)
-        print("《星航荒宇》联邦科技星通关模拟")
-        print("="*60)
-        
+    def print_status(self):
+        """打印当前状态"""
+        print(self.format_status())
+    
+    def simulate_federal_stars(self, recorder=None) -> Dict:
+        """
+        模拟联邦科技星通关
+        - recorder: 可选的逐日记录器（telemetry.CampaignRecorder），每天结束时调用
+          recorder.record_day(模拟器, 天数, 当前星球序号)；为 None 时不做任何记录
+        """
+        self.start_federal_stars()
+        self.run_federal_stars(CAMPAIGN_DAYS, recorder)
+        return self.federal_stars_result(recorder)
+    
+    def start_federal_stars(self):
+        """开始联邦科技星通关（装备初始战甲）"""
+        if self.log.enabled(LogLevel.SUMMARY):
+            self.log.emit(LogLevel.SUMMARY, 'start', 0, "="*60 + "\n《星航荒宇》联邦科技星通关模拟\n" + "="*60)
         self.auto_equip()
+        self.campaign_started = True
+    
+    @property
+    def campaign_over(self) -> bool:
+        """已通关或已用完 CAMPAIGN_DAYS 天"""
+        return self.cleared or self.completed_days >= CAMPAIGN_DAYS
+    
+    def run_federal_stars(self, until_day: int = CAMPAIGN_DAYS, recorder=None):
+        """从当前进度继续模拟，直到第 until_day 天结束或提前通关"""
+        while not self.campaign_over and self.completed_days < until_day:
+            self.simulate_federal_day(recorder)
+    
+    def simulate_federal_day(self, recorder=None) -> bool:
+        """
+        模拟通关的下一天，返回当天是否通关
+        通关当天不调用 recorder（由 federal_stars_result 补记最后一天）
+        """
+        log = self.log
+        summary = log.enabled(LogLevel.SUMMARY)
+        progress = log.enabled(LogLevel.PROGRESS)
+        config = self.config
+        star_order = FEDERAL_STAR_ORDER
+        current_star_idx = self.star_idx
         
-        star_order = ['planet_alpha', 'planet_beta', 'planet_helios', 'planet_gamma', 'planet_delta', 'planet_eta', 'planet_epsilon', 'planet_zeta']
-        current_star_idx = 0
+        day = self.completed_days + 1
+        self.day = day
+        # 每10天输出一次进度
+        report = progress and day % 10 == 1
         
-        for day in range(1, 101):
-            self.day = day
-            
-            # 每天重置BOSS挑战记录
-            self.today_challenged_boss.clear()
-            
-            # 每天回复神能（每分钟1点，每天24小时=1440分钟）
-            energy_recovered = 24 * 60 * self.player.divine_energy_recover_per_minute
-            old_energy = self.player.divine_energy
-            self.player.divine_energy = min(self.player.max_divine_energy, 
-                                           self.player.divine_energy + energy_recovered)
-            actual_recovered = self.player.divine_energy - old_energy
-            
-            # 自动合成材料
-            synthesis_stats = self.auto_synthesize_all()
-            if synthesis_stats and day % 10 == 1:
-                synth_str = ', '.join([f"{k}:{v}次" for k, v in synthesis_stats.items()])
-                print(f"  [自动合成] {synth_str}")
-            
-            current_star_id = star_order[current_star_idx]
-            current_star = FEDERAL_TECH_STARS[current_star_id]
-            
-            # 每天挂机收益（24小时，每次最多8小时，领取后重新计时）
-            # 1级机器人：60信用点/小时，6经验/小时，10材料/小时，2强化石/小时
-            afk_hours = 24  # 每天最多挂机24小时（领取3次8小时）
-            
-            # 基础收益
-            base_gold = 60 * afk_hours
-            base_exp = 6 * afk_hours
-            base_materials = 10 * afk_hours
-            base_enhance_stones = 2 * afk_hours
-            
-            # 根据击败的BOSS数量增加20%全收益（每个星球不重复计算）
-            boss_bonus = 1 + (len(self.defeated_boss_stars) * 0.20)
-            
-            afk_gold = int(base_gold * boss_bonus)
-            afk_exp = int(base_exp * boss_bonus)
-            afk_materials = int(base_materials * boss_bonus)
-            afk_enhance_stones = int(base_enhance_stones * boss_bonus)
-            
-            self.gold += afk_gold
-            # 挂机获得经验，使用gain_exp方法以触发升级
-            leveled_up = self.player.gain_exp(afk_exp)
-            if leveled_up and day % 10 == 1:
-                print(f"  [升级] 挂机经验使等级提升至 Lv.{self.player.level}!")
-            self.enhance_stones += afk_enhance_stones
-            
-            # 累计挂机收益
-            self.total_afk_gold += afk_gold
-            self.total_afk_exp += afk_exp
-            self.total_afk_materials += afk_materials
-            self.total_afk_enhance_stones += afk_enhance_stones
-            
-            # 挂机材料掉落（随机品质）
-            for _ in range(afk_materials):
-                mat_id = random.choice(['mat_001', 'mat_002', 'mat_003', 'mat_004', 'mat_005',
-                                       'mat_006', 'mat_007', 'mat_008', 'mat_009', 'mat_010'])
-                # 根据当前星球决定品质
-                drops = roll_material_drop('normal', current_star_idx + 1)
-                if drops:
-                    self.add_materials(drops)
-            
-            if day % 10 == 1:
-                bonus_str = f" (+{int((boss_bonus-1)*100)}%BOSS加成)" if boss_bonus > 1 else ""
-                print(f"  [挂机收益] {afk_hours}小时{bonus_str}: {afk_gold}信用点, {afk_exp}经验, {afk_materials}材料, {afk_enhance_stones}强化石")
-            
-            if day % 10 == 1 or day <= 3:
-                self.print_status()
-            
-            # 获取敌人数据
-            enemy_tier = current_star['enemyTier']
-            enemy_level = current_star['level']
-            enemy_data = calculate_enemy_stats(enemy_tier, enemy_level)
-            
-            # 战力检查
-            player_power = self.get_player_power()
-            enemy_power = enemy_data['hp'] + enemy_data['attack'] * 10
-            power_ratio = player_power / enemy_power
-            
-            # ===== 自动强化策略（更积极） =====
-            # 根据当前星球进度设定最低强化等级要求
-            min_enhance_requirements = {
-                0: 3,   # 阿尔法宜居星: +3
-                1: 5,   # 贝塔工业星: +5
-                2: 7,   # 赫利俄斯神域星: +7
-                3: 10,  # 伽马研究星: +10
-                4: 12,  # 德尔塔军事星: +12
-                5: 15,  # 伊塔农业星: +15
-                6: 17,  # 艾普西隆贸易星: +17
-                7: 20,  # 泽塔科技星: +20
-            }
+        # 每天重置BOSS挑战记录
+        self.today_challenged_boss.clear()
+        
+        # 每天回复神能（每分钟1点，每天24小时=1440分钟）
+        energy_recovered = 24 * 60 * self.player.divine_energy_recover_per_minute
+        old_energy = self.player.divine_energy
+        self.player.divine_energy = min(self.player.max_divine_energy, 
+                                       self.player.divine_energy + energy_recovered)
+        actual_recovered = self.player.divine_energy - old_energy
+        
+        # 自动合成材料
+        synthesis_stats = self.auto_synthesize_all()
+        if synthesis_stats and report:
+            synth_str = ', '.join([f"{k}:{v}次" for k, v in synthesis_stats.items()])
+            log.emit(LogLevel.PROGRESS, 'synthesis', day, f"  [自动合成] {synth_str}", **synthesis_stats)
+        
+        current_star_id = star_order[current_star_idx]
+        current_star = FEDERAL_TECH_STARS[current_star_id]
+        
+        # 每天挂机收益（24小时，每次最多8小时，领取后重新计时）
+        # 1级机器人：60信用点/小时，6经验/小时，10材料/小时，2强化石/小时（见 SimulationConfig）
+        afk_hours = config.afk_hours  # 每天最多挂机24小时（领取3次8小时）
+        
+        # 基础收益
+        base_gold = config.afk_gold_per_hour * afk_hours
+        base_exp = config.afk_exp_per_hour * afk_hours
+        base_materials = config.afk_materials_per_hour * afk_hours
+        base_enhance_stones = config.afk_enhance_stones_per_hour * afk_hours
+        
+        # 根据击败的BOSS数量增加20%全收益（每个星球不重复计算）
+        boss_bonus = 1 + (len(self.defeated_boss_stars) * config.afk_boss_bonus)
+        
+        afk_gold = int(base_gold * boss_bonus)
+        afk_exp = int(base_exp * boss_bonus)
+        afk_materials = int(base_materials * boss_bonus)
+        afk_enhance_stones = int(base_enhance_stones * boss_bonus)
+        
+        self.gold += afk_gold
+        # 挂机获得经验，使用gain_exp方法以触发升级
+        leveled_up = self.player.gain_exp(afk_exp)
+        if leveled_up and report:
+            log.emit(LogLevel.PROGRESS, 'level_up', day, f"  [升级] 挂机经验使等级提升至 Lv.{self.player.level}!",
+                     level=self.player.level, source='afk')
+        self.enhance_stones += afk_enhance_stones
+        
+        # 累计挂机收益
+        self.total_afk_gold += afk_gold
+        self.total_afk_exp += afk_exp
+        self.total_afk_materials += afk_materials
+        self.total_afk_enhance_stones += afk_enhance_stones
+        
+        # 挂机材料掉落（随机品质，根据当前星球决定品质，整天批量结算）
+        afk_counts = roll_material_drops_bulk('normal', current_star_idx + 1, afk_materials, self.event_rng('drops'),
+                                              config.drop_table('normal', current_star_idx + 1))
+        self.add_material_counts(afk_counts)
+        
+        if report:
+            bonus_str = f" (+{int((boss_bonus-1)*100)}%BOSS加成)" if boss_bonus > 1 else ""
+            log.emit(LogLevel.PROGRESS, 'afk_income', day,
+                     f"  [挂机收益] {afk_hours}小时{bonus_str}: {afk_gold}信用点, {afk_exp}经验, {afk_materials}材料, {afk_enhance_stones}强化石",
+                     gold=afk_gold, exp=afk_exp, materials=afk_materials, enhance_stones=afk_enhance_stones)
+        
+        if progress and (day % 10 == 1 or day <= 3):
+            log.emit(LogLevel.PROGRESS, 'status', day, self.format_status())
+        
+        # 获取敌人数据
+        # 敌人抽取与战斗使用同一条战斗子流
+        battle_rng = self.event_rng('battle')
+        enemy_data = campaign_enemy(current_star_id, 'normal', battle_rng)
+        
+        # 战力检查
+        player_power = self.get_player_power()
+        enemy_power = enemy_data['hp'] + enemy_data['attack'] * 10
+        power_ratio = player_power / enemy_power
+        
+        # ===== 自动强化策略（更积极） =====
+        # 根据当前星球进度设定最低强化等级要求
+        min_enhance_requirements = {
+            0: 3,   # 阿尔法宜居星: +3
+            1: 5,   # 贝塔工业星: +5
+            2: 7,   # 赫利俄斯神域星: +7
+            3: 10,  # 伽马研究星: +10
+            4: 12,  # 德尔塔军事星: +12
+            5: 15,  # 伊塔农业星: +15
+            6: 17,  # 艾普西隆贸易星: +17
+            7: 20,  # 泽塔科技星: +20
+        }
+        
+        # 获取当前最低强化要求
+        min_target = min_enhance_requirements.get(current_star_idx, 5)
+        
+        # 如果战力不足或强化等级低于要求，进行强化
+        current_min_level = min(armor.enhance_level for armor in self.player.armors.values())
+        target_enhance = max(min_target, int((1.0 - min(power_ratio, 1.0)) * 5))
+        
+        if current_min_level < target_enhance or power_ratio < 1.2:
+            old_levels = {slot: armor.enhance_level for slot, armor in self.player.armors.items()}
+            enhance_stats = self.enhance_all_armors(target_enhance, verbose=False)
             
-            # 获取当前最低强化要求
-            min_target = min_enhance_requirements.get(current_star_idx, 5)
+            # 检查是否有提升
+            new_min_level = min(armor.enhance_level for armor in self.player.armors.values())
+            if new_min_level > current_min_level and report:
+                message = f"  [自动强化] 最低等级 +{current_min_level} -> +{new_min_level} (目标+{target_enhance}, 战力比: {power_ratio:.2f})"
+                if enhance_stats['fail'] > 0:
+                    message += f"\n    强化统计: 成功{enhance_stats['success']}次, 失败{enhance_stats['fail']}次, 降级{enhance_stats['downgrade']}次"
+                log.emit(LogLevel.PROGRESS, 'auto_enhance', day, message,
+                         old_level=current_min_level, new_level=new_min_level, **enhance_stats)
+        
+        # ===== 自动升华策略（每天尝试，优先低品质装备） =====
+        # 按品质排序，优先升华低品质装备
+        armors_by_quality = sorted(
+            self.player.armors.items(),
+            key=lambda x: (x[1].quality.value, x[1].sublimation_level)
+        )
+        
+        # 每天尝试升华，只要有神能就尝试
+        upgrade_rng = self.event_rng('enhance')
+        sub_attempts = 0
+        sub_success = 0
+        for slot, armor in armors_by_quality:
+            # 每个装备每天最多尝试升华2次
+            for _ in range(2):
+                if self.player.divine_energy >= SUBLIMATION_DIVINE_ENERGY_COST:
+                    old_quality = armor.quality
+                    old_sub_level = armor.sublimation_level
+                    
+                    # 消耗神能并尝试升华
+                    self.player.divine_energy -= SUBLIMATION_DIVINE_ENERGY_COST
+                    success = armor.roll_sublimate(upgrade_rng)
+                    sub_attempts += 1
+                    
+                    if success:
+                        sub_success += 1
+                        if report:
+                            log.emit(LogLevel.PROGRESS, 'sublimate_success', day,
+                                     f"  [升华成功] {armor.name}: {ARMOR_QUALITY_NAMES[old_quality]}(升华{old_sub_level}) -> {ARMOR_QUALITY_NAMES[armor.quality]}(升华{armor.sublimation_level})",
+                                     slot=slot, sublimation_level=armor.sublimation_level)
+                    # 失败后不再尝试同一件装备
+                    break
+                else:
+                    break
+        
+        if sub_attempts > 0 and sub_success == 0 and report:
+            log.emit(LogLevel.PROGRESS, 'sublimate_fail', day,
+                     f"  [升华] 尝试{sub_attempts}次，均未成功（神能剩余{self.player.divine_energy}）",
+                     attempts=sub_attempts, divine_energy=self.player.divine_energy)
+        
+        # 模拟战斗
+        result = simulate_battle(self.player, enemy_data, battle_rng)
+        self.total_battles += 1
+        
+        if result.victory:
+            self.total_wins += 1
             
-            # 如果战力不足或强化等级低于要求，进行强化
-            current_min_level = min(armor.enhance_level for armor in self.player.armors.values())
-            target_enhance = max(min_target, int((1.0 - min(power_ratio, 1.0)) * 5))
+            # 获得经验值（普通敌人50经验）
+            exp_gain = 50
+            leveled_up = self.player.gain_exp(exp_gain)
+            if leveled_up and report:
+                log.emit(LogLevel.PROGRESS, 'level_up', day, f"  [升级] 等级提升至 Lv.{self.player.level}!",
+                         level=self.player.level, source='battle')
             
-            if current_min_level < target_enhance or power_ratio < 1.2:
-                old_levels = {slot: armor.enhance_level for slot, armor in self.player.armors.items()}
-                enhance_stats = self.enhance_all_armors(target_enhance, verbose=False)
-                
-                # 检查是否有提升
-                new_min_level = min(armor.enhance_level for armor in self.player.armors.values())
-                if new_min_level > current_min_level and day % 10 == 1:
-                    print(f"  [自动强化] 最低等级 +{current_min_level} -> +{new_min_level} (目标+{target_enhance}, 战力比: {power_ratio:.2f})")
-                    if enhance_stats['fail'] > 0:
-                        print(f"    强化统计: 成功{enhance_stats['success']}次, 失败{enhance_stats['fail']}次, 降级{enhance_stats['downgrade']}次")
+            # 强化石掉落：普通敌人1颗
+            self.enhance_stones += 1
             
-            # ===== 自动升华策略（每天尝试，优先低品质装备） =====
-            # 按品质排序，优先升华低品质装备
-            armors_by_quality = sorted(
-                self.player.armors.items(),
-                key=lambda x: (x[1].quality.value, x[1].sublimation_level)
-            )
+            # 材料掉落（普通敌人）
+            normal_drops = roll_material_drop('normal', current_star_idx + 1, self.event_rng('drops'),
+                                              config.drop_table('normal', current_star_idx + 1))
+            self.add_materials(normal_drops)
             
-            # 每天尝试升华，只要有神能就尝试
-            sub_attempts = 0
-            sub_success = 0
-            for slot, armor in armors_by_quality:
-                # 每个装备每天最多尝试升华2次
-                for _ in range(2):
-                    if self.player.divine_energy >= SUBLIMATION_DIVINE_ENERGY_COST:
-                        old_quality = armor.quality
-                        old_sub_level = armor.sublimation_level
-                        
-                        # 消耗神能并尝试升华
-                        self.player.divine_energy -= SUBLIMATION_DIVINE_ENERGY_COST
-                        success, msg = armor.try_sublimate()
-                        sub_attempts += 1
-                        
-                        if success:
-                            sub_success += 1
-                            if day % 10 == 1:
-                                print(f"  [升华成功] {armor.name}: {ARMOR_QUALITY_NAMES[old_quality]}(升华{old_sub_level}) -> {ARMOR_QUALITY_NAMES[armor.quality]}(升华{armor.sublimation_level})")
-                        # 失败后不再尝试同一件装备
-                        break
-                    else:
-                        break
+            # 恢复生命值
+            self.player.hp = min(self.player.max_hp, self.player.hp + int(self.player.max_hp * 0.3))
             
-            if sub_attempts > 0 and sub_success == 0 and day % 10 == 1:
-                print(f"  [升华] 尝试{sub_attempts}次，均未成功（神能剩余{self.player.divine_energy}）")
+            if report:
+                drop_summary = {}
+                for mat_id, quality in normal_drops:
+                    q_name = ARMOR_QUALITY_NAMES[quality]
+                    drop_summary[q_name] = drop_summary.get(q_name, 0) + 1
+                drop_str = ', '.join([f"{q}x{c}" for q, c in drop_summary.items()])
+                enemy_name = enemy_data.get('name', current_star['enemies'][0])
+                log.emit(LogLevel.PROGRESS, 'battle_victory', day,
+                         f"  [战斗胜利] 击败{enemy_name} | 强化石x1 | 材料: {drop_str}",
+                         enemy=enemy_name, drops=drop_summary)
             
-            # 模拟战斗
-            result = simulate_battle(self.player, enemy_data)
-            self.total_battles += 1
+            # ===== BOSS挑战与扫荡系统 =====
+            # 1. 检查是否已解锁扫荡（首次击败后解锁）
+            if current_star_id in self.unlocked_sweep_stars:
+                # 已解锁扫荡，消耗10体力进行扫荡
+                if self.exploration.can_explore('challenge_boss'):  # 使用10体力
+                    self.exploration.consume_stamina('challenge_boss')
+                    # 扫荡收益 = 击败一次精英敌人
+                    sweep_exp = 50  # 精英敌人经验
+                    sweep_stones = 1  # 精英敌人强化石
+                    # 扫荡材料掉落（精英级别）
+                    sweep_drops = roll_material_drop('hard', current_star_idx + 1, self.event_rng('drops'),
+                                                     config.drop_table('hard', current_star_idx + 1))
+                    self.add_materials(sweep_drops)
+                    
+                    # 获得经验
+                    leveled_up = self.player.gain_exp(sweep_exp)
+                    if leveled_up and report:
+                        log.emit(LogLevel.PROGRESS, 'level_up', day, f"  [升级] 扫荡经验使等级提升至 Lv.{self.player.level}!",
+                                 level=self.player.level, source='sweep')
+                    self.enhance_stones += sweep_stones
+                    
+                    if report:
+                        sweep_drop_summary = {}
+                        for mat_id, quality in sweep_drops:
+                            q_name = ARMOR_QUALITY_NAMES[quality]
+                            sweep_drop_summary[q_name] = sweep_drop_summary.get(q_name, 0) + 1
+                        sweep_drop_str = ', '.join([f"{q}x{c}" for q, c in sweep_drop_summary.items()])
+                        log.emit(LogLevel.PROGRESS, 'sweep', day,
+                                 f"  [扫荡] 消耗10体力扫荡{current_star['name']} | 强化石x{sweep_stones} | 材料: {sweep_drop_str}",
+                                 star=current_star_id, drops=sweep_drop_summary)
             
-            if result.victory:
-                self.total_wins += 1
-                
-                # 获得经验值（普通敌人50经验）
-                exp_gain = 50
-                leveled_up = self.player.gain_exp(exp_gain)
-                if leveled_up and day % 10 == 1:
-                    print(f"  [升级] 等级提升至 Lv.{self.player.level}!")
-                
-                # 强化石掉落：普通敌人1颗
-                self.enhance_stones += 1
-                
-                # 材料掉落（普通敌人）
-                normal_drops = roll_material_drop('normal', current_star_idx + 1)
-                self.add_materials(normal_drops)
-                
-                # 恢复生命值
-                self.player.hp = min(self.player.max_hp, self.player.hp + int(self.player.max_hp * 0.3))
-                
-                if day % 10 == 1:
-                    drop_summary = {}
-                    for mat_id, quality in normal_drops:
-                        q_name = ARMOR_QUALITY_NAMES[quality]
-                        drop_summary[q_name] = drop_summary.get(q_name, 0) + 1
-                    drop_str = ', '.join([f"{q}x{c}" for q, c in drop_summary.items()])
-                    print(f"  [战斗胜利] 击败{current_star['enemies'][0]} | 强化石x1 | 材料: {drop_str}")
-                
-                # ===== BOSS挑战与扫荡系统 =====
-                # 1. 检查是否已解锁扫荡（首次击败后解锁）
-                if current_star_id in self.unlocked_sweep_stars:
-                    # 已解锁扫荡，消耗10体力进行扫荡
-                    if self.exploration.can_explore('challenge_boss'):  # 使用10体力
-                        self.exploration.consume_stamina('challenge_boss')
-                        # 扫荡收益 = 击败一次精英敌人
-                        sweep_exp = 50  # 精英敌人经验
-                        sweep_stones = 1  # 精英敌人强化石
-                        # 扫荡材料掉落（精英级别）
-                        sweep_drops = roll_material_drop('hard', current_star_idx + 1)
-                        self.add_materials(sweep_drops)
-                        
-                        # 获得经验
-                        leveled_up = self.player.gain_exp(sweep_exp)
-                        if leveled_up and day % 10 == 1:
-                            print(f"  [升级] 扫荡经验使等级提升至 Lv.{self.player.level}!")
-                        self.enhance_stones += sweep_stones
-                        
-                        if day % 10 == 1:
-                            sweep_drop_summary = {}
-                            for mat_id, quality in sweep_drops:
-                                q_name = ARMOR_QUALITY_NAMES[quality]
-                                sweep_drop_summary[q_name] = sweep_drop_summary.get(q_name, 0) + 1
-                            sweep_drop_str = ', '.join([f"{q}x{c}" for q, c in sweep_drop_summary.items()])
-                            print(f"  [扫荡] 消耗10体力扫荡{current_star['name']} | 强化石x{sweep_stones} | 材料: {sweep_drop_str}")
-                
-                # 2. 检查今天是否可以挑战BOSS（每天只能挑战一次，失败不扣除次数）
-                elif current_star_id not in self.today_challenged_boss:
-                    # 今天还未挑战，可以进行挑战
-                    if random.random() < 0.3:  # 30%概率决定挑战BOSS
-                        self.today_challenged_boss.add(current_star_id)  # 记录今天已挑战
-                        
-                        boss_tier = current_star['bossTier']
-                        boss_data = calculate_enemy_stats(boss_tier, enemy_level)
-                        boss_result = simulate_battle(self.player, boss_data)
-                        self.total_battles += 1
+            # 2. 检查今天是否可以挑战BOSS（每天只能挑战一次，失败不扣除次数）
+            elif current_star_id not in self.today_challenged_boss:
+                # 今天还未挑战，可以进行挑战
+                if self.event_rng('boss').random() < 0.3:  # 30%概率决定挑战BOSS
+                    self.today_challenged_boss.add(current_star_id)  # 记录今天已挑战
+                    
+                    boss_rng = self.event_rng('battle')
+                    boss_data = campaign_enemy(current_star_id, 'boss', boss_rng)
+                    boss_result = simulate_battle(self.player, boss_data, boss_rng)
+                    self.total_battles += 1
+                    
+                    if boss_result.victory:
+                        self.total_wins += 1
+                        # 获得经验值（BOSS给200经验）
+                        boss_exp = 200
+                        leveled_up = self.player.gain_exp(boss_exp)
+                        if leveled_up and summary:
+                            log.emit(LogLevel.SUMMARY, 'level_up', day, f"  [升级] 等级提升至 Lv.{self.player.level}!",
+                                     level=self.player.level, source='boss')
+                        # 强化石掉落：BOSS 5颗
+                        self.enhance_stones += 5
+                        # BOSS掉落材料
+                        boss_drops = roll_material_drop('boss', current_star_idx + 1, self.event_rng('drops'),
+                                                        config.drop_table('boss', current_star_idx + 1))
+                        self.add_materials(boss_drops)
                         
-                        if boss_result.victory:
-                            self.total_wins += 1
-                            # 获得经验值（BOSS给200经验）
-                            boss_exp = 200
-                            leveled_up = self.player.gain_exp(boss_exp)
-                            if leveled_up:
-                                print(f"  [升级] 等级提升至 Lv.{self.player.level}!")
-                            # 强化石掉落：BOSS 5颗
-                            self.enhance_stones += 5
-                            # BOSS掉落材料
-                            boss_drops = roll_material_drop('boss', current_star_idx + 1)
-                            self.add_materials(boss_drops)
-                            
+                        if summary:
                             boss_drop_summary = {}
                             for mat_id, quality in boss_drops:
                                 q_name = ARMOR_QUALITY_NAMES[quality]
                                 boss_drop_summary[q_name] = boss_drop_summary.get(q_name, 0) + 1
                             boss_drop_str = ', '.join([f"{q}x{c}" for q, c in boss_drop_summary.items()])
-                            
-                            print(f"  [BOSS胜利] 击败{current_star['name']}BOSS！ | 强化石x5 | 材料: {boss_drop_str}")
-                            # 记录击败的BOSS星球，用于挂机收益加成
-                            self.defeated_boss_stars.add(current_star_id)
-                            # 解锁该星球的扫荡功能
-                            self.unlocked_sweep_stars.add(current_star_id)
-                            current_star_idx += 1
-                            
-                            if current_star_idx >= len(star_order):
-                                print("\n" + "="*60)
-                                print("🎉 恭喜通关联邦科技星！")
-                                print("="*60)
-                                break
-                        else:
-                            # BOSS失败不扣除挑战次数（已经记录在今天挑战列表中）
-                            self.total_deaths += 1
-                            self.player.hp = self.player.max_hp
-                            if day % 10 == 1:
-                                print(f"  [BOSS失败] 挑战{current_star['name']}BOSS失败，今天不能再挑战")
-            else:
-                self.total_deaths += 1
-                self.player.hp = self.player.max_hp
-                if day % 10 == 1:
-                    print(f"  [战斗失败] 需要提升战甲")
+                            log.emit(LogLevel.SUMMARY, 'boss_victory', day,
+                                     f"  [BOSS胜利] 击败{current_star['name']}BOSS！ | 强化石x5 | 材料: {boss_drop_str}",
+                                     star=current_star_id, drops=boss_drop_summary)
+                        # 记录击败的BOSS星球，用于挂机收益加成
+                        self.defeated_boss_stars.add(current_star_id)
+                        # 解锁该星球的扫荡功能
+                        self.unlocked_sweep_stars.add(current_star_id)
+                        current_star_idx += 1
+                        self.star_idx = current_star_idx
+                        
+                        if current_star_idx >= len(star_order):
+                            self.cleared = True
+                            if summary:
+                                log.emit(LogLevel.SUMMARY, 'campaign_clear', day,
+                                         "\n" + "="*60 + "\n🎉 恭喜通关联邦科技星！\n" + "="*60)
+                    else:
+                        # BOSS失败不扣除挑战次数（已经记录在今天挑战列表中）
+                        self.total_deaths += 1
+                        self.player.hp = self.player.max_hp
+                        if report:
+                            log.emit(LogLevel.PROGRESS, 'boss_defeat', day,
+                                     f"  [BOSS失败] 挑战{current_star['name']}BOSS失败，今天不能再挑战",
+                                     star=current_star_id)
+        else:
+            self.total_deaths += 1
+            self.player.hp = self.player.max_hp
+            if report:
+                log.emit(LogLevel.PROGRESS, 'battle_defeat', day, f"  [战斗失败] 需要提升战甲")
+        
+        self.completed_days = day
+        if self.cleared:
+            return True
+        if recorder is not None:
+            recorder.record_day(self, day, current_star_idx)
+        return False
+    
+    def federal_stars_result(self, recorder=None) -> Dict:
+        """结束通关模拟：补记最后一天、输出材料汇总并返回结果"""
+        log = self.log
+        summary = log.enabled(LogLevel.SUMMARY)
+        # 通关当天不逐日记录，补记最后一天
+        if recorder is not None:
+            recorder.record_day(self, self.day, self.star_idx)
         
-        # 打印最终材料汇总
-        self.print_materials()
+        # 最终材料汇总
+        if summary:
+            log.emit(LogLevel.SUMMARY, 'materials', self.day, self.format_materials(),
+                     materials=self.get_materials_summary())
         
         return {
             'days': self.day,
@@ -1702,19 +2751,401 @@ class GameSimulator:
             'afk_enhance_stones': self.total_afk_enhance_stones,
         }
 
-def run_multiple_simulations(count: int = 5):
-    """运行多轮模拟"""
+# ============ 模拟器快照 ============
+# GameSimulator 的全部可变状态（玩家、战甲、材料、探索、商店、BOSS进度、随机数发生器）
+# 编码为紧凑的二进制快照，比 deepcopy 快得多，bytes 也可直接传给工作进程；
+# 同一快照可恢复出任意多个互不影响的模拟器，例如把第40天的状态分别接上不同的决策：
+#
+#     sim = GameSimulator(seed=1, log=QUIET_LOG)
+#     sim.start_federal_stars()
+#     sim.run_federal_stars(until_day=40)
+#     snap = sim.snapshot()
+#     a = GameSimulator.from_snapshot(snap, log=QUIET_LOG)
+#     a.enhance_all_armors(12)                     # 分支A：先强化
+#     a.run_federal_stars()
+#     results = fork_campaigns(snap, range(100), workers=8)   # 100条随机后续
+#
+# - 战甲按槽位编码（名称与基础属性取自 NANO_ARMOR_BASE）
+# - 平衡参数与日志不属于快照，恢复时另行指定（分支之间可以比较不同的配置）
+# - 使用本机字节序，用于同一台机器上的进程间传递，不作为持久化格式
+
+SNAPSHOT_MAGIC = b'GSS1'
+
+_SNAPSHOT_SIMULATOR_FIELDS = ('completed_days', 'day', 'star_idx', 'total_battles', 'total_wins', 'total_deaths',
+                              'enhance_stones', 'gold', 'total_materials_dropped', 'total_afk_gold',
+                              'total_afk_exp', 'total_afk_materials', 'total_afk_enhance_stones')
+_SNAPSHOT_PLAYER_FIELDS = ('level', 'exp', 'hp', 'max_hp', 'divine_energy', 'max_divine_energy',
+                           'divine_energy_recover_per_minute')
+_SNAPSHOT_EXPLORATION_FIELDS = ('stamina', 'energy', 'cooling', 'total_explorations', 'total_collections',
+                                'total_rests')
+_SNAPSHOT_SHOP_FIELDS = ('total_purchases', 'total_spent')
+_SNAPSHOT_ARMOR_SLOTS = tuple(NANO_ARMOR_BASE)
+_SNAPSHOT_SLOT_INDEX = {slot: i for i, slot in enumerate(_SNAPSHOT_ARMOR_SLOTS)}
+
+# 魔数、上述整数字段、商店库存、三组BOSS星球位掩码（已击败/已解锁扫荡/今日已挑战）、
+# 是否已开始、是否已通关、战甲件数、是否有事件子流
+_SNAPSHOT_HEADER = struct.Struct('=4s%dq%dq3H??BB' % (
+    len(_SNAPSHOT_SIMULATOR_FIELDS) + len(_SNAPSHOT_PLAYER_FIELDS)
+    + len(_SNAPSHOT_EXPLORATION_FIELDS) + len(_SNAPSHOT_SHOP_FIELDS),
+    len(ShopSystem.SHOP_ITEMS)))
+# 每件战甲：槽位序号、品质、强化等级、升华等级
+_SNAPSHOT_ARMOR = struct.Struct('=BBBB')
+# 随机数发生器：状态版本、是否有缓存的高斯值、高斯值，后接 Mersenne Twister 的 624 个字和位置
+_SNAPSHOT_RNG = struct.Struct('=B?d')
+_RNG_WORDS = 625
+
+def _star_mask(stars: Set[str]) -> int:
+    return sum(1 << i for i, star_id in enumerate(FEDERAL_STAR_ORDER) if star_id in stars)
+
+def _mask_stars(mask: int) -> Set[str]:
+    return {star_id for i, star_id in enumerate(FEDERAL_STAR_ORDER) if mask >> i & 1}
+
+def _pack_rng(rng: random.Random) -> bytes:
+    version, internal, gauss_next = rng.getstate()
+    return (_SNAPSHOT_RNG.pack(version, gauss_next is not None, gauss_next or 0.0)
+            + array('I', internal).tobytes())
+
+def _unpack_rng(view: memoryview, offset: int) -> Tuple[Tuple, int]:
+    """读取一个随机数发生器状态，返回 (状态, 新偏移)"""
+    version, has_gauss, gauss = _SNAPSHOT_RNG.unpack_from(view, offset)
+    offset += _SNAPSHOT_RNG.size
+    internal = array('I')
+    end = offset + _RNG_WORDS * internal.itemsize
+    internal.frombytes(view[offset:end])
+    return (version, tuple(internal), gauss if has_gauss else None), end
+
+def encode_snapshot(sim: GameSimulator) -> bytes:
+    """
+    把模拟器的完整状态编码为二进制快照（不含事件子流时约3.2KB，大部分是随机数发生器状态）
+    应在两天之间（或开始通关前）调用
+    """
+    player, exploration, shop = sim.player, sim.exploration, sim.shop
+    parts = [_SNAPSHOT_HEADER.pack(
+        SNAPSHOT_MAGIC,
+        *(getattr(sim, name) for name in _SNAPSHOT_SIMULATOR_FIELDS),
+        *(getattr(player, name) for name in _SNAPSHOT_PLAYER_FIELDS),
+        *(getattr(exploration, name) for name in _SNAPSHOT_EXPLORATION_FIELDS),
+        *(getattr(shop, name) for name in _SNAPSHOT_SHOP_FIELDS),
+        *(shop.items[item['itemId']]['stock'] for item in ShopSystem.SHOP_ITEMS),
+        _star_mask(sim.defeated_boss_stars), _star_mask(sim.unlocked_sweep_stars),
+        _star_mask(sim.today_challenged_boss),
+        sim.campaign_started, sim.cleared, len(player.armors), sim.streams is not None,
+    )]
+    for slot, armor in player.armors.items():
+        parts.append(_SNAPSHOT_ARMOR.pack(_SNAPSHOT_SLOT_INDEX[slot], armor.quality.value,
+                                          armor.enhance_level, armor.sublimation_level))
+    parts.append(array('q', sim.materials.counts).tobytes())
+    parts.append(_pack_rng(sim.rng))
+    if sim.streams is not None:
+        parts.extend(_pack_rng(sim.streams.streams[name]) for name in EVENT_STREAMS)
+    return b''.join(parts)
+
+def restore_snapshot(data: bytes, seed: Optional[int] = None, log: Optional[SimulationLog] = None,
+                     config: Optional[SimulationConfig] = None) -> GameSimulator:
+    """
+    从快照恢复一个独立的模拟器
+    - seed: None 时沿用快照中的随机状态，后续与原模拟器逐位一致；
+      给定时用该种子重置随机流（及事件子流），从同一快照派生不同的随机后续
+    - log/config: 同 GameSimulator
+    """
+    view = memoryview(data)
+    header = _SNAPSHOT_HEADER.unpack_from(view, 0)
+    if header[0] != SNAPSHOT_MAGIC:
+        raise ValueError("不是模拟器快照，或快照格式版本不一致")
+    offset = _SNAPSHOT_HEADER.size
+    *values, defeated, unlocked, challenged, started, cleared, armor_count, has_streams = header[1:]
+    
+    streams = EventStreams(seed) if has_streams and seed is not None else None
+    sim = GameSimulator(seed=seed, log=log, config=config, streams=streams)
+    player, exploration, shop = sim.player, sim.exploration, sim.shop
+    
+    for _ in range(armor_count):
+        slot_idx, quality, enhance_level, sublimation_level = _SNAPSHOT_ARMOR.unpack_from(view, offset)
+        offset += _SNAPSHOT_ARMOR.size
+        slot = _SNAPSHOT_ARMOR_SLOTS[slot_idx]
+        armor = NanoArmor(slot=slot, name=NANO_ARMOR_BASE[slot]['name'], quality=ArmorQuality(quality),
+                          enhance_level=enhance_level, sublimation_level=sublimation_level,
+                          base_stats=NANO_ARMOR_BASE_STATS[slot])
+        # 生命值等字段随后按快照恢复，这里不走 equip_armor 的逐件属性重算
+        armor._owner = player
+        player.armors[slot] = armor
+    
+    values = iter(values)
+    for target, names in ((sim, _SNAPSHOT_SIMULATOR_FIELDS), (player, _SNAPSHOT_PLAYER_FIELDS),
+                          (exploration, _SNAPSHOT_EXPLORATION_FIELDS), (shop, _SNAPSHOT_SHOP_FIELDS)):
+        for name in names:
+            setattr(target, name, next(values))
+    for item in ShopSystem.SHOP_ITEMS:
+        shop.items[item['itemId']]['stock'] = next(values)
+    player.invalidate_stats()
+    
+    sim.defeated_boss_stars = _mask_stars(defeated)
+    sim.unlocked_sweep_stars = _mask_stars(unlocked)
+    sim.today_challenged_boss = _mask_stars(challenged)
+    sim.campaign_started = started
+    sim.cleared = cleared
+    
+    counts = array('q')
+    end = offset + len(sim.materials.counts) * counts.itemsize
+    counts.frombytes(view[offset:end])
+    sim.materials.counts = counts.tolist()
+    offset = end
+    
+    state, offset = _unpack_rng(view, offset)
+    if seed is None:
+        # 探索系统与模拟器共用 self.rng，一并恢复
+        sim.rng.setstate(state)
+        if has_streams:
+            sim.streams = EventStreams()
+            for name in EVENT_STREAMS:
+                state, offset = _unpack_rng(view, offset)
+                sim.streams.streams[name].setstate(state)
+    return sim
+
+def _run_fork_chunk(snapshot: bytes, seeds: List[Optional[int]],
+                    config: Optional[SimulationConfig]) -> List[Dict]:
+    """工作进程入口：从同一快照逐个恢复分支并跑完通关"""
     results = []
+    for seed in seeds:
+        sim = restore_snapshot(snapshot, seed, QUIET_LOG, config)
+        if not sim.campaign_started:
+            sim.start_federal_stars()
+        sim.run_federal_stars()
+        results.append(sim.federal_stars_result())
+    return results
+
+def fork_campaigns(snapshot: bytes, seeds: Iterable[Optional[int]], config: Optional[SimulationConfig] = None,
+                   workers: int = 1, chunk_size: Optional[int] = None) -> List[Dict]:
+    """
+    从快照派生多条分支并各自跑完通关，按 seeds 顺序返回结果
+    - seeds: 每条分支重置随机流所用的种子（None 为沿用快照的随机状态）
+    - config: 各分支使用的平衡参数（None 为 DEFAULT_CONFIG）
+    - workers: 并行进程数（None为CPU核数），快照按字节传给工作进程
+    """
+    seeds = list(seeds)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, min(MAX_DEFAULT_CHUNK_SIZE, len(seeds) // (max(1, workers) * 4)))
+    chunks = [seeds[start:start + chunk_size] for start in range(0, len(seeds), chunk_size)]
+    if workers <= 1:
+        return [result for chunk in chunks for result in _run_fork_chunk(snapshot, chunk, config)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_run_fork_chunk, snapshot, chunk, config) for chunk in chunks]
+        return [result for future in futures for result in future.result()]
+
+# 并行模式下单个任务分块的默认上限（控制单块结果的内存占用）
+MAX_DEFAULT_CHUNK_SIZE = 1000
+
+def iter_campaign_seeds(master_seed: Optional[int], count: int) -> Iterator[int]:
+    """
+    由主种子逐个派生每轮模拟的独立种子
+    种子只与轮次序号有关，与进程数/分块方式无关，保证结果可复现
+    """
+    seeder = random.Random(master_seed)
+    for _ in range(count):
+        yield seeder.getrandbits(64)
+
+def derive_campaign_seeds(master_seed: Optional[int], count: int) -> List[int]:
+    """由主种子派生全部轮次的种子列表"""
+    return list(iter_campaign_seeds(master_seed, count))
+
+def run_campaign(seed: int, verbose: bool = False, recorder=None,
+                 config: Optional[SimulationConfig] = None, event_streams: bool = False) -> Dict:
+    """
+    以指定种子运行一轮联邦科技星通关模拟（recorder 见 simulate_federal_stars）
+    event_streams: 按事件类别拆分随机流（共同随机数模式，与默认模式的结果不同）
+    """
+    log = SimulationLog() if verbose else QUIET_LOG
+    streams = EventStreams(seed) if event_streams else None
+    return GameSimulator(seed=seed, log=log, config=config, streams=streams).simulate_federal_stars(recorder)
+
+def _run_campaign_chunk(seeds: List[int]) -> List[Dict]:
+    """工作进程入口：按顺序运行一个分块内的所有模拟"""
+    return [run_campaign(seed) for seed in seeds]
+
+def _iter_chunks(seeds: Iterator[int], chunk_size: int) -> Iterator[List[int]]:
+    """按固定大小切分种子序列"""
+    while True:
+        chunk = list(islice(seeds, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def iter_simulation_chunks(count: int, workers: int = 1, seed: Optional[int] = None,
+                           chunk_size: Optional[int] = None) -> Iterator[List[Dict]]:
+    """
+    按轮次顺序逐块产出模拟结果（静默运行）
+    同时在途的分块数有上限，调用方逐块消费即可处理任意轮数而不累积全部结果
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, min(MAX_DEFAULT_CHUNK_SIZE, count // (max(1, workers) * 4)))
+    return run_seed_chunks(_iter_chunks(iter_campaign_seeds(seed, count), chunk_size), workers)
+
+def run_seed_chunks(chunks: Iterable[List[int]], workers: int = 1) -> Iterator[List[Dict]]:
+    """
+    静默运行种子分块序列，按分块顺序逐块产出结果
+    分块序列被惰性消费，同时在途的分块不超过进程数的2倍
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield _run_campaign_chunk(chunk)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # 按提交顺序取回结果，合并结果与分块方式无关
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_run_campaign_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+# ============ 断点续跑 ============
+# 长批次把进度逐块追加到一个 JSON Lines 检查点文件：首行为任务头（轮数、主种子、
+# 种子派生器初始状态），之后每完成一块追加一条记录（游标、派生器状态、该块结果）。
+# 进程中途被杀时末尾不完整的行在续跑时丢弃，从最后一条完整记录继续；
+# 种子只与轮次序号有关，续跑的结果与不中断运行完全一致。
+
+CHECKPOINT_VERSION = 1
+
+def _encode_rng_state(state: Tuple) -> List:
+    version, internal, gauss_next = state
+    return [version, list(internal), gauss_next]
+
+def _decode_rng_state(data: List) -> Tuple:
+    version, internal, gauss_next = data
+    return version, tuple(internal), gauss_next
+
+@dataclass
+class CheckpointState:
+    """检查点文件中记录的进度"""
+    count: int
+    seed: Optional[int]
+    cursor: int              # 已完成的轮数
+    rng_state: Tuple         # 派生完前 cursor 个种子后的派生器状态
+    results: List[Dict]
+    valid_bytes: int         # 最后一条完整记录的结束位置
+
+def load_checkpoint(path: str) -> Optional[CheckpointState]:
+    """读取检查点（文件不存在或连任务头都不完整时返回 None）"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        data = f.read()
+    state = None
+    offset = 0
+    for line in data.splitlines(keepends=True):
+        if not line.endswith(b'\n'):
+            break  # 写入中断的末行
+        try:
+            record = json.loads(line)
+        except ValueError:
+            break
+        offset += len(line)
+        if state is None:
+            if record.get('version') != CHECKPOINT_VERSION:
+                raise ValueError(f"检查点 {path} 的版本 {record.get('version')} 与当前版本不一致")
+            state = CheckpointState(record['count'], record['seed'], 0,
+                                    _decode_rng_state(record['rng_state']), [], offset)
+        else:
+            state.cursor = record['cursor']
+            state.rng_state = _decode_rng_state(record['rng_state'])
+            state.results.extend(record['results'])
+            state.valid_bytes = offset
+    return state
+
+def _append_checkpoint_record(f, record: Dict):
+    """追加一行记录并落盘"""
+    f.write((json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8'))
+    f.flush()
+    os.fsync(f.fileno())
+
+def iter_checkpointed_chunks(path: str, count: int, workers: int = 1, seed: Optional[int] = None,
+                             chunk_size: Optional[int] = None) -> Iterator[List[Dict]]:
+    """
+    同 iter_simulation_chunks，每完成一块就追加到检查点文件 path
+    文件已有进度时先把已完成的结果作为一块产出，再从游标处继续；
+    续跑时 seed 可省略（沿用检查点记录的派生器状态），给出时必须与检查点一致
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, min(MAX_DEFAULT_CHUNK_SIZE, count // (max(1, workers) * 4)))
+    
+    state = load_checkpoint(path)
+    seeder = random.Random(seed)
+    if state is None:
+        cursor = 0
+        f = open(path, 'wb')
+        _append_checkpoint_record(f, {'version': CHECKPOINT_VERSION, 'count': count, 'seed': seed,
+                                      'rng_state': _encode_rng_state(seeder.getstate())})
+    else:
+        if state.count != count or (seed is not None and seed != state.seed):
+            raise ValueError(f"检查点 {path} 属于另一个任务（{state.count}轮，主种子{state.seed}）")
+        cursor = state.cursor
+        seeder.setstate(state.rng_state)
+        f = open(path, 'r+b')
+        f.truncate(state.valid_bytes)
+        f.seek(state.valid_bytes)
+        if state.results:
+            yield state.results
+    
+    # 每块种子派生完后的派生器状态，结果按分块顺序返回，与之一一对应
+    pending_states = deque()
+    
+    def seed_chunks() -> Iterator[List[int]]:
+        remaining = count - cursor
+        while remaining > 0:
+            chunk = [seeder.getrandbits(64) for _ in range(min(chunk_size, remaining))]
+            pending_states.append(seeder.getstate())
+            remaining -= len(chunk)
+            yield chunk
+    
+    with f:
+        for results in run_seed_chunks(seed_chunks(), workers):
+            cursor += len(results)
+            _append_checkpoint_record(f, {'cursor': cursor,
+                                          'rng_state': _encode_rng_state(pending_states.popleft()),
+                                          'results': results})
+            yield results
+
+def run_multiple_simulations(count: int = 5, workers: int = 1, seed: Optional[int] = None,
+                             chunk_size: Optional[int] = None, checkpoint: Optional[str] = None):
+    """
+    运行多轮模拟
+    - workers: 并行进程数（1为单进程顺序执行，None为CPU核数）
+    - seed: 主种子，相同主种子下结果列表与进程数无关
+    - chunk_size: 每个任务分块包含的模拟轮数（默认按进程数自动切分）
+    - checkpoint: 检查点文件路径，每完成一块即保存进度，重新运行时从中断处继续（见 iter_checkpointed_chunks）
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
     
     print(f"\n开始运行{count}轮模拟...\n")
     
-    for i in range(count):
-        print(f"第 {i+1}/{count} 轮模拟...")
-        sim = GameSimulator()
-        result = sim.simulate_federal_stars()
-        results.append(result)
-        status = "通关" if result['days'] < 100 else "未通关"
-        print(f"  [{status}] 用时{result['days']}天，战力{result['final_power']}")
+    if workers <= 1 and checkpoint is None:
+        results = []
+        for i, campaign_seed in enumerate(iter_campaign_seeds(seed, count)):
+            print(f"第 {i+1}/{count} 轮模拟...")
+            result = run_campaign(campaign_seed, verbose=True)
+            results.append(result)
+            status = "通关" if result['days'] < 100 else "未通关"
+            print(f"  [{status}] 用时{result['days']}天，战力{result['final_power']}")
+    else:
+        if checkpoint is not None:
+            chunks = iter_checkpointed_chunks(checkpoint, count, workers, seed, chunk_size)
+        else:
+            chunks = iter_simulation_chunks(count, workers, seed, chunk_size)
+        results = []
+        for chunk_results in chunks:
+            results.extend(chunk_results)
+        for i, result in enumerate(results):
+            status = "通关" if result['days'] < 100 else "未通关"
+            print(f"第 {i+1}/{count} 轮模拟: [{status}] 用时{result['days']}天，战力{result['final_power']}")
     
     print("\n" + "="*60)
     print("模拟结果统计")
@@ -1940,6 +3371,9 @@ if __name__ == '__main__':
     # 星球探索、体力消耗和商店系统演示
     demo_exploration_and_shop()
     
+    # 掉落率校验
+    print_drop_rate_report()
+    
     # 敌人分析
     analyze_progression()
     
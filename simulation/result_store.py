@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模拟结果列式存储
+每一列是一个定长二进制文件（array 模块原生字节序），另有 schema.json 记录列类型：
+
+    <目录>/schema.json
+    <目录>/days.bin
+    <目录>/final_power.bin
+    ...
+
+- 逐块追加：每块结果写完即可丢弃，百万轮扫描也不需要把结果全部放在内存里
+- 读取时整列 fromfile，安装了 NumPy 时可直接得到 ndarray
+- 若写入中途中断导致列长度不一致，读取时按最短列截断；重新打开写入时先把各列截断到最短列再追加
+"""
+
+import json
+import os
+import sys
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from game_simulation_v3 import (
+    ARMOR_QUALITY_NAMES,
+    NANO_ARMOR_BASE,
+    QUALITY_ORDER,
+    iter_simulation_chunks,
+)
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖，仅 as_numpy=True 时需要
+    np = None
+
+SCHEMA_FILE = 'schema.json'
+SCHEMA_VERSION = 1
+
+# 品质名称 → 品质编号（ArmorQuality.value）
+_QUALITY_VALUES = {name: quality.value for quality, name in ARMOR_QUALITY_NAMES.items()}
+
+
+def _build_columns() -> Dict[str, str]:
+    """列名 → array 类型码"""
+    columns = {
+        'run_index': 'q',
+        'days': 'i',
+        'level': 'i',
+        'total_battles': 'i',
+        'total_wins': 'i',
+        'total_deaths': 'i',
+        'win_rate': 'd',
+        'final_power': 'q',
+        'enhance_stones': 'q',
+        'total_materials': 'q',
+        'afk_gold': 'q',
+        'afk_exp': 'q',
+        'afk_materials': 'q',
+        'afk_enhance_stones': 'q',
+    }
+    for q_idx in range(len(QUALITY_ORDER)):
+        columns[f'materials_q{q_idx + 1}'] = 'q'
+    for slot in NANO_ARMOR_BASE:
+        columns[f'{slot}_quality'] = 'b'
+        columns[f'{slot}_enhance'] = 'b'
+        columns[f'{slot}_sublimation'] = 'b'
+    return columns
+
+
+COLUMNS = _build_columns()
+
+
+def _row_values(result: Dict, run_index: int) -> Dict[str, float]:
+    """把 simulate_federal_stars 的结果展开为一行列值"""
+    row = {'run_index': run_index}
+    for name in ('days', 'level', 'total_battles', 'total_wins', 'total_deaths', 'win_rate',
+                 'final_power', 'enhance_stones', 'total_materials', 'afk_gold', 'afk_exp',
+                 'afk_materials', 'afk_enhance_stones'):
+        row[name] = result[name]
+    for q_idx, quality in enumerate(QUALITY_ORDER):
+        row[f'materials_q{q_idx + 1}'] = result['materials'][ARMOR_QUALITY_NAMES[quality]]
+    for slot, armor in result['armors'].items():
+        row[f'{slot}_quality'] = _QUALITY_VALUES[armor['quality']]
+        row[f'{slot}_enhance'] = armor['enhance']
+        row[f'{slot}_sublimation'] = armor['sublimation']
+    return row
+
+
+class ResultStore:
+    """列式结果文件（目录），只追加写入"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        schema_path = os.path.join(path, SCHEMA_FILE)
+        if os.path.exists(schema_path):
+            with open(schema_path, encoding='utf-8') as f:
+                schema = json.load(f)
+            if schema['columns'] != COLUMNS or schema['byteorder'] != sys.byteorder:
+                raise ValueError(f"结果目录 {path} 的列定义与当前版本不一致")
+        else:
+            with open(schema_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': SCHEMA_VERSION, 'byteorder': sys.byteorder, 'columns': COLUMNS},
+                          f, ensure_ascii=False, indent=2)
+        self.rows = _stored_rows(path)
+        # 中断的写入会留下长短不一的列：先截断到最短列，否则后续追加的行在各列中错位
+        for name, typecode in COLUMNS.items():
+            column_path = os.path.join(path, f'{name}.bin')
+            size = self.rows * array(typecode).itemsize
+            if os.path.exists(column_path) and os.path.getsize(column_path) > size:
+                os.truncate(column_path, size)
+
+    def append(self, results: Sequence[Dict]):
+        """追加一块结果（行号接着已有行数编号）"""
+        if not results:
+            return
+        buffers = {name: array(typecode) for name, typecode in COLUMNS.items()}
+        for offset, result in enumerate(results):
+            for name, value in _row_values(result, self.rows + offset).items():
+                buffers[name].append(value)
+        for name, buffer in buffers.items():
+            with open(os.path.join(self.path, f'{name}.bin'), 'ab') as f:
+                buffer.tofile(f)
+        self.rows += len(results)
+
+    def extend(self, chunks: Iterable[Sequence[Dict]]):
+        """逐块写入一个结果分块序列"""
+        for chunk in chunks:
+            self.append(chunk)
+
+    def __len__(self) -> int:
+        return self.rows
+
+
+def _stored_rows(path: str) -> int:
+    """已写入的完整行数（取所有列中最短者）"""
+    rows = None
+    for name, typecode in COLUMNS.items():
+        column_path = os.path.join(path, f'{name}.bin')
+        size = os.path.getsize(column_path) if os.path.exists(column_path) else 0
+        count = size // array(typecode).itemsize
+        rows = count if rows is None else min(rows, count)
+    return rows or 0
+
+
+def load_results(path: str, columns: Optional[List[str]] = None, as_numpy: bool = False) -> Dict:
+    """
+    读取列式结果
+    - columns: 只读取指定列（默认全部）
+    - as_numpy: 返回 NumPy 数组（需要安装 NumPy），否则返回 array.array
+    """
+    if as_numpy and np is None:
+        raise ImportError("as_numpy=True 需要安装 NumPy")
+    names = list(COLUMNS) if columns is None else columns
+    rows = _stored_rows(path)
+    data = {}
+    for name in names:
+        typecode = COLUMNS[name]
+        column_path = os.path.join(path, f'{name}.bin')
+        if as_numpy:
+            data[name] = np.fromfile(column_path, dtype=np.dtype(typecode), count=rows)
+        else:
+            column = array(typecode)
+            with open(column_path, 'rb') as f:
+                column.fromfile(f, rows)
+            data[name] = column
+    return data
+
+
+def run_simulations_to_store(path: str, count: int, workers: int = 1, seed: Optional[int] = None,
+                             chunk_size: Optional[int] = None) -> ResultStore:
+    """运行 count 轮模拟并逐块写入列式结果目录"""
+    store = ResultStore(path)
+    store.extend(iter_simulation_chunks(count, workers, seed, chunk_size))
+    return store
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='运行多轮模拟并写入列式结果')
+    parser.add_argument('path')
+    parser.add_argument('--count', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    store = run_simulations_to_store(args.path, args.count, args.workers, args.seed)
+    data = load_results(args.path, ['days', 'final_power', 'total_deaths'])
+    print(f"已写入 {len(store)} 轮结果 → {args.path}")
+    print(f"  平均天数: {sum(data['days']) / len(data['days']):.1f}")
+    print(f"  平均战力: {sum(data['final_power']) / len(data['final_power']):.0f}")
+    print(f"  平均死亡: {sum(data['total_deaths']) / len(data['total_deaths']):.1f}")
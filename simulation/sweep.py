@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+平衡参数扫描
+把声明式网格展开为配置点，每个点用 SimulationConfig.with_overrides 构造独立配置
+（不修改模块全局常量）；(配置点 × 种子) 切块分发到工作进程，按提交顺序逐块合并为
+各配置点的汇总指标并流式产出：
+
+    grid = {'enhance_success_rates.10': [0.5, 0.6, 0.7], 'afk_gold_per_hour': [60, 90]}
+    for summary in iter_sweep(grid, runs=200, seed=1, workers=8):
+        if summary.done:
+            print(summary.format_line())
+
+所有配置点使用同一组种子（派生方式与 run_multiple_simulations 一致），
+点与点之间的差异不混入抽样种子的差异。
+
+    python sweep.py --grid '{"afk_gold_per_hour": [60, 90]}' --runs 100 --workers 4
+"""
+
+import math
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import product
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from game_simulation_v3 import (
+    CAMPAIGN_DAYS,
+    DEFAULT_CONFIG,
+    MAX_DEFAULT_CHUNK_SIZE,
+    SimulationConfig,
+    derive_campaign_seeds,
+    run_campaign,
+)
+
+# 每轮提取的指标（clear_day 只统计通关的轮次）
+METRICS = ('clear_day', 'days', 'total_deaths', 'final_power', 'win_rate')
+
+
+class RunningStats:
+    """单遍累计的均值/方差（Welford），合并顺序固定时结果可复现"""
+    __slots__ = ('count', 'mean', '_m2', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    @property
+    def variance(self) -> float:
+        """样本方差（少于2个样本时为0）"""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def stderr(self) -> float:
+        """均值的标准误（少于2个样本时为无穷大）"""
+        return self.stdev / math.sqrt(self.count) if self.count > 1 else math.inf
+
+
+def campaign_metrics(result: Dict) -> Tuple[bool, Dict[str, float]]:
+    """从 simulate_federal_stars 的结果提取 (是否通关, 指标)"""
+    cleared = result['days'] < CAMPAIGN_DAYS
+    metrics = {
+        'days': result['days'],
+        'total_deaths': result['total_deaths'],
+        'final_power': result['final_power'],
+        'win_rate': result['win_rate'],
+    }
+    if cleared:
+        metrics['clear_day'] = result['days']
+    return cleared, metrics
+
+
+@dataclass
+class PointSummary:
+    """一个配置点的累计结果"""
+    index: int
+    overrides: Dict[str, object]
+    config: SimulationConfig
+    runs: int
+    completed: int = 0
+    cleared: int = 0
+    stats: Dict[str, RunningStats] = field(default_factory=lambda: {m: RunningStats() for m in METRICS})
+
+    @property
+    def done(self) -> bool:
+        return self.completed >= self.runs
+
+    @property
+    def clear_rate(self) -> float:
+        return self.cleared / self.completed if self.completed else 0.0
+
+    def add(self, cleared: bool, metrics: Dict[str, float]):
+        self.completed += 1
+        self.cleared += cleared
+        for name, value in metrics.items():
+            self.stats[name].add(value)
+
+    def label(self) -> str:
+        return ', '.join(f"{k}={v}" for k, v in self.overrides.items()) or '(基准)'
+
+    def format_line(self) -> str:
+        clear_day = self.stats['clear_day']
+        day_str = f"{clear_day.mean:5.1f}±{clear_day.stdev:4.1f}" if clear_day.count else "   --    "
+        return (f"[{self.index:3d}] {self.label()}: 通关率 {self.clear_rate*100:5.1f}% "
+                f"通关天数 {day_str} 死亡 {self.stats['total_deaths'].mean:5.1f} "
+                f"战力 {self.stats['final_power'].mean:7.0f}（{self.completed}/{self.runs}轮）")
+
+
+def expand_grid(grid: Dict[str, Sequence]) -> List[Dict[str, object]]:
+    """网格 {路径: [取值, ...]} 展开为配置点覆盖列表（按键顺序的笛卡尔积）"""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in product(*(grid[k] for k in keys))]
+
+
+def run_sweep_chunk(config: SimulationConfig, seeds: List[int]) -> List[Tuple[bool, Dict[str, float]]]:
+    """在给定配置下静默运行一组种子，只返回指标（也是工作进程入口）"""
+    return [campaign_metrics(run_campaign(seed, config=config)) for seed in seeds]
+
+
+def iter_sweep(grid: Dict[str, Sequence], runs: int, seed: Optional[int] = None, workers: int = 1,
+               base_config: SimulationConfig = DEFAULT_CONFIG,
+               chunk_size: Optional[int] = None) -> Iterator[PointSummary]:
+    """
+    运行参数扫描，每合并一块结果产出一次对应配置点的累计结果（同一对象持续更新）
+    - grid: 见 expand_grid；空网格只运行 base_config
+    - runs: 每个配置点的模拟轮数
+    - workers: 并行进程数（None 为CPU核数）
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    summaries = [PointSummary(i, overrides, base_config.with_overrides(overrides), runs)
+                 for i, overrides in enumerate(expand_grid(grid))]
+    if chunk_size is None:
+        total = runs * len(summaries)
+        chunk_size = max(1, min(MAX_DEFAULT_CHUNK_SIZE, runs, total // (max(1, workers) * 4)))
+    seeds = derive_campaign_seeds(seed, runs)
+    tasks = [(summary, seeds[start:start + chunk_size])
+             for summary in summaries for start in range(0, runs, chunk_size)]
+
+    if workers <= 1:
+        for summary, chunk in tasks:
+            for cleared, metrics in run_sweep_chunk(summary.config, chunk):
+                summary.add(cleared, metrics)
+            yield summary
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # 按提交顺序合并，汇总结果与进程数和分块方式无关
+        pending = deque()
+        for summary, chunk in tasks:
+            pending.append((summary, executor.submit(run_sweep_chunk, summary.config, chunk)))
+            if len(pending) >= workers * 2:
+                done, future = pending.popleft()
+                for cleared, metrics in future.result():
+                    done.add(cleared, metrics)
+                yield done
+        while pending:
+            done, future = pending.popleft()
+            for cleared, metrics in future.result():
+                done.add(cleared, metrics)
+            yield done
+
+
+def run_sweep(grid: Dict[str, Sequence], runs: int, seed: Optional[int] = None, workers: int = 1,
+              base_config: SimulationConfig = DEFAULT_CONFIG, verbose: bool = False) -> List[PointSummary]:
+    """运行完整扫描，返回按配置点顺序排列的结果（verbose 时每个点完成即打印一行）"""
+    summaries: Dict[int, PointSummary] = {}
+    for summary in iter_sweep(grid, runs, seed, workers, base_config):
+        summaries[summary.index] = summary
+        if verbose and summary.done:
+            print(summary.format_line())
+    return [summaries[i] for i in sorted(summaries)]
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description='平衡参数网格扫描')
+    parser.add_argument('--grid', required=True,
+                        help='JSON 网格，如 \'{"enhance_success_rates.10": [0.5, 0.6], "afk_gold_per_hour": [60, 90]}\'')
+    parser.add_argument('--runs', type=int, default=100, help='每个配置点的模拟轮数')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    grid = json.loads(args.grid)
+    print(f"扫描 {len(expand_grid(grid))} 个配置点 × {args.runs} 轮")
+    run_sweep(grid, args.runs, args.seed, args.workers, verbose=True)
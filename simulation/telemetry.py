@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+通关模拟逐日遥测
+CampaignRecorder 在每天结束时把玩家状态写入预分配的定长数组（每个指标一列，下标为天数-1），
+多轮记录可按天聚合为百分位带，用于绘制成长曲线：
+
+    recorder = CampaignRecorder()
+    GameSimulator(seed=1).simulate_federal_stars(recorder)
+    bands = percentile_bands(collect_telemetry(1000, seed=1), 'power')
+
+不传 recorder 时模拟器不做任何记录。
+"""
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+from game_simulation_v3 import (
+    ARMOR_QUALITY_NAMES,
+    CAMPAIGN_DAYS,
+    QUALITY_ORDER,
+    iter_campaign_seeds,
+    run_campaign,
+)
+
+# 指标名 → array 类型码
+SERIES = {
+    'power': 'q',
+    'level': 'i',
+    'enhance_stones': 'q',
+    'divine_energy': 'q',
+    'star_index': 'b',
+    'wins': 'i',
+    'deaths': 'i',
+}
+# 各品质材料库存（materials_q1 ~ materials_q5，按品质顺序）
+MATERIAL_SERIES = tuple(f'materials_q{q_idx + 1}' for q_idx in range(len(QUALITY_ORDER)))
+
+DEFAULT_PERCENTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+
+class CampaignRecorder:
+    """单轮通关的逐日记录（数组在构造时一次性分配）"""
+
+    def __init__(self, max_days: int = CAMPAIGN_DAYS):
+        self.max_days = max_days
+        # 已记录的天数（通关提前结束时小于 max_days）
+        self.days = 0
+        self.series: Dict[str, array] = {
+            name: array(typecode, bytes(array(typecode).itemsize * max_days))
+            for name, typecode in SERIES.items()
+        }
+        for name in MATERIAL_SERIES:
+            self.series[name] = array('q', bytes(8 * max_days))
+
+    def record_day(self, sim, day: int, star_index: int):
+        """记录第 day 天结束时的状态（同一天重复记录会覆盖）"""
+        i = day - 1
+        series = self.series
+        player = sim.player
+        series['power'][i] = sim.get_player_power()
+        series['level'][i] = player.level
+        series['enhance_stones'][i] = sim.enhance_stones
+        series['divine_energy'][i] = player.divine_energy
+        series['star_index'][i] = star_index
+        series['wins'][i] = sim.total_wins
+        series['deaths'][i] = sim.total_deaths
+        for name, total in zip(MATERIAL_SERIES, sim.materials.quality_totals()):
+            series[name][i] = total
+        if day > self.days:
+            self.days = day
+
+    def __getitem__(self, name: str) -> array:
+        """已记录部分的逐日序列"""
+        return self.series[name][:self.days]
+
+    def value_on(self, name: str, day: int):
+        """第 day 天结束时的值；通关后的天数沿用最后一天的状态"""
+        return self.series[name][min(day, self.days) - 1]
+
+
+def _record_campaign(seed: int) -> CampaignRecorder:
+    """工作进程入口：静默运行一轮并返回其记录"""
+    recorder = CampaignRecorder()
+    run_campaign(seed, recorder=recorder)
+    return recorder
+
+
+def collect_telemetry(count: int, seed: Optional[int] = None, workers: int = 1) -> List[CampaignRecorder]:
+    """运行 count 轮模拟（种子派生方式与 run_multiple_simulations 一致），返回每轮的逐日记录"""
+    seeds = iter_campaign_seeds(seed, count)
+    if workers <= 1:
+        return [_record_campaign(s) for s in seeds]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_record_campaign, seeds, chunksize=max(1, count // (workers * 4))))
+
+
+def _quantile(ordered: Sequence[float], q: float) -> float:
+    """已排序序列的分位数（线性插值）"""
+    pos = (len(ordered) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def percentile_bands(recorders: Sequence[CampaignRecorder], name: str,
+                     percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[float, List[float]]:
+    """
+    按天聚合多轮记录为百分位带 {分位: [第1天, 第2天, ...]}
+    提前通关的轮次在之后的天数沿用通关当天的状态
+    """
+    if not recorders:
+        return {q: [] for q in percentiles}
+    days = max(r.days for r in recorders)
+    bands = {q: [] for q in percentiles}
+    for day in range(1, days + 1):
+        ordered = sorted(r.value_on(name, day) for r in recorders)
+        for q in percentiles:
+            bands[q].append(_quantile(ordered, q))
+    return bands
+
+
+def print_progress_bands(recorders: Sequence[CampaignRecorder], name: str = 'power', step: int = 10,
+                         percentiles: Sequence[float] = DEFAULT_PERCENTILES):
+    """每隔 step 天打印一行百分位带"""
+    bands = percentile_bands(recorders, name, percentiles)
+    print("\n" + "="*60)
+    print(f"逐日百分位带: {name}（{len(recorders)}轮）")
+    print("="*60)
+    days = len(bands[percentiles[0]]) if percentiles else 0
+    for i in range(0, days, step):
+        cells = ' '.join(f"P{int(q*100)}={bands[q][i]:.0f}" for q in percentiles)
+        print(f"  Day {i + 1:3d}: {cells}")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='多轮模拟逐日百分位带')
+    parser.add_argument('--count', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--series', default='power',
+                        choices=list(SERIES) + list(MATERIAL_SERIES))
+    args = parser.parse_args()
+
+    recorders = collect_telemetry(args.count, args.seed, args.workers)
+    print_progress_bands(recorders, args.series)
+    print(f"\n  材料品质: {', '.join(ARMOR_QUALITY_NAMES[q] for q in QUALITY_ORDER)}"
+          f" → {', '.join(MATERIAL_SERIES)}")
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模拟器热点路径吞吐基准（pytest）
+分两部分：
+
+1. 相对加速比（默认运行）：在同一台机器、同一进程里交替测量优化路径与参考实现，
+   要求加速比不低于 MIN_SPEEDUPS 中的下限（编译内核 vs calculate_equipment_stats，
+   批量掉落 vs 逐次掉落）。不依赖绝对基线，换机器也成立。
+
+2. 绝对吞吐（手动工具，默认跳过）：每个用例用固定种子跑固定工作量，测出每秒运行次数，
+   与 benchmark_baseline.json 中的本机基线比较，低于 基线 × SIM_BENCH_TOLERANCE（默认0.75）即失败。
+
+    SIM_BENCH=1 python -m pytest test_benchmarks.py              对比基线
+    SIM_BENCH_UPDATE=1 python -m pytest test_benchmarks.py       重新记录本机基线
+
+基线与机器相关，换机器后先重新记录；墙钟吞吐在别的机器上没有可比性，
+因此绝对吞吐只有设置 SIM_BENCH=1（或记录基线）时才运行。
+"""
+
+import json
+import os
+import random
+import time
+from typing import Callable, Dict
+
+import pytest
+
+from game_simulation_v3 import (
+    FEDERAL_TECH_STARS,
+    NANO_ARMOR_BASE_STATS,
+    QUIET_LOG,
+    GameSimulator,
+    _shared_equipment_kernel,
+    calculate_damage,
+    calculate_enemy_stats,
+    calculate_equipment_stats,
+    equipment_stat_vector,
+    roll_material_drop,
+    roll_material_drops_bulk,
+    simulate_battle,
+)
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+TOLERANCE = float(os.environ.get('SIM_BENCH_TOLERANCE', '0.75'))
+UPDATE = os.environ.get('SIM_BENCH_UPDATE') == '1'
+
+manual_benchmark = pytest.mark.skipif(os.environ.get('SIM_BENCH') != '1' and not UPDATE,
+                                      reason="绝对吞吐与机器相关，设置 SIM_BENCH=1 运行")
+
+# 每次测量至少持续的时间（秒）与重复次数（取最快一次）
+MIN_TIME = 0.2
+REPEAT = 3
+
+SEED = 20240601
+
+
+# ============ 工作量（每个工厂返回"运行一次"的函数） ============
+
+def _equipment_stats() -> Callable[[], None]:
+    """6个部位 × 强化 0~20 × 升华 0~10"""
+    def run():
+        for base_stats in NANO_ARMOR_BASE_STATS.values():
+            for enhance in range(21):
+                for sublimation in range(11):
+                    calculate_equipment_stats(base_stats, enhance, sublimation)
+    return run
+
+
+def _stat_kernel() -> Callable[[], None]:
+    """同一网格，走编译内核 equipment_stat_vector（战斗中实际使用的路径）"""
+    kernels = [_shared_equipment_kernel(tuple(sorted(base_stats.items())))
+               for base_stats in NANO_ARMOR_BASE_STATS.values()]
+    def run():
+        for kernel in kernels:
+            for enhance in range(21):
+                for sublimation in range(11):
+                    equipment_stat_vector(kernel, enhance, sublimation)
+    return run
+
+
+def _armor_stat_vector() -> Callable[[], None]:
+    """6件已穿戴战甲逐级强化/升华后取 NanoArmor.get_stat_vector（缓存失效 + 命中各一次）"""
+    armors = list(_seeded_simulator().player.armors.values())
+    def run():
+        for armor in armors:
+            for enhance in range(21):
+                for sublimation in range(11):
+                    armor.enhance_level = enhance
+                    armor.sublimation_level = sublimation
+                    armor.get_stat_vector()
+                    armor.get_stat_vector()
+    return run
+
+
+def _damage() -> Callable[[], None]:
+    """1000次伤害计算"""
+    attacker = {'attack': 80, 'crit': 12, 'critDamage': 40}
+    defender = {'defense': 30, 'guard': 5, 'level': 10}
+    def run():
+        rng = random.Random(SEED)
+        for _ in range(1000):
+            calculate_damage(attacker, defender, rng=rng)
+    return run
+
+
+def _seeded_simulator() -> GameSimulator:
+    sim = GameSimulator(seed=SEED, log=QUIET_LOG)
+    sim.auto_equip()
+    for armor in sim.player.armors.values():
+        armor.enhance_level = 8
+        armor.mark_stats_changed()
+    return sim
+
+
+def _battle() -> Callable[[], None]:
+    """100场战斗（+8星尘套 vs 贝塔工业星普通敌人）"""
+    sim = _seeded_simulator()
+    star = FEDERAL_TECH_STARS['planet_beta']
+    enemy = calculate_enemy_stats(star['enemyTier'], star['level'])
+    def run():
+        rng = random.Random(SEED)
+        for _ in range(100):
+            simulate_battle(sim.player, enemy, rng)
+    return run
+
+
+def _material_drop() -> Callable[[], None]:
+    """1000次普通敌人掉落"""
+    def run():
+        rng = random.Random(SEED)
+        for _ in range(1000):
+            roll_material_drop('normal', 3, rng)
+    return run
+
+
+def _material_drops_bulk() -> Callable[[], None]:
+    """同样1000次普通敌人掉落，一次批量抽样"""
+    def run():
+        roll_material_drops_bulk('normal', 3, 1000, random.Random(SEED))
+    return run
+
+
+def _synthesis() -> Callable[[], None]:
+    """一次全库存逐级合成（5000次击杀的掉落，约1.5万个材料）"""
+    sim = GameSimulator(seed=SEED, log=QUIET_LOG)
+    stock = roll_material_drops_bulk('normal', 5, 5000, random.Random(SEED))
+    def run():
+        sim.materials.counts[:] = stock
+        sim.auto_synthesize_all()
+    return run
+
+
+def _enhance() -> Callable[[], None]:
+    """6件星尘战甲从+0强化到+12"""
+    def run():
+        sim = GameSimulator(seed=SEED, log=QUIET_LOG)
+        sim.auto_equip()
+        sim.enhance_stones = 100000
+        sim.enhance_all_armors(12)
+    return run
+
+
+def _campaign() -> Callable[[], None]:
+    """一轮完整的联邦科技星通关（静默）"""
+    def run():
+        GameSimulator(seed=SEED, log=QUIET_LOG).simulate_federal_stars()
+    return run
+
+
+CASES: Dict[str, Callable[[], Callable[[], None]]] = {
+    'calculate_equipment_stats': _equipment_stats,
+    'equipment_stat_vector': _stat_kernel,
+    'NanoArmor.get_stat_vector': _armor_stat_vector,
+    'calculate_damage': _damage,
+    'simulate_battle': _battle,
+    'roll_material_drop': _material_drop,
+    'roll_material_drops_bulk': _material_drops_bulk,
+    'auto_synthesize_all': _synthesis,
+    'enhance_all_armors': _enhance,
+    'simulate_federal_stars': _campaign,
+}
+
+
+# ============ 测量与基线 ============
+
+def runs_per_second(run: Callable[[], None], min_time: float = MIN_TIME, repeat: int = REPEAT) -> float:
+    """重复运行至少 min_time 秒，取 repeat 次中最快的吞吐"""
+    run()  # 预热
+    best = 0.0
+    for _ in range(repeat):
+        runs = 0
+        start = time.perf_counter()
+        while True:
+            run()
+            runs += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        best = max(best, runs / elapsed)
+    return best
+
+
+def _load_baseline() -> Dict[str, float]:
+    if not os.path.exists(BASELINE_PATH):
+        return {}
+    with open(BASELINE_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save_baseline(name: str, value: float):
+    baseline = _load_baseline()
+    baseline[name] = round(value, 2)
+    with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+        json.dump(dict(sorted(baseline.items())), f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+
+# 优化路径相对参考实现的加速比下限 {(优化用例, 参考用例): 下限}
+# 本机实测约 1.8~1.9x 与 20~25x，下限留足噪声余量
+MIN_SPEEDUPS = {
+    ('equipment_stat_vector', 'calculate_equipment_stats'): 1.2,
+    ('roll_material_drops_bulk', 'roll_material_drop'): 6.0,
+}
+# 相对测量每轮的时长与轮数（默认运行，尽量便宜）
+SPEEDUP_MIN_TIME = 0.05
+SPEEDUP_ROUNDS = 5
+
+
+def measure_speedup(fast: Callable[[], None], slow: Callable[[], None],
+                    min_time: float = SPEEDUP_MIN_TIME, rounds: int = SPEEDUP_ROUNDS) -> float:
+    """交替测量两条路径（抵消机器负载的漂移），返回各自最快吞吐之比"""
+    best_fast = best_slow = 0.0
+    for _ in range(rounds):
+        best_fast = max(best_fast, runs_per_second(fast, min_time, 1))
+        best_slow = max(best_slow, runs_per_second(slow, min_time, 1))
+    return best_fast / best_slow
+
+
+@pytest.mark.parametrize('fast,slow', list(MIN_SPEEDUPS))
+def test_speedup(fast, slow):
+    speedup = measure_speedup(CASES[fast](), CASES[slow]())
+    minimum = MIN_SPEEDUPS[fast, slow]
+    assert speedup >= minimum, f"{fast} 相对 {slow} 仅快 {speedup:.2f}x（下限 {minimum}x）"
+
+
+@manual_benchmark
+@pytest.mark.parametrize('name', list(CASES))
+def test_throughput(name):
+    measured = runs_per_second(CASES[name]())
+    if UPDATE:
+        _save_baseline(name, measured)
+        return
+    baseline = _load_baseline().get(name)
+    if baseline is None:
+        pytest.skip(f"{name} 没有基线，使用 SIM_BENCH_UPDATE=1 记录")
+    assert measured >= baseline * TOLERANCE, (
+        f"{name} 吞吐下降: {measured:.1f} 次/秒，基线 {baseline:.1f} 次/秒（容差 {TOLERANCE:.0%}）"
+    )
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分布一致性回归测试（pytest）
+用固定种子分别运行参考实现（逐次掷骰的标量代码）和优化实现（别名表、批量掉落、
+查表升华、精确求解、向量化战斗），用卡方检验/KS检验确认两者的分布一致，
+保证性能优化不会悄悄改变游戏数值平衡。
+
+检验统计量在本文件内用标准库实现（不依赖 scipy）；显著性水平 ALPHA 取得很小，
+固定种子下结果确定，不会随机失败。
+"""
+
+import math
+import random
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import pytest
+
+from enhance_analysis import enhance_cost
+from game_simulation_v3 import (
+    ENHANCE_STONE_COST,
+    MATERIALS,
+    MAX_SUBLIMATION_LEVEL,
+    QUALITY_COUNT,
+    QUIET_LOG,
+    SUBLIMATION_DIVINE_ENERGY_COST,
+    VOID_CREATURE_INDEX,
+    ArmorQuality,
+    GameSimulator,
+    NanoArmor,
+    campaign_enemy,
+    drop_table,
+    effective_quality_probabilities,
+    get_drop_rates,
+    roll_material_drop,
+    roll_material_drops_bulk,
+    sample_sublimation,
+    simulate_battle,
+    solve_battle,
+    sublimation_outcome,
+)
+
+ALPHA = 1e-4
+SEED = 20240601
+
+
+# ============ 检验统计量（标准库实现） ============
+
+def _regularized_gamma_q(a: float, x: float) -> float:
+    """正则化上不完全伽马函数 Q(a, x)"""
+    if x <= 0:
+        return 1.0
+    log_prefix = a * math.log(x) - x - math.lgamma(a)
+    if x < a + 1:
+        # 级数展开求 P(a, x)
+        term = total = 1.0 / a
+        n = a
+        while abs(term) > abs(total) * 1e-15:
+            n += 1
+            term *= x / n
+            total += term
+        return max(0.0, 1.0 - total * math.exp(log_prefix))
+    # 连分式（修正 Lentz 法）求 Q(a, x)
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 10000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return math.exp(log_prefix) * h
+
+
+def chi2_sf(statistic: float, df: int) -> float:
+    """卡方分布的上尾概率"""
+    return _regularized_gamma_q(df / 2, statistic / 2)
+
+
+def _merge_sparse_bins(observed: List[float], expected: List[float],
+                       min_expected: float = 5.0) -> Tuple[List[float], List[float]]:
+    """把期望频数过小的相邻分箱合并，保证卡方近似成立"""
+    merged_obs, merged_exp = [], []
+    acc_obs = acc_exp = 0.0
+    for o, e in zip(observed, expected):
+        acc_obs += o
+        acc_exp += e
+        if acc_exp >= min_expected:
+            merged_obs.append(acc_obs)
+            merged_exp.append(acc_exp)
+            acc_obs = acc_exp = 0.0
+    if acc_exp > 0 or acc_obs > 0:
+        if merged_exp:
+            merged_obs[-1] += acc_obs
+            merged_exp[-1] += acc_exp
+        else:
+            merged_obs.append(acc_obs)
+            merged_exp.append(acc_exp)
+    return merged_obs, merged_exp
+
+
+def chi2_goodness_of_fit(observed: Sequence[int], probabilities: Sequence[float]) -> float:
+    """拟合优度卡方检验，返回 p 值"""
+    n = sum(observed)
+    expected = [p * n for p in probabilities]
+    obs, exp = _merge_sparse_bins(list(observed), expected)
+    if len(obs) < 2:
+        return 1.0
+    statistic = sum((o - e) ** 2 / e for o, e in zip(obs, exp))
+    return chi2_sf(statistic, len(obs) - 1)
+
+
+def chi2_homogeneity(a: Sequence[int], b: Sequence[int]) -> float:
+    """两组直方图同分布的卡方检验，返回 p 值"""
+    na, nb = sum(a), sum(b)
+    pooled = [(x + y) / (na + nb) for x, y in zip(a, b)]
+    cells = [(x, y, p) for x, y, p in zip(a, b, pooled) if p > 0]
+    statistic = 0.0
+    for x, y, p in cells:
+        statistic += (x - na * p) ** 2 / (na * p) + (y - nb * p) ** 2 / (nb * p)
+    if len(cells) < 2:
+        return 1.0
+    return chi2_sf(statistic, len(cells) - 1)
+
+
+def _kolmogorov_sf(lam: float) -> float:
+    """Kolmogorov 分布上尾 Q(λ)"""
+    if lam < 1e-3:
+        return 1.0
+    total = 0.0
+    for j in range(1, 101):
+        term = 2 * (-1) ** (j - 1) * math.exp(-2 * j * j * lam * lam)
+        total += term
+        if abs(term) < 1e-12:
+            break
+    return max(0.0, min(1.0, total))
+
+
+def ks_one_sample(sample: Sequence[int], cdf: Callable[[int], float]) -> float:
+    """
+    整数样本对给定 CDF 的 KS 检验，返回 p 值
+    离散分布下该检验偏保守（p 值偏大），只用于发现明显偏差
+    """
+    n = len(sample)
+    counts = Counter(sample)
+    cumulative = 0
+    d = 0.0
+    for x in sorted(counts):
+        cumulative += counts[x]
+        d = max(d, abs(cumulative / n - cdf(x)))
+    sqrt_n = math.sqrt(n)
+    return _kolmogorov_sf((sqrt_n + 0.12 + 0.11 / sqrt_n) * d)
+
+
+def ks_two_sample(a: Sequence[float], b: Sequence[float]) -> float:
+    """两样本 KS 检验，返回 p 值"""
+    ca, cb = Counter(a), Counter(b)
+    na, nb = len(a), len(b)
+    fa = fb = 0
+    d = 0.0
+    for x in sorted(set(ca) | set(cb)):
+        fa += ca[x]
+        fb += cb[x]
+        d = max(d, abs(fa / na - fb / nb))
+    en = math.sqrt(na * nb / (na + nb))
+    return _kolmogorov_sf((en + 0.12 + 0.11 / en) * d)
+
+
+# ============ 参考实现（改造前的逐次判定） ============
+
+def reference_roll_quality(rates: Dict[ArmorQuality, float], rng: random.Random) -> ArmorQuality:
+    """逐品质累加概率判定，超出累计概率时为星尘级"""
+    roll = rng.random()
+    cumulative = 0
+    for quality in ArmorQuality:
+        cumulative += rates[quality]
+        if roll <= cumulative:
+            return quality
+    return ArmorQuality.STARDUST
+
+
+def reference_enhance_to(target_level: int, rng: random.Random) -> Tuple[int, int]:
+    """逐次 try_enhance 从 +0 强化到目标等级，返回 (消耗强化石, 尝试次数)"""
+    armor = NanoArmor('weapon', '参考武器', ArmorQuality.STARDUST)
+    stones = attempts = 0
+    while armor.enhance_level < target_level:
+        stones += ENHANCE_STONE_COST.get(armor.enhance_level, 10)
+        attempts += 1
+        armor.try_enhance(rng)
+    return stones, attempts
+
+
+def reference_sublimate(start_level: int, budget: int, rng: random.Random) -> Tuple[int, int]:
+    """逐次 try_sublimate 用完神能预算，返回 (最终升华等级, 消耗神能)"""
+    armor = NanoArmor('weapon', '参考武器', ArmorQuality.STARDUST, sublimation_level=start_level)
+    energy = 0
+    while budget - energy >= SUBLIMATION_DIVINE_ENERGY_COST and armor.sublimation_level < MAX_SUBLIMATION_LEVEL:
+        energy += SUBLIMATION_DIVINE_ENERGY_COST
+        armor.try_sublimate(rng)
+    return armor.sublimation_level, energy
+
+
+def _histogram(values, size: int) -> List[int]:
+    counts = [0] * size
+    for v in values:
+        counts[v] += 1
+    return counts
+
+
+# ============ 掉落品质 ============
+
+DROP_CASES = [('normal', 1), ('normal', 4), ('elite', 6), ('boss', 3), ('boss', 8)]
+
+
+@pytest.mark.parametrize('enemy_type,planet_idx', DROP_CASES)
+def test_alias_table_matches_reference_quality_roll(enemy_type, planet_idx):
+    n = 20000
+    rates = get_drop_rates(enemy_type, planet_idx)
+    rng = random.Random(SEED)
+    reference = _histogram((reference_roll_quality(rates, rng).value - 1 for _ in range(n)), QUALITY_COUNT)
+    table = drop_table(enemy_type, planet_idx)
+    rng = random.Random(SEED + 1)
+    optimized = _histogram((table.sample(rng).value - 1 for _ in range(n)), QUALITY_COUNT)
+
+    assert chi2_homogeneity(reference, optimized) > ALPHA
+    assert chi2_goodness_of_fit(optimized, effective_quality_probabilities(rates)) > ALPHA
+
+
+def test_material_drop_picks_distinct_materials_uniformly():
+    rng = random.Random(SEED)
+    picks = Counter()
+    for _ in range(5000):
+        drops = roll_material_drop('boss', 2, rng)
+        assert len({mat_id for mat_id, _ in drops}) == len(drops)
+        picks.update(mat_id for mat_id, _ in drops)
+    observed = [picks[mat_id] for mat_id in MATERIALS]
+    assert chi2_goodness_of_fit(observed, [1 / len(MATERIALS)] * len(MATERIALS)) > ALPHA
+
+
+@pytest.mark.parametrize('enemy_type,planet_idx', [('normal', 2), ('boss', 7)])
+def test_bulk_drops_match_scalar_drops(enemy_type, planet_idx):
+    kills = 10000
+    rng = random.Random(SEED)
+    scalar = [0] * (len(MATERIALS) * QUALITY_COUNT)
+    for _ in range(kills):
+        for mat_id, quality in roll_material_drop(enemy_type, planet_idx, rng):
+            scalar[MATERIALS.index(mat_id) * QUALITY_COUNT + quality.value - 1] += 1
+    bulk = roll_material_drops_bulk(enemy_type, planet_idx, kills, random.Random(SEED + 1))
+
+    assert sum(bulk) == sum(scalar)
+    by_quality = lambda counts: [sum(counts[q::QUALITY_COUNT]) for q in range(QUALITY_COUNT)]
+    by_material = lambda counts: [sum(counts[m * QUALITY_COUNT:(m + 1) * QUALITY_COUNT])
+                                  for m in range(len(MATERIALS))]
+    assert chi2_homogeneity(by_quality(scalar), by_quality(bulk)) > ALPHA
+    assert chi2_homogeneity(by_material(scalar), by_material(bulk)) > ALPHA
+    assert chi2_homogeneity(scalar, bulk) > ALPHA
+
+
+# ============ 强化与升华 ============
+
+def test_roll_enhance_matches_try_enhance_exactly():
+    a = NanoArmor('weapon', 'a', ArmorQuality.STARDUST)
+    b = NanoArmor('weapon', 'b', ArmorQuality.STARDUST)
+    rng_a, rng_b = random.Random(SEED), random.Random(SEED)
+    for _ in range(2000):
+        success, downgraded, _ = a.try_enhance(rng_a)
+        assert b.roll_enhance(rng_b) == (success, downgraded)
+        assert a.enhance_level == b.enhance_level
+
+
+@pytest.mark.parametrize('target_level', [5, 10])
+def test_enhance_cost_matches_analysis(target_level):
+    n = 3000
+    rng = random.Random(SEED)
+    runs = [reference_enhance_to(target_level, rng) for _ in range(n)]
+    summary = enhance_cost(0, target_level)
+
+    stones = [s for s, _ in runs]
+    assert ks_one_sample(stones, summary.cdf) > ALPHA
+
+    attempts = [a for _, a in runs]
+    mean = sum(attempts) / n
+    variance = sum((a - mean) ** 2 for a in attempts) / (n - 1)
+    z = (mean - summary.expected_attempts) / math.sqrt(variance / n)
+    assert abs(z) < 4.5
+    stones_mean = sum(stones) / n
+    stones_sd = math.sqrt(sum((s - stones_mean) ** 2 for s in stones) / (n - 1))
+    assert abs(stones_mean - summary.expected_stones) < 4.5 * stones_sd / math.sqrt(n)
+
+
+def test_enhance_cost_cdf_beyond_top_percentile():
+    # 只要求中位数时，中位数之后的尾部也必须是完整分布，不能截断为1
+    summary = enhance_cost(0, 12, percentiles=(0.5,))
+    median = summary.stone_percentiles[0.5]
+    assert summary.cdf(median - 1) < 0.5 <= summary.cdf(median)
+    p99 = enhance_cost(0, 12, percentiles=(0.99,)).stone_percentiles[0.99]
+    assert summary.cdf(p99 - 1) < 0.99 <= summary.cdf(p99) < 1.0
+
+    n = 3000
+    rng = random.Random(SEED)
+    tail = sum(reference_enhance_to(12, rng)[0] > p99 for _ in range(n))
+    p = 1 - summary.cdf(p99)
+    assert abs(tail - n * p) < 4.5 * math.sqrt(n * p * (1 - p))
+
+
+@pytest.mark.parametrize('start_level,budget', [(0, 250), (2, 1000), (9, 100)])
+def test_sublimation_table_matches_reference(start_level, budget):
+    n = 20000
+    outcome = sublimation_outcome(start_level, budget)
+    rng = random.Random(SEED)
+    reference = [reference_sublimate(start_level, budget, rng) for _ in range(n)]
+    rng = random.Random(SEED + 1)
+    sampled = [sample_sublimation(start_level, budget, rng) for _ in range(n)]
+
+    size = MAX_SUBLIMATION_LEVEL + 1
+    ref_levels = _histogram((level for level, _ in reference), size)
+    opt_levels = _histogram((level for level, _ in sampled), size)
+    assert chi2_homogeneity(ref_levels, opt_levels) > ALPHA
+    assert chi2_goodness_of_fit(opt_levels, outcome.level_probabilities) > ALPHA
+    assert ks_two_sample([e for _, e in reference], [e for _, e in sampled]) > ALPHA
+
+
+# ============ 战斗 ============
+
+# 胜负取决于敌人暴击次数的对局（精确胜率约44%）
+CONTESTED_ENEMY = {'hp': 200, 'attack': 14, 'defense': 20, 'attackSpeed': 1.4, 'critRate': 0.09, 'level': 3}
+
+
+def _starting_player():
+    sim = GameSimulator(seed=SEED, log=QUIET_LOG)
+    sim.auto_equip()
+    return sim.player
+
+
+def test_scalar_battles_match_exact_solver():
+    n = 10000
+    player = _starting_player()
+    odds = solve_battle(player, CONTESTED_ENEMY)
+    assert 0.1 < odds.win_probability < 0.9
+
+    rng = random.Random(SEED)
+    results = [simulate_battle(player, CONTESTED_ENEMY, rng) for _ in range(n)]
+    wins = sum(r.victory for r in results)
+    timeouts = sum(not r.victory and r.player_hp_remaining > 0 for r in results)
+    observed = [wins, n - wins - timeouts, timeouts]
+    expected = [odds.win_probability, odds.loss_probability, odds.timeout_probability]
+    assert chi2_goodness_of_fit(observed, expected) > ALPHA
+
+    mean_rounds = sum(r.rounds for r in results) / n
+    sd_rounds = math.sqrt(sum((r.rounds - mean_rounds) ** 2 for r in results) / (n - 1))
+    assert abs(mean_rounds - odds.expected_rounds) < 4.5 * sd_rounds / math.sqrt(n)
+
+
+# 玩家在回合上限内打不死的高血量敌人：击杀分布只需算到 MAX_BATTLE_TURNS 次命中
+# （否则按血量算到必杀约需6000次命中，求解耗时随血量平方增长）
+TANK_ENEMY = {'hp': 100000, 'attack': 3, 'defense': 20, 'attackSpeed': 1.4, 'critRate': 0.06, 'level': 3}
+
+
+def test_exact_solver_handles_high_hp_enemy():
+    n = 5000
+    player = _starting_player()
+    start = time.perf_counter()
+    odds = solve_battle(player, TANK_ENEMY)
+    assert time.perf_counter() - start < 0.5
+    assert odds.win_probability == 0.0
+    assert 0.1 < odds.timeout_probability < 0.9
+
+    rng = random.Random(SEED)
+    results = [simulate_battle(player, TANK_ENEMY, rng) for _ in range(n)]
+    wins = sum(r.victory for r in results)
+    timeouts = sum(not r.victory and r.player_hp_remaining > 0 for r in results)
+    assert wins == 0
+    observed = [n - timeouts, timeouts]
+    expected = [odds.loss_probability, odds.timeout_probability]
+    assert chi2_goodness_of_fit(observed, expected) > ALPHA
+
+
+def test_batch_battles_match_scalar_battles():
+    np = pytest.importorskip('numpy')
+    from battle_batch import simulate_battle_batch
+
+    n = 10000
+    player = _starting_player()
+    rng = random.Random(SEED)
+    scalar = [simulate_battle(player, CONTESTED_ENEMY, rng) for _ in range(n)]
+    batch = simulate_battle_batch(player, CONTESTED_ENEMY, n, np.random.default_rng(SEED))
+
+    scalar_wins = sum(r.victory for r in scalar)
+    batch_wins = int(batch.victory.sum())
+    assert chi2_homogeneity([scalar_wins, n - scalar_wins], [batch_wins, n - batch_wins]) > ALPHA
+    assert ks_two_sample([r.rounds for r in scalar], batch.rounds.tolist()) > ALPHA
+    assert ks_two_sample([r.player_hp_remaining for r in scalar], batch.player_hp_remaining.tolist()) > ALPHA
+
+
+@pytest.mark.skipif(VOID_CREATURE_INDEX is None, reason="找不到 voidCreatures.ts")
+def test_batch_creature_battles_match_campaign_sampling():
+    np = pytest.importorskip('numpy')
+    from battle_batch import simulate_creature_battles
+
+    # 德尔塔军事星普通生物：一只约82%胜率、一只必胜，抽样与属性取列都会影响胜率
+    n = 10000
+    player = _starting_player()
+    rng = random.Random(SEED)
+    scalar = [simulate_battle(player, campaign_enemy('planet_delta', 'normal', rng), rng) for _ in range(n)]
+    batch = simulate_creature_battles(player, 'planet_delta', 'normal', n, np.random.default_rng(SEED))
+
+    scalar_wins = sum(r.victory for r in scalar)
+    batch_wins = int(batch.victory.sum())
+    assert chi2_homogeneity([scalar_wins, n - scalar_wins], [batch_wins, n - batch_wins]) > ALPHA
+    assert ks_two_sample([r.rounds for r in scalar], batch.rounds.tolist()) > ALPHA
+    assert ks_two_sample([r.player_hp_remaining for r in scalar], batch.player_hp_remaining.tolist()) > ALPHA
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列式结果存储回归测试（pytest）
+模拟写入中途中断（只有部分列写入了新的一块），确认重新打开后追加的行在各列中仍然对齐。
+"""
+
+import os
+from array import array
+
+from game_simulation_v3 import derive_campaign_seeds, run_campaign
+from result_store import COLUMNS, ResultStore, load_results
+
+
+def test_append_after_interrupted_write_keeps_columns_aligned(tmp_path):
+    path = str(tmp_path / 'store')
+    results = [run_campaign(seed) for seed in derive_campaign_seeds(5, 5)]
+    store = ResultStore(path)
+    store.append(results[:2])
+
+    # 中断的写入：前几列多写了两行
+    partial = dict(list(COLUMNS.items())[:3])
+    for name, typecode in partial.items():
+        with open(os.path.join(path, f'{name}.bin'), 'ab') as f:
+            array(typecode, [7, 7]).tofile(f)
+
+    store = ResultStore(path)
+    assert len(store) == 2
+    store.append(results[2:])
+
+    data = load_results(path)
+    assert list(data['run_index']) == [0, 1, 2, 3, 4]
+    assert list(data['days']) == [r['days'] for r in results]
+    for name, typecode in COLUMNS.items():
+        size = os.path.getsize(os.path.join(path, f'{name}.bin'))
+        assert size == 5 * array(typecode).itemsize, name
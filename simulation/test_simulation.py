@@ -9,6 +9,8 @@ from dataclasses import dataclass, field
 from typing import List, Dict, Tuple
 from enum import Enum
 
+from ts_constants import load_ts_constants
+
 # 战甲品质系统
 class ArmorQuality(Enum):
     STARDUST = 1
@@ -35,6 +37,11 @@ NANO_ARMOR_BASE = {
     'boot': {'name': '反重力战靴', 'hp': 4},
 }
 
+# 以 TS 源码为准（找不到源码时沿用上面的抄录值）
+_ts_constants = load_ts_constants()
+if _ts_constants is not None:
+    NANO_ARMOR_BASE = _ts_constants['nano_armor_base']
+
 # 计算装备属性
 def calculate_equipment_stats(base_stats: Dict, enhance_level: int, sublimation_level: int) -> Dict:
     enhanced = {}
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+从游戏 TypeScript 源码提取模拟器常量
+- 强化成功率/强化石消耗: src/core/EnhanceSystem.ts
+- 战甲基础属性: src/data/nanoArmorRecipes.ts
+- 各星球虚空生物（普通/精英/BOSS）: src/data/voidCreatures.ts
+
+提取结果缓存为 JSON 快照（ts_constants_cache.json），以源文件内容的 SHA-256 为键：
+源文件未变化时直接读快照，变化后自动重新提取。找不到源文件时返回 None，
+模拟器沿用手工抄录的常量。
+
+    python ts_constants.py            打印提取结果摘要
+    python ts_constants.py --refresh  强制重新提取
+"""
+
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+# 提取逻辑变化时递增，使旧快照失效
+EXTRACTOR_VERSION = 1
+
+SIMULATION_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(SIMULATION_DIR)
+CACHE_PATH = os.path.join(SIMULATION_DIR, 'ts_constants_cache.json')
+
+SOURCES = {
+    'enhance': os.path.join('src', 'core', 'EnhanceSystem.ts'),
+    'armor': os.path.join('src', 'data', 'nanoArmorRecipes.ts'),
+    'creatures': os.path.join('src', 'data', 'voidCreatures.ts'),
+}
+
+# 模拟器使用的BOSS属性字段
+BOSS_STAT_KEYS = ('hp', 'attack', 'defense', 'speed', 'hitRate', 'dodgeRate', 'attackSpeed',
+                  'critRate', 'critDamage', 'guardRate', 'penetration')
+
+
+# ============ TS 字面量解析 ============
+# 只支持数据文件中用到的子集：对象、数组、字符串、数字、布尔/null、
+# 标识符引用（如 NanoArmorSlot.HELMET）和数组展开（...ALPHA_NORMAL）。
+
+class Reference(str):
+    """标识符引用（枚举成员或常量名）"""
+
+
+class Spread(str):
+    """数组中的 ...NAME 展开"""
+
+
+_TOKEN = re.compile(r'''
+    (?P<skip>\s+|//[^\n]*|/\*.*?\*/)
+  | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+  | (?P<number>-?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+  | (?P<spread>\.\.\.)
+  | (?P<ident>[A-Za-z_$][\w$]*(?:\.[A-Za-z_$][\w$]*)*)
+  | (?P<punct>[{}\[\]:,])
+''', re.VERBOSE | re.DOTALL)
+
+_ESCAPES = {'n': '\n', 't': '\t', "'": "'", '"': '"', '\\': '\\'}
+
+
+def _unquote(literal: str) -> str:
+    return re.sub(r'\\(.)', lambda m: _ESCAPES.get(m.group(1), m.group(1)), literal[1:-1])
+
+
+class _LiteralParser:
+    def __init__(self, text: str, pos: int):
+        self.text = text
+        self.pos = pos
+
+    def _next(self) -> Tuple[str, str]:
+        while True:
+            match = _TOKEN.match(self.text, self.pos)
+            if match is None:
+                raise ValueError(f"无法解析的TS字面量，位置 {self.pos}: {self.text[self.pos:self.pos + 30]!r}")
+            self.pos = match.end()
+            if match.lastgroup != 'skip':
+                return match.lastgroup, match.group()
+
+    def _peek(self) -> Tuple[str, str]:
+        pos = self.pos
+        token = self._next()
+        self.pos = pos
+        return token
+
+    def parse(self):
+        kind, value = self._next()
+        if kind == 'string':
+            return _unquote(value)
+        if kind == 'number':
+            number = float(value)
+            return int(number) if number.is_integer() and '.' not in value else number
+        if kind == 'ident':
+            return {'true': True, 'false': False, 'null': None, 'undefined': None}.get(value, Reference(value))
+        if value == '[':
+            items = []
+            while self._peek()[1] != ']':
+                if self._peek()[0] == 'spread':
+                    self._next()
+                    items.append(Spread(self._next()[1]))
+                else:
+                    items.append(self.parse())
+                if self._peek()[1] == ',':
+                    self._next()
+            self._next()
+            return items
+        if value == '{':
+            obj = {}
+            while self._peek()[1] != '}':
+                key_kind, key = self._next()
+                if key == '[':
+                    # 计算属性名 [NanoArmorSlot.HELMET]: ...
+                    key = self._next()[1]
+                    self._next()
+                elif key_kind == 'string':
+                    key = _unquote(key)
+                self._next()  # ':'
+                obj[key] = self.parse()
+                if self._peek()[1] == ',':
+                    self._next()
+            self._next()
+            return obj
+        raise ValueError(f"意外的符号 {value!r}，位置 {self.pos}")
+
+
+def parse_constants(source: str) -> Dict[str, object]:
+    """解析文件中所有 `const NAME(: 类型)? = 字面量;` 定义"""
+    constants = {}
+    for match in re.finditer(r'^(?:export\s+)?const\s+(\w+)\s*(?::\s*[^=\n]+)?=\s*(?=[\[{\'"\d-])',
+                             source, re.MULTILINE):
+        constants[match.group(1)] = _LiteralParser(source, match.end()).parse()
+    return constants
+
+
+def parse_string_enum(source: str, name: str) -> Dict[str, str]:
+    """解析 `enum NAME { KEY = 'value', ... }`"""
+    body = re.search(r'enum\s+%s\s*\{(.*?)\}' % re.escape(name), source, re.DOTALL).group(1)
+    return {key: value for key, value in re.findall(r'(\w+)\s*=\s*[\'"]([^\'"]*)[\'"]', body)}
+
+
+def _resolve(constants: Dict[str, object], items: List) -> List:
+    """展开数组中的 ...NAME 和常量引用"""
+    resolved = []
+    for item in items:
+        if isinstance(item, Spread):
+            resolved.extend(_resolve(constants, constants[item]))
+        elif isinstance(item, Reference):
+            resolved.append(constants[item])
+        else:
+            resolved.append(item)
+    return resolved
+
+
+# ============ 各数据文件的提取 ============
+
+def extract_enhance(source: str) -> Dict:
+    constants = parse_constants(source)
+    max_level = int(re.search(r'MAX_ENHANCE_LEVEL\s*=\s*(\d+)', source).group(1))
+    return {
+        # 源码为百分比
+        'enhance_success_rates': {level: rate / 100 for level, rate in enumerate(constants['ENHANCE_SUCCESS_RATES'])},
+        'enhance_stone_cost': dict(enumerate(constants['ENHANCE_STONE_COST'])),
+        'max_enhance_level': max_level,
+    }
+
+
+def extract_armor(source: str) -> Dict:
+    constants = parse_constants(source)
+    slots = parse_string_enum(source, 'NanoArmorSlot')
+    armor_base = {}
+    for recipe in _resolve(constants, constants['ALL_NANO_ARMOR_RECIPES']):
+        slot = slots[recipe['slot'].split('.')[-1]]
+        armor_base[slot] = {'name': recipe['name'], **recipe['baseStats']}
+    return {'nano_armor_base': armor_base}
+
+
+def extract_creatures(source: str) -> Dict:
+    constants = parse_constants(source)
+    planets: Dict[str, Dict] = {}
+    for creature in _resolve(constants, constants['ALL_VOID_CREATURES']):
+        planet = planets.setdefault(creature['planetId'], {'normal': [], 'elite': [], 'boss': []})
+        planet[creature['creatureType']].append(creature)
+    return {
+        'void_creatures': planets,
+        'federal_tech_stars': {
+            planet_id: {
+                'enemies': [c['name'] for c in roster['normal']],
+                'eliteEnemies': [c['name'] for c in roster['elite']],
+                'bossName': roster['boss'][0]['name'],
+                'bossStats': {k: roster['boss'][0][k] for k in BOSS_STAT_KEYS},
+            }
+            for planet_id, roster in planets.items() if roster['boss']
+        },
+    }
+
+
+EXTRACTORS = {
+    'enhance': extract_enhance,
+    'armor': extract_armor,
+    'creatures': extract_creatures,
+}
+
+
+# ============ 快照缓存 ============
+
+def _read_sources(repo_root: str) -> Optional[Dict[str, bytes]]:
+    contents = {}
+    for key, relative in SOURCES.items():
+        path = os.path.join(repo_root, relative)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            contents[key] = f.read()
+    return contents
+
+
+def source_digest(contents: Dict[str, bytes]) -> str:
+    """源文件内容 + 提取器版本的 SHA-256"""
+    digest = hashlib.sha256(f'v{EXTRACTOR_VERSION}'.encode())
+    for key in sorted(contents):
+        digest.update(key.encode())
+        digest.update(contents[key])
+    return digest.hexdigest()
+
+
+def _int_keys(data: Dict) -> Dict:
+    """JSON 只支持字符串键，恢复等级表的整数键"""
+    for name in ('enhance_success_rates', 'enhance_stone_cost'):
+        data[name] = {int(level): value for level, value in data[name].items()}
+    return data
+
+
+def extract_all(contents: Dict[str, bytes]) -> Dict:
+    data = {}
+    for key, extract in EXTRACTORS.items():
+        data.update(extract(contents[key].decode('utf-8')))
+    return data
+
+
+def load_ts_constants(repo_root: str = REPO_ROOT, cache_path: str = CACHE_PATH,
+                      refresh: bool = False) -> Optional[Dict]:
+    """
+    读取TS常量（优先使用快照）
+    返回 None 表示找不到源文件
+    """
+    contents = _read_sources(repo_root)
+    if contents is None:
+        return None
+    digest = source_digest(contents)
+
+    if not refresh and os.path.exists(cache_path):
+        try:
+            with open(cache_path, encoding='utf-8') as f:
+                snapshot = json.load(f)
+            if snapshot.get('digest') == digest:
+                return _int_keys(snapshot['data'])
+        except (OSError, ValueError, KeyError):
+            pass  # 快照损坏时重新提取
+
+    data = extract_all(contents)
+    try:
+        tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'digest': digest, 'data': data}, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass  # 只读目录下不写快照，下次启动重新提取
+    return _int_keys(json.loads(json.dumps(data)))
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='从TS源码提取模拟器常量')
+    parser.add_argument('--refresh', action='store_true', help='忽略快照，强制重新提取')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    data = load_ts_constants(refresh=args.refresh)
+    elapsed = (time.perf_counter() - start) * 1000
+    if data is None:
+        print(f"找不到TS源文件（{REPO_ROOT}）")
+    else:
+        print(f"加载TS常量 {elapsed:.1f} 毫秒（快照: {CACHE_PATH}）")
+        print(f"  强化等级: {len(data['enhance_success_rates'])}级，最高+{data['max_enhance_level']}")
+        print(f"  战甲部位: {', '.join(data['nano_armor_base'])}")
+        for planet_id, star in data['federal_tech_stars'].items():
+            print(f"  {planet_id:15s} 普通{len(star['enemies'])} 精英{len(star['eliteEnemies'])} BOSS: {star['bossName']}")